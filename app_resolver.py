@@ -0,0 +1,378 @@
+# app_resolver.py
+"""前台应用解析：缓存平台句柄与进程名，焦点未变化时直接返回上次结果。
+
+进程名按 (pid, 进程启动时间) 缓存，pid 被复用时不会取到旧名字。
+"""
+
+import atexit
+import ctypes
+import ctypes.util
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+UNKNOWN_APP = "Unknown"
+# 进程名缓存条目上限
+NAME_CACHE_SIZE = 256
+
+
+class ForegroundSource:
+    """平台相关的前台窗口查询。focus_token 返回廉价的焦点标识，相同表示前台未变化。"""
+
+    name = "none"
+
+    def focus_token(self):
+        return None
+
+    def foreground_pid(self):
+        return None
+
+    def process_start(self, pid):
+        return None
+
+    def process_name(self, pid):
+        return None
+
+    def fallback_name(self):
+        return UNKNOWN_APP
+
+    def close(self):
+        pass
+
+
+class WindowsForegroundSource(ForegroundSource):
+    """Windows：只通过 ctypes 调用 user32 / kernel32，不在每次解析时导入 win32gui / psutil。"""
+
+    name = "win32"
+    _PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+    def __init__(self):
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+
+    def focus_token(self):
+        # 前台窗口句柄，获取开销为微秒级
+        return self._user32.GetForegroundWindow()
+
+    def foreground_pid(self):
+        hwnd = self._user32.GetForegroundWindow()
+        if not hwnd:
+            return None
+        pid = ctypes.c_ulong()
+        self._user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        return pid.value or None
+
+    def _open(self, pid):
+        return self._kernel32.OpenProcess(self._PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+
+    def process_start(self, pid):
+        handle = self._open(pid)
+        if not handle:
+            return None
+        try:
+            creation, exit_time, kernel, user = (ctypes.c_ulonglong() for _ in range(4))
+            if not self._kernel32.GetProcessTimes(
+                handle, ctypes.byref(creation), ctypes.byref(exit_time), ctypes.byref(kernel), ctypes.byref(user)
+            ):
+                return None
+            return creation.value
+        finally:
+            self._kernel32.CloseHandle(handle)
+
+    def process_name(self, pid):
+        handle = self._open(pid)
+        if not handle:
+            return None
+        try:
+            size = ctypes.c_ulong(1024)
+            buffer = ctypes.create_unicode_buffer(size.value)
+            if not self._kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+                return None
+            return os.path.basename(buffer.value) or None
+        finally:
+            self._kernel32.CloseHandle(handle)
+
+    def fallback_name(self):
+        # 受保护进程无法打开时退回窗口标题
+        hwnd = self._user32.GetForegroundWindow()
+        length = self._user32.GetWindowTextLengthW(hwnd) if hwnd else 0
+        if not length:
+            return UNKNOWN_APP
+        buffer = ctypes.create_unicode_buffer(length + 1)
+        self._user32.GetWindowTextW(hwnd, buffer, length + 1)
+        return buffer.value or UNKNOWN_APP
+
+
+class MacForegroundSource(ForegroundSource):
+    """macOS：NSWorkspace.frontmostApplication 直接给出 pid、启动时间与名称。"""
+
+    name = "nsworkspace"
+
+    def __init__(self):
+        from AppKit import NSWorkspace
+
+        self._workspace = NSWorkspace.sharedWorkspace()
+        self._app = None
+
+    def focus_token(self):
+        self._app = self._workspace.frontmostApplication()
+        return self._app.processIdentifier() if self._app is not None else None
+
+    def foreground_pid(self):
+        return self._app.processIdentifier() if self._app is not None else None
+
+    def process_start(self, pid):
+        if self._app is None or self._app.processIdentifier() != pid:
+            return None
+        launched = self._app.launchDate()
+        return launched.timeIntervalSince1970() if launched is not None else None
+
+    def process_name(self, pid):
+        if self._app is None or self._app.processIdentifier() != pid:
+            return None
+        return self._app.localizedName()
+
+
+class AppleScriptForegroundSource(ForegroundSource):
+    """未安装 pyobjc 时的回退：每次启动 osascript，由解析器限频。"""
+
+    name = "osascript"
+
+    def fallback_name(self):
+        script = 'tell application "System Events" to get name of first process whose frontmost is true'
+        try:
+            output = subprocess.check_output(["osascript", "-e", script], text=True, timeout=2)
+        except Exception:
+            return UNKNOWN_APP
+        return output.strip() or UNKNOWN_APP
+
+
+class _XPropertyEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("serial", ctypes.c_ulong),
+        ("send_event", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("window", ctypes.c_ulong),
+        ("atom", ctypes.c_ulong),
+        ("time", ctypes.c_ulong),
+        ("state", ctypes.c_int),
+    ]
+
+
+# 已失效窗口上的请求会产生 BadWindow，Xlib 默认错误处理会直接结束进程，这里改为忽略
+_X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)(lambda display, event: 0)
+
+
+class X11ForegroundSource(ForegroundSource):
+    """X11：常驻一个 X 连接，监听根窗口 _NET_ACTIVE_WINDOW 属性变化；
+    焦点变化后按 EWMH 读取 _NET_WM_PID，再从 /proc/<pid>/comm 取进程名。
+    """
+
+    name = "ewmh"
+    _PROPERTY_CHANGE_MASK = 1 << 22
+    _PROPERTY_NOTIFY = 28
+
+    def __init__(self):
+        xlib = ctypes.cdll.LoadLibrary(ctypes.util.find_library("X11") or "libX11.so.6")
+        xlib.XOpenDisplay.restype = ctypes.c_void_p
+        xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        xlib.XInternAtom.restype = ctypes.c_ulong
+        xlib.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+        xlib.XSelectInput.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_long]
+        xlib.XPending.argtypes = [ctypes.c_void_p]
+        xlib.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        xlib.XFree.argtypes = [ctypes.c_void_p]
+        xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        xlib.XSetErrorHandler.argtypes = [type(_X_ERROR_HANDLER)]
+        xlib.XGetWindowProperty.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_long, ctypes.c_long, ctypes.c_int,
+            ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_void_p),
+        ]
+        display = xlib.XOpenDisplay(None)
+        if not display:
+            raise OSError("无法连接 X 服务器")
+        xlib.XSetErrorHandler(_X_ERROR_HANDLER)
+        self._xlib = xlib
+        self._display = display
+        self._root = xlib.XDefaultRootWindow(display)
+        self._active_atom = xlib.XInternAtom(display, b"_NET_ACTIVE_WINDOW", False)
+        self._pid_atom = xlib.XInternAtom(display, b"_NET_WM_PID", False)
+        xlib.XSelectInput(display, self._root, self._PROPERTY_CHANGE_MASK)
+        self._event = (ctypes.c_long * 24)()
+        # 每次 _NET_ACTIVE_WINDOW 变化递增，作为焦点令牌；检查只处理已到达的事件，不与服务器往返
+        self._generation = 0
+
+    def focus_token(self):
+        xlib, display = self._xlib, self._display
+        while xlib.XPending(display):
+            xlib.XNextEvent(display, ctypes.byref(self._event))
+            event = _XPropertyEvent.from_buffer(self._event)
+            if event.type == self._PROPERTY_NOTIFY and event.atom == self._active_atom:
+                self._generation += 1
+        return self._generation
+
+    def _cardinal(self, window, atom):
+        actual_type, actual_format = ctypes.c_ulong(), ctypes.c_int()
+        nitems, bytes_after, data = ctypes.c_ulong(), ctypes.c_ulong(), ctypes.c_void_p()
+        status = self._xlib.XGetWindowProperty(
+            self._display, window, atom, 0, 1, False, 0,
+            ctypes.byref(actual_type), ctypes.byref(actual_format),
+            ctypes.byref(nitems), ctypes.byref(bytes_after), ctypes.byref(data),
+        )
+        if status != 0 or not data.value:
+            return None
+        try:
+            if actual_format.value != 32 or nitems.value < 1:
+                return None
+            # 32 位格式的属性在客户端以 long 数组存放
+            return ctypes.cast(data, ctypes.POINTER(ctypes.c_ulong))[0]
+        finally:
+            self._xlib.XFree(data)
+
+    def foreground_pid(self):
+        window = self._cardinal(self._root, self._active_atom)
+        if not window:
+            return None
+        return self._cardinal(window, self._pid_atom) or None
+
+    def process_start(self, pid):
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as handle:
+                stat = handle.read()
+        except OSError:
+            return None
+        # 第 22 个字段为启动时间；进程名可能含空格，从最后一个右括号之后开始计数
+        fields = stat[stat.rfind(b")") + 2:].split()
+        return int(fields[19]) if len(fields) > 19 else None
+
+    def process_name(self, pid):
+        try:
+            with open(f"/proc/{pid}/comm", "r", encoding="utf-8", errors="replace") as handle:
+                return handle.read().strip() or None
+        except OSError:
+            return None
+
+    def fallback_name(self):
+        return "Unknown (Linux)"
+
+    def close(self):
+        if self._display is not None:
+            self._xlib.XCloseDisplay(self._display)
+            self._display = None
+
+
+class _LinuxFallbackSource(ForegroundSource):
+    name = "none"
+
+    def fallback_name(self):
+        return "Unknown (Linux)"
+
+
+def create_source():
+    if sys.platform == "win32":
+        return WindowsForegroundSource()
+    if sys.platform == "darwin":
+        try:
+            return MacForegroundSource()
+        except ImportError:
+            return AppleScriptForegroundSource()
+    # Wayland 不公开其他客户端的窗口信息，XWayland 下的 EWMH 也只覆盖 X 客户端
+    if os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        try:
+            return X11ForegroundSource()
+        except OSError as exc:
+            print(f"[调试] 无法通过 EWMH 解析前台应用：{exc}")
+    return _LinuxFallbackSource()
+
+
+class AppResolver:
+    """解析当前前台应用名。
+
+    焦点令牌未变化时直接返回上次结果；没有焦点令牌的平台在 min_interval 内复用上次结果。
+    """
+
+    def __init__(self, source=None, min_interval=0.5, clock=time.monotonic):
+        self._source = source
+        self._min_interval = float(min_interval)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._names = OrderedDict()
+        self._token = None
+        self._current = None
+        self._resolved_at = 0.0
+        self._stats = {"calls": 0, "hits": 0, "lookups": 0, "total_us": 0.0}
+
+    def resolve(self):
+        started = time.perf_counter()
+        with self._lock:
+            if self._source is None:
+                self._source = create_source()
+                print(f"[调试] 前台应用解析方式：{self._source.name}")
+                atexit.register(self.close)
+            try:
+                name = self._resolve()
+            except Exception as exc:
+                print(f"[调试] 解析前台应用失败：{exc}")
+                name = UNKNOWN_APP
+            self._stats["calls"] += 1
+            self._stats["total_us"] += (time.perf_counter() - started) * 1e6
+            return name
+
+    def _resolve(self):
+        source = self._source
+        token = source.focus_token()
+        now = self._clock()
+        if self._current is not None:
+            unchanged = token == self._token if token is not None else now - self._resolved_at < self._min_interval
+            if unchanged:
+                self._stats["hits"] += 1
+                return self._current
+        self._stats["lookups"] += 1
+        self._token = token
+        self._resolved_at = now
+        pid = source.foreground_pid()
+        name = None
+        if pid is not None:
+            key = (pid, source.process_start(pid))
+            name = self._names.get(key)
+            if name is None:
+                name = source.process_name(pid)
+                if name:
+                    self._names[key] = name
+                    if len(self._names) > NAME_CACHE_SIZE:
+                        self._names.popitem(last=False)
+            else:
+                self._names.move_to_end(key)
+        self._current = name or source.fallback_name()
+        return self._current
+
+    def invalidate(self):
+        with self._lock:
+            self._current = None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_us"] = stats.pop("total_us") / stats["calls"] if stats["calls"] else 0.0
+        stats["cached_names"] = len(self._names)
+        return stats
+
+    def close(self):
+        with self._lock:
+            if self._source is not None:
+                self._source.close()
+                self._source = None
+
+
+_resolver = AppResolver()
+
+
+def get_resolver():
+    return _resolver
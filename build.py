@@ -20,6 +20,8 @@ opts = [
     '--icon=assets/clipguard.icns',
     '--exclude-module=matplotlib',
     '--exclude-module=numpy',
+    # 地区规则包通过 importlib 按需导入，需显式打包
+    '--collect-submodules=detector_packs',
 ]
 
 # 平台特定优化
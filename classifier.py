@@ -1,123 +1,11 @@
 import os
-import re
-from typing import Optional
-
-_FILE_EXT_CATEGORIES = {
-    # 图片
-    "png": "Image",
-    "jpg": "Image",
-    "jpeg": "Image",
-    "gif": "Image",
-    "bmp": "Image",
-    "webp": "Image",
-    "tif": "Image",
-    "tiff": "Image",
-    "svg": "Image",
-    "heic": "Image",
-    "heif": "Image",
-    "psd": "Image",
-    "ai": "Image",
-    "eps": "Image",
-    # 代码
-    "py": "Code",
-    "pyw": "Code",
-    "ipynb": "Code",
-    "js": "Code",
-    "jsx": "Code",
-    "ts": "Code",
-    "tsx": "Code",
-    "java": "Code",
-    "c": "Code",
-    "cpp": "Code",
-    "cc": "Code",
-    "h": "Code",
-    "hpp": "Code",
-    "cs": "Code",
-    "go": "Code",
-    "rs": "Code",
-    "swift": "Code",
-    "kt": "Code",
-    "kts": "Code",
-    "php": "Code",
-    "rb": "Code",
-    "pl": "Code",
-    "sh": "Code",
-    "bash": "Code",
-    "ps1": "Code",
-    "sql": "Code",
-    "json": "Code",
-    "yaml": "Code",
-    "yml": "Code",
-    "xml": "Code",
-    "css": "Code",
-    "scss": "Code",
-    "less": "Code",
-    # 文档
-    "txt": "Document",
-    "md": "Document",
-    "doc": "Document",
-    "docx": "Document",
-    "rtf": "Document",
-    "odt": "Document",
-    "pdf": "Document",
-    "tex": "Document",
-    "epub": "Document",
-    # 表格
-    "xls": "Spreadsheet",
-    "xlsx": "Spreadsheet",
-    "xlsm": "Spreadsheet",
-    "ods": "Spreadsheet",
-    "csv": "Spreadsheet",
-    # 演示
-    "ppt": "Presentation",
-    "pptx": "Presentation",
-    "odp": "Presentation",
-    "key": "Presentation",
-    # 压缩包
-    "zip": "Archive",
-    "rar": "Archive",
-    "7z": "Archive",
-    "tar": "Archive",
-    "gz": "Archive",
-    "tgz": "Archive",
-    "bz2": "Archive",
-    "xz": "Archive",
-    "lz": "Archive",
-    "cab": "Archive",
-    "iso": "Archive",
-    # 音频
-    "mp3": "Audio",
-    "wav": "Audio",
-    "flac": "Audio",
-    "aac": "Audio",
-    "ogg": "Audio",
-    "m4a": "Audio",
-    "aiff": "Audio",
-    # 视频
-    "mp4": "Video",
-    "mov": "Video",
-    "avi": "Video",
-    "mkv": "Video",
-    "wmv": "Video",
-    "flv": "Video",
-    "webm": "Video",
-    "mts": "Video",
-    # 可执行文件
-    "exe": "Executable",
-    "msi": "Executable",
-    "apk": "Executable",
-    "app": "Executable",
-    "dmg": "Executable",
-    "pkg": "Executable",
-    "deb": "Executable",
-    "rpm": "Executable",
-    "bat": "Executable",
-    # 字体
-    "ttf": "Font",
-    "otf": "Font",
-    "woff": "Font",
-    "woff2": "Font",
-}
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable
+
+from content_features import FILE_EXT_CATEGORIES, ContentFeatures, extract_features
+from regex_engine import compile_pattern
 
 _BUSINESS_KEYWORDS_ZH = ["合同", "发票", "报价", "客户", "交易"]
 _BUSINESS_KEYWORDS_EN = [
@@ -132,77 +20,217 @@ _BUSINESS_KEYWORDS_EN = [
     "proposal",
 ]
 
-_CODE_LINE_START_PATTERN = re.compile(
-    r"^\s*(def|class|import|from|for|while|if|elif|else|try|except|with|return|lambda|"
-    r"package|using|public|private|protected|interface|enum|namespace)\b",
-    re.IGNORECASE | re.MULTILINE,
-)
-_CODE_ASSIGN_CALL_PATTERN = re.compile(r"=\s*[^=]+\([^)]*\)")
-_CODE_KEYWORD_PATTERN = re.compile(
-    r"\b(function|console\.log|System\.out\.println|print\s*\(|async\s+def|await|var\s+\w+|let\s+\w+|const\s+\w+)\b"
-)
-
-
-def _looks_like_code(text: str) -> bool:
-    if _CODE_LINE_START_PATTERN.search(text):
-        return True
-    if _CODE_ASSIGN_CALL_PATTERN.search(text):
-        return True
-    if _CODE_KEYWORD_PATTERN.search(text):
-        return True
-    structural_hits = 0
-    for line in text.splitlines() or [text]:
-        if re.search(r"[{}\[\]]", line):
-            structural_hits += 1
-        if ";" in line or "->" in line:
-            structural_hits += 1
-    return structural_hits >= 2
-
-
-def _category_from_extension(text: str) -> Optional[str]:
-    tokens = re.split(r'[\s"\'<>]+', text)
-    for token in tokens:
-        token = token.strip('.,;:!?()[]{}\'"')
-        if not token:
-            continue
-        name, ext = os.path.splitext(token)
-        if not ext:
-            continue
-        if not name or re.search(r"[^\w\-.]", name):
-            continue
-        category = _FILE_EXT_CATEGORIES.get(ext.lstrip(".").lower())
-        if category:
-            return category
-    return None
+# 以下规则经由 regex_engine 编译，可用时走线性时间的 RE2 后端
+_CODE_FALLBACK_PATTERN = r"^\s*def\s+|\s*class\s+|import\s+|from\s+.*import"
+_PHONE_PATTERN = r"1[3-9]\d{9}"
+
+DEFAULT_CATEGORY = "Text"
+# 文件管理器复制的文件列表，扩展名都不认识（如文件夹）时使用
+FILE_LIST_CATEGORY = "File"
+# 置信度达到该值且其余规则不可能更高时提前结束
+SHORT_CIRCUIT_CONFIDENCE = 0.9
+
+# 类别体系：分类结果 → 侧栏类型分组，侧栏与列表筛选共用
+SIDEBAR_GROUPS = ("text", "image", "url", "code")
+CATEGORY_GROUPS = {
+    "text": "text",
+    "business": "text",
+    "email": "text",
+    "phone": "text",
+    "id": "text",
+    "note": "text",
+    "url": "url",
+    "link": "url",
+    "website": "url",
+    "code": "code",
+    "snippet": "code",
+    "script": "code",
+    "image": "image",
+    "picture": "image",
+    "screenshot": "image",
+}
+
+
+def category_group(category):
+    """分类结果对应的侧栏分组，未知类别归入 text。"""
+    return CATEGORY_GROUPS.get((category or "").strip().lower(), "text")
+
+
+@dataclass
+class ClassifierRule:
+    """评分规则：score 返回 0~1 的置信度，0 表示不适用。
+
+    max_confidence 为该规则可能给出的最高置信度，用于判断能否提前结束；
+    cost 为相对开销，数值小的规则先执行。
+    """
+
+    name: str
+    category: object
+    score: Callable[[ContentFeatures], float]
+    max_confidence: float
+    cost: int = 10
+
+
+@dataclass
+class RuleScore:
+    name: str
+    category: str
+    confidence: float
+    cost_ms: float
+
+
+@dataclass
+class ClassificationResult:
+    category: str
+    confidence: float
+    scores: list
+
+
+_rules = []
+_rule_metrics = {}
+
+
+def register_rule(name, category, max_confidence, cost=10):
+    """注册评分规则的装饰器；category 可以是固定类别或根据特征返回类别的函数。"""
+
+    def decorator(func):
+        unregister_rule(name)
+        _rules.append(ClassifierRule(name, category, func, max_confidence, cost))
+        _rules.sort(key=lambda rule: (rule.cost, -rule.max_confidence))
+        return func
+
+    return decorator
+
+
+def unregister_rule(name):
+    _rules[:] = [rule for rule in _rules if rule.name != name]
+    _rule_metrics.pop(name, None)
+
+
+def registered_rules():
+    return [rule.name for rule in _rules]
+
+
+def get_classifier_metrics():
+    """各规则累计调用次数、命中次数与耗时，便于发现真实数据上昂贵的启发式。"""
+    metrics = {}
+    for name, stats in _rule_metrics.items():
+        calls = stats["calls"]
+        metrics[name] = dict(stats, avg_ms=stats["total_ms"] / calls if calls else 0.0)
+    return metrics
 
 
 def classify_content(text):
-    if text.strip() == "":
-        return "Text"
-    ext_category = _category_from_extension(text)
-    if ext_category:
-        return ext_category
-    sample = (text or "").strip()
-    if not sample:
-        return "Text"
-
-    if _looks_like_code(sample):
-        return "Code"
+    """text 可以是 str 或与检测器共享的 NormalizedText，分类基于规范化视图。"""
+    return classify_features(extract_features(text))
+
+
+def classify_file_list(paths):
+    """剪贴板带有文件列表时按真实路径分类，不再从文本里猜测扩展名。
+
+    多个文件取出现最多的类别，数量相同时以先出现者为准。
+    """
+    counts = Counter()
+    for path in paths:
+        ext = os.path.splitext(path.rstrip("/\\"))[1].lstrip(".").lower()
+        category = FILE_EXT_CATEGORIES.get(ext)
+        if category:
+            counts[category] += 1
+    if not counts:
+        return FILE_LIST_CATEGORY
+    return counts.most_common(1)[0][0]
+
+
+def classify_features(features: ContentFeatures):
+    return classify_scored(features).category
+
+
+def classify_scored(features: ContentFeatures, threshold=SHORT_CIRCUIT_CONFIDENCE):
+    """按开销从低到高执行规则，取置信度最高者。
+
+    当前最高置信度达到 threshold，且剩余规则的 max_confidence 都不超过它时提前结束，
+    因此提前结束不会改变最终结果。
+    """
+    # 只在首尾有界样本上判断，样本为空说明全文只有空白
+    if not features.sample:
+        return ClassificationResult(DEFAULT_CATEGORY, 0.0, [])
+    scores = []
+    best = None
+    rules = list(_rules)
+    for index, rule in enumerate(rules):
+        started = time.perf_counter()
+        confidence = rule.score(features) or 0.0
+        cost_ms = (time.perf_counter() - started) * 1000
+        category = rule.category(features) if callable(rule.category) else rule.category
+        _record_rule(rule.name, cost_ms, confidence > 0)
+        scores.append(RuleScore(rule.name, category, confidence, cost_ms))
+        if confidence > 0 and (best is None or confidence > best.confidence):
+            best = scores[-1]
+        if best is not None and best.confidence >= threshold:
+            remaining = max((other.max_confidence for other in rules[index + 1:]), default=0.0)
+            if remaining <= best.confidence:
+                break
+    if best is None:
+        return ClassificationResult(DEFAULT_CATEGORY, 0.0, scores)
+    return ClassificationResult(best.category, best.confidence, scores)
+
+
+def _record_rule(name, cost_ms, hit):
+    stats = _rule_metrics.setdefault(name, {"calls": 0, "hits": 0, "total_ms": 0.0})
+    stats["calls"] += 1
+    stats["hits"] += int(hit)
+    stats["total_ms"] += cost_ms
+
+
+# 内置规则：置信度的高低沿用原有判定顺序（扩展名 > 代码 > URL > … > 业务关键词）
+
+
+@register_rule("url", "URL", max_confidence=0.9, cost=1)
+def _score_url(features):
+    return 0.9 if features.urls else 0.0
+
+
+@register_rule("email", "Email", max_confidence=0.8, cost=1)
+def _score_email(features):
+    return 0.8 if features.emails else 0.0
+
+
+@register_rule("phone", "Phone", max_confidence=0.75, cost=2)
+def _score_phone(features):
+    phone = compile_pattern(_PHONE_PATTERN)
+    text = features.text
+    return 0.75 if any(phone.search(text, start, end) for start, end in features.digit_runs) else 0.0
+
+
+@register_rule("id_number", "ID", max_confidence=0.7, cost=2)
+def _score_id_number(features):
+    # 17 位数字后接数字或 X
+    text = features.text
+    for start, end in features.digit_runs:
+        if end - start >= 18 or (end - start >= 17 and text[end:end + 1] in ("X", "x")):
+            return 0.7
+    return 0.0
+
+
+@register_rule("business", "Business", max_confidence=0.6, cost=3)
+def _score_business(features):
+    sample = features.sample
+    if any(kw in sample for kw in _BUSINESS_KEYWORDS_ZH):
+        return 0.6
     sample_lower = sample.lower()
+    return 0.6 if any(kw in sample_lower for kw in _BUSINESS_KEYWORDS_EN) else 0.0
+
+
+@register_rule("extension", lambda features: features.extension_category or DEFAULT_CATEGORY, max_confidence=0.98, cost=5)
+def _score_extension(features):
+    return 0.98 if features.extension_category else 0.0
+
+
+@register_rule("code_fallback", "Code", max_confidence=0.85, cost=6)
+def _score_code_fallback(features):
+    return 0.85 if compile_pattern(_CODE_FALLBACK_PATTERN).search(features.sample) else 0.0
+
 
-    if re.search(r'(http|https)://', sample):
-        return "URL"
-    elif re.search(r'^\s*def\s+|\s*class\s+|import\s+|from\s+.*import', sample):
-        return "Code"
-    elif re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', sample):
-        return "Email"
-    elif re.search(r'1[3-9]\d{9}', sample):
-        return "Phone"
-    elif re.search(r'\d{17}[\dXx]', sample):
-        return "ID"
-    elif any(kw in sample for kw in _BUSINESS_KEYWORDS_ZH) or any(
-        kw in sample_lower for kw in _BUSINESS_KEYWORDS_EN
-    ):
-        return "Business"
-    else:
-        return "Text"
+@register_rule("code_markers", "Code", max_confidence=0.95, cost=8)
+def _score_code_markers(features):
+    return 0.95 if features.looks_like_code else 0.0
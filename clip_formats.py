@@ -0,0 +1,115 @@
+# clip_formats.py
+"""剪贴板附加格式：平台格式名到 MIME 的映射、文件列表解析与详情页预览。
+
+复制时只记录可用格式列表（廉价）；HTML / RTF / 文件列表等较重的格式
+只有在策略允许保存时才读取，并单独存放，列表查询不会读到这些数据。
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from urllib.parse import quote, unquote, urlparse
+
+HTML = "text/html"
+RTF = "text/rtf"
+URI_LIST = "text/uri-list"
+# 可单独保存的附加格式，纯文本始终走正常的检测与脱敏流程
+RICH_FORMATS = (HTML, RTF, URI_LIST)
+
+# 各平台 / Qt 的格式名 → 统一的 MIME 类型
+_FORMAT_ALIASES = {
+    "html format": HTML,
+    "public.html": HTML,
+    "apple html pasteboard type": HTML,
+    "rich text format": RTF,
+    "text/richtext": RTF,
+    "application/rtf": RTF,
+    "public.rtf": RTF,
+    "nsrtfpboardtype": RTF,
+    "cf_hdrop": URI_LIST,
+    "public.file-url": URI_LIST,
+    "nsfilenamespboardtype": URI_LIST,
+    "x-special/gnome-copied-files": URI_LIST,
+    "cf_unicodetext": "text/plain",
+    "public.utf8-plain-text": "text/plain",
+    "utf8_string": "text/plain",
+    "text/plain;charset=utf-8": "text/plain",
+}
+_CF_HTML_FRAGMENT = re.compile(rb"StartFragment:(\d+).*?EndFragment:(\d+)", re.S)
+
+
+@dataclass
+class FormatSnapshot:
+    """一次复制的格式信息：available 为全部可用格式，data 为实际读取到的附加格式内容。"""
+
+    available: list = field(default_factory=list)
+    data: dict = field(default_factory=dict)
+
+    def file_paths(self):
+        payload = self.data.get(URI_LIST)
+        return parse_uri_list(payload) if payload else []
+
+
+def normalize_format(name):
+    value = (name or "").strip()
+    # Qt 在 Windows 上以 application/x-qt-windows-mime;value="..." 暴露原生格式
+    if value.startswith("application/x-qt-windows-mime;value="):
+        value = value.split("=", 1)[1].strip('"')
+    return _FORMAT_ALIASES.get(value.lower(), value.lower())
+
+
+def normalize_formats(names):
+    """去重并保持原有顺序。"""
+    return list(dict.fromkeys(normalize_format(name) for name in names if name))
+
+
+def wanted_formats(available, enabled):
+    return [mime for mime in RICH_FORMATS if mime in enabled and mime in available]
+
+
+def paths_to_uri_list(paths):
+    return "".join(f"file://{_quote_path(path)}\r\n" for path in paths).encode("utf-8")
+
+
+def _quote_path(path):
+    path = path.replace("\\", "/")
+    if not path.startswith("/"):
+        # Windows 盘符路径
+        path = "/" + path
+    return quote(path, safe="/:")
+
+
+def parse_uri_list(data):
+    """RFC 2483 text/uri-list：每行一个 URI，# 开头为注释；只保留本地文件路径。"""
+    if isinstance(data, (bytes, bytearray)):
+        data = bytes(data).decode("utf-8", "replace")
+    paths = []
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or line in ("copy", "cut"):
+            # GNOME 的 x-special/gnome-copied-files 首行为 copy / cut
+            continue
+        parsed = urlparse(line)
+        if parsed.scheme not in ("file", ""):
+            continue
+        path = unquote(parsed.path)
+        if len(path) > 2 and path[0] == "/" and path[2] == ":":
+            path = path[1:]
+        if path:
+            paths.append(path)
+    return paths
+
+
+def format_preview(mime, data):
+    """详情页展示用的文本：HTML 取 CF_HTML 片段，RTF 原样按 Latin-1 展示，文件列表每行一个路径。"""
+    if mime == URI_LIST:
+        return "\n".join(parse_uri_list(data))
+    if mime == HTML:
+        match = _CF_HTML_FRAGMENT.search(data[:512])
+        if match:
+            data = data[int(match.group(1)): int(match.group(2))]
+        return data.decode("utf-8", "replace")
+    if mime == RTF:
+        return data.decode("latin-1")
+    return data.decode("utf-8", "replace")
@@ -1,7 +1,18 @@
 # clipboard_monitor.py
+import atexit
+import base64
+import ctypes
+import ctypes.util
+import hashlib
+import os
+import shutil
+import subprocess
 import sys
+import threading
 import time
 
+from clip_formats import HTML, RTF, URI_LIST, normalize_formats, paths_to_uri_list
+
 try:
     import pyperclip
 except ImportError:  # noqa: F401
@@ -9,8 +20,113 @@ except ImportError:  # noqa: F401
 
 _error_reported = False
 
-def get_clipboard_text():
-    if sys.platform == "win32":
+# 能可靠收到外部应用复制通知的 Qt 平台插件：Windows 使用系统剪贴板监听，X11 使用 XFixes 选区事件。
+# macOS 与 Wayland 上后台窗口收不到其他应用的复制通知，只能轮询
+EVENT_PLATFORMS = ("windows", "xcb")
+
+
+class BackendUnavailable(RuntimeError):
+    """读取后端在当前环境不可用（缺少依赖或常驻进程已退出），调用方可换用其他后端。"""
+
+
+def supports_change_events(platform_name):
+    return (platform_name or "").lower() in EVENT_PLATFORMS
+
+
+def text_fingerprint(text):
+    """(长度, 128 位 BLAKE2b)：判断内容是否变化时代替保留整段上一条内容。"""
+    data = (text or "").encode("utf-8", "surrogatepass")
+    return len(data), hashlib.blake2b(data, digest_size=16).digest()
+
+
+class ClipboardBackend:
+    """剪贴板读取后端。persistent 表示持有长连接，轮询时无需每次启动子进程。"""
+
+    name = "base"
+    persistent = False
+
+    def read_text(self):
+        raise NotImplementedError
+
+    def change_token(self):
+        """廉价的变化令牌：与上次相同说明剪贴板未变，无需读取正文。
+
+        返回 None 表示后端没有这类令牌，调用方只能读取正文后比较指纹。
+        """
+        return None
+
+    def read_image(self):
+        """剪贴板中没有文本时读取图片的原始编码数据（bytes），不支持或没有图片时返回 None。"""
+        return None
+
+    def list_formats(self):
+        """当前剪贴板提供的格式（统一为 MIME），只列出名称，不读取内容。"""
+        return []
+
+    def read_format(self, mime):
+        """读取一种附加格式（clip_formats.RICH_FORMATS 之一）的原始字节，没有时返回 None。"""
+        return None
+
+    def supports_listener(self):
+        return False
+
+    def set_listener(self, callback):
+        """注册变化回调（在后端自己的线程中调用），传入 None 取消。"""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class Win32ClipboardBackend(ClipboardBackend):
+    name = "win32"
+    persistent = True
+    _CF_HDROP = 15
+    _REGISTERED = {HTML: "HTML Format", RTF: "Rich Text Format"}
+
+    def change_token(self):
+        # 系统维护的剪贴板序列号，每次内容变化递增
+        return ctypes.windll.user32.GetClipboardSequenceNumber()
+
+    def list_formats(self):
+        import win32clipboard
+        names = []
+        win32clipboard.OpenClipboard()
+        try:
+            fmt = win32clipboard.EnumClipboardFormats(0)
+            while fmt:
+                if fmt == self._CF_HDROP:
+                    names.append("CF_HDROP")
+                elif fmt == win32clipboard.CF_UNICODETEXT:
+                    names.append("CF_UNICODETEXT")
+                elif fmt >= 0xC000:
+                    # 注册格式才有名称，其余标准格式（位图、区域设置等）不影响附加格式的选择
+                    names.append(win32clipboard.GetClipboardFormatName(fmt))
+                fmt = win32clipboard.EnumClipboardFormats(fmt)
+        finally:
+            win32clipboard.CloseClipboard()
+        return normalize_formats(names)
+
+    def read_format(self, mime):
+        import win32clipboard
+        win32clipboard.OpenClipboard()
+        try:
+            if mime == URI_LIST:
+                if not win32clipboard.IsClipboardFormatAvailable(self._CF_HDROP):
+                    return None
+                return paths_to_uri_list(win32clipboard.GetClipboardData(self._CF_HDROP))
+            name = self._REGISTERED.get(mime)
+            if name is None:
+                return None
+            fmt = win32clipboard.RegisterClipboardFormat(name)
+            if not win32clipboard.IsClipboardFormatAvailable(fmt):
+                return None
+            data = win32clipboard.GetClipboardData(fmt)
+            return data.rstrip(b"\0") if isinstance(data, bytes) else None
+        finally:
+            win32clipboard.CloseClipboard()
+
+    def read_text(self):
         import win32clipboard
         try:
             win32clipboard.OpenClipboard()
@@ -19,22 +135,281 @@ def get_clipboard_text():
             return data
         except:
             return ""
-    else:
+
+
+class WlPasteWatchBackend(ClipboardBackend):
+    """Wayland：常驻一个 `wl-paste --watch` 进程，剪贴板变化时由它推送内容。
+
+    每次变化输出一行 base64 文本；密码管理器标记为 sensitive 的内容只输出 "-"，不读取正文。
+    读取直接返回最近一次推送的内容，空闲时没有任何子进程或唤醒。
+    """
+
+    name = "wl-paste"
+    persistent = True
+    _WATCH_SCRIPT = '[ "$CLIPBOARD_STATE" = sensitive ] && { cat >/dev/null; echo -; exit 0; }; base64 -w0; echo'
+
+    def __init__(self, executable="wl-paste"):
+        self._latest = ""
+        # 每收到一次推送（即一个新的剪贴板 offer）递增，作为变化令牌
+        self._offer = 0
+        self._lock = threading.Lock()
+        self._listener = None
+        self._process = subprocess.Popen(
+            [executable, "--type", "text", "--watch", "sh", "-c", self._WATCH_SCRIPT],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self._reader = threading.Thread(target=self._read_loop, name="wl-paste-watch", daemon=True)
+        self._reader.start()
+
+    def read_text(self):
+        if self._process.poll() is not None:
+            raise BackendUnavailable(f"wl-paste --watch 已退出（返回码 {self._process.returncode}）")
+        with self._lock:
+            return self._latest
+
+    def change_token(self):
+        with self._lock:
+            return self._offer
+
+    def supports_listener(self):
+        return True
+
+    def set_listener(self, callback):
+        self._listener = callback
+
+    def close(self):
+        self._listener = None
+        if self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+    def _read_loop(self):
+        for line in self._process.stdout:
+            line = line.strip()
+            if line == b"-":
+                print("[调试] 剪贴板内容被标记为敏感，已跳过")
+                continue
+            try:
+                text = base64.b64decode(line).decode("utf-8", "replace")
+            except ValueError:
+                continue
+            with self._lock:
+                self._latest = text
+                self._offer += 1
+            listener = self._listener
+            if listener is not None:
+                listener(text)
+
+
+class MacPasteboardBackend(ClipboardBackend):
+    """macOS：通过 AppKit 直接访问 NSPasteboard，changeCount 作为变化令牌。"""
+
+    name = "nspasteboard"
+    persistent = True
+
+    def __init__(self):
+        from AppKit import NSPasteboard, NSPasteboardTypePNG, NSPasteboardTypeString, NSPasteboardTypeTIFF
+
+        self._pasteboard = NSPasteboard.generalPasteboard()
+        self._string_type = NSPasteboardTypeString
+        # 截图工具多提供 PNG，系统截图与部分应用只提供 TIFF
+        self._image_types = (NSPasteboardTypePNG, NSPasteboardTypeTIFF)
+        self._rich_types = {HTML: "public.html", RTF: "public.rtf"}
+
+    def change_token(self):
+        return self._pasteboard.changeCount()
+
+    def read_text(self):
+        return self._pasteboard.stringForType_(self._string_type) or ""
+
+    def list_formats(self):
+        return normalize_formats(str(item) for item in (self._pasteboard.types() or []))
+
+    def read_format(self, mime):
+        if mime == URI_LIST:
+            paths = self._pasteboard.propertyListForType_("NSFilenamesPboardType")
+            return paths_to_uri_list([str(path) for path in paths]) if paths else None
+        pasteboard_type = self._rich_types.get(mime)
+        if pasteboard_type is None:
+            return None
+        data = self._pasteboard.dataForType_(pasteboard_type)
+        return bytes(data) if data is not None else None
+
+    def read_image(self):
+        for image_type in self._image_types:
+            data = self._pasteboard.dataForType_(image_type)
+            if data is not None:
+                return bytes(data)
+        return None
+
+
+class _XFixesSelectionNotifyEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("serial", ctypes.c_ulong),
+        ("send_event", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("window", ctypes.c_ulong),
+        ("subtype", ctypes.c_int),
+        ("owner", ctypes.c_ulong),
+        ("selection", ctypes.c_ulong),
+        ("timestamp", ctypes.c_ulong),
+        ("selection_timestamp", ctypes.c_ulong),
+    ]
+
+
+class X11SelectionTokens:
+    """X11：用独立的 X 连接通过 XFixes 订阅 CLIPBOARD 选区变化，令牌为 (所有者窗口, 选区时间戳)。
+
+    同一应用再次复制也会重新设置选区并产生新的时间戳；查询只处理已到达的事件，不阻塞、不往返。
+    """
+
+    # XFixesSetSelectionOwnerNotifyMask | XFixesSelectionWindowDestroyNotifyMask | XFixesSelectionClientCloseNotifyMask
+    _EVENT_MASK = 0x7
+
+    def __init__(self):
+        xlib = ctypes.cdll.LoadLibrary(ctypes.util.find_library("X11") or "libX11.so.6")
+        xfixes = ctypes.cdll.LoadLibrary(ctypes.util.find_library("Xfixes") or "libXfixes.so.3")
+        xlib.XOpenDisplay.restype = ctypes.c_void_p
+        xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        xlib.XInternAtom.restype = ctypes.c_ulong
+        xlib.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+        xlib.XGetSelectionOwner.restype = ctypes.c_ulong
+        xlib.XGetSelectionOwner.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        xlib.XPending.argtypes = [ctypes.c_void_p]
+        xlib.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        xfixes.XFixesQueryExtension.argtypes = [
+            ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)
+        ]
+        xfixes.XFixesSelectSelectionInput.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_ulong
+        ]
+        display = xlib.XOpenDisplay(None)
+        if not display:
+            raise OSError("无法连接 X 服务器")
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        if not xfixes.XFixesQueryExtension(display, ctypes.byref(event_base), ctypes.byref(error_base)):
+            xlib.XCloseDisplay(display)
+            raise OSError("X 服务器不支持 XFixes 扩展")
+        selection = xlib.XInternAtom(display, b"CLIPBOARD", False)
+        xfixes.XFixesSelectSelectionInput(display, xlib.XDefaultRootWindow(display), selection, self._EVENT_MASK)
+        self._xlib = xlib
+        self._display = display
+        # XFixesSelectionNotify 的子类型编号为 0，事件类型即扩展的 event_base
+        self._notify_type = event_base.value
+        # XEvent 是 24 个 long 的联合体
+        self._event = (ctypes.c_long * 24)()
+        self._token = (xlib.XGetSelectionOwner(display, selection), 0)
+
+    def token(self):
+        xlib, display = self._xlib, self._display
+        if display is None:
+            return None
+        while xlib.XPending(display):
+            xlib.XNextEvent(display, ctypes.byref(self._event))
+            event = _XFixesSelectionNotifyEvent.from_buffer(self._event)
+            if event.type == self._notify_type:
+                self._token = (event.owner, event.selection_timestamp or event.timestamp)
+        return self._token
+
+    def close(self):
+        if self._display is not None:
+            self._xlib.XCloseDisplay(self._display)
+            self._display = None
+
+
+class PyperclipBackend(ClipboardBackend):
+    """兜底后端：Linux 上每次读取都会启动 xclip / xsel / wl-paste 子进程。
+
+    X11 会话中附带 XFixes 选区令牌，剪贴板未变化时轮询不再启动子进程读取正文。
+    """
+
+    name = "pyperclip"
+
+    def __init__(self):
+        self._x11_tokens = None
+        if sys.platform.startswith("linux") and os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+            try:
+                self._x11_tokens = X11SelectionTokens()
+            except OSError as exc:
+                print(f"[调试] XFixes 选区令牌不可用，每次轮询读取正文：{exc}")
+
+    def change_token(self):
+        return self._x11_tokens.token() if self._x11_tokens is not None else None
+
+    def read_text(self):
         if pyperclip is None:
-            raise RuntimeError("缺少依赖 pyperclip，请运行 `pip install pyperclip` 后重试。")
+            raise BackendUnavailable("缺少依赖 pyperclip，请运行 `pip install pyperclip` 后重试。")
         return pyperclip.paste()
 
+    def close(self):
+        if self._x11_tokens is not None:
+            self._x11_tokens.close()
+            self._x11_tokens = None
+
+
+def create_backend(preferred="auto"):
+    """按平台选择读取后端：Windows / macOS 直接调用系统 API，Wayland 使用常驻 wl-paste，其余退回 pyperclip。"""
+    if preferred == "pyperclip":
+        return PyperclipBackend()
+    if sys.platform == "win32":
+        return Win32ClipboardBackend()
+    if sys.platform == "darwin":
+        try:
+            return MacPasteboardBackend()
+        except ImportError:
+            print("[调试] 未安装 pyobjc（AppKit），退回 pyperclip")
+    if sys.platform.startswith("linux") and os.environ.get("WAYLAND_DISPLAY") and shutil.which("wl-paste"):
+        try:
+            return WlPasteWatchBackend()
+        except OSError as exc:
+            print(f"[调试] 启动 wl-paste --watch 失败，退回 pyperclip：{exc}")
+    return PyperclipBackend()
+
+
+_default_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _default_backend
+    with _backend_lock:
+        if _default_backend is None:
+            _default_backend = create_backend()
+            print(f"[调试] 剪贴板读取后端：{_default_backend.name}")
+            atexit.register(_default_backend.close)
+        return _default_backend
+
+
+def get_clipboard_text():
+    return get_backend().read_text()
+
+
 def monitor_clipboard(callback, interval=0.8, stop_event=None):
     global _error_reported
-    last = ""
+    last = text_fingerprint("")
+    last_token = None
     while True:
         if stop_event is not None and stop_event.is_set():
             break
         try:
-            current = get_clipboard_text()
-            if current != last and current.strip():
-                callback(current)
-                last = current
+            backend = get_backend()
+            token = backend.change_token()
+            if token is None or token != last_token:
+                current = backend.read_text()
+                fingerprint = text_fingerprint(current)
+                if fingerprint != last and current.strip():
+                    callback(current)
+                    last = fingerprint
+                last_token = token
             if _error_reported:
                 _error_reported = False
         except Exception as e:
@@ -8,10 +8,32 @@ DEFAULT_CONFIG = {
     # 剪贴板监控
     "enable_monitoring": True,
     "monitor_images": True,
+    "image_dedup_distance": 4,  # 感知哈希汉明距离不超过该值的图片视为近似重复，不再入库；0 表示仅完全相同
     "monitor_urls": True,
     "monitor_code": True,
-    "excluded_apps": [],
-    "poll_interval": 0.8,  # 剪贴板轮询间隔（秒）
+    "excluded_apps": [],  # 完全忽略这些应用的复制内容（等同 app_policies 中的 ignore）
+    # 按应用的捕获策略：应用名（大小写不敏感，可用 * 通配）→ ignore / metadata_only / mask_all / no_raw
+    "app_policies": {},
+    "poll_interval": 0.8,  # 基础轮询间隔（秒），仅轮询模式使用
+    "poll_interval_active": 0.3,  # 活跃间隔（秒）：内容刚变化、连续复制时临时收紧到此间隔
+    "poll_interval_max": 3.0,  # 轮询间隔上限（秒）：持续无变化时指数退避到此间隔
+    "poll_idle_seconds": 60,  # 系统无键鼠输入超过该秒数视为空闲，直接按上限轮询
+    # 复制时额外读取并保存的格式；只对未受应用策略限制、且未检测到敏感信息（或开启保存原文）的内容生效
+    "capture_formats": ["text/html", "text/rtf", "text/uri-list"],
+    "clipboard_backend": "auto",  # auto / event / poll，auto 在支持变化通知的平台上使用事件驱动
+    "analysis_pool_enabled": True,  # 大内容在独立进程中检测与分类
+    "analysis_pool_threshold_kb": 256,  # 超过该大小（KB）的内容交给分析进程
+    "analysis_pool_timeout": 10.0,  # 分析进程单条超时（秒），超时后重启进程并保守脱敏
+    "analysis_cache_size": 256,  # 分析结果缓存条目上限（按内容指纹）
+    "analysis_cache_ttl": 600,  # 分析结果缓存有效期（秒）
+    "incremental_analysis_enabled": True,  # 新内容在上一条基础上增删时只重新检测变化部分
+    "incremental_analysis_min_kb": 4,  # 小于该大小（KB）的内容直接全文分析
+    # 捕获后各阶段（analysis / persistence / notify / deferred）的覆盖设置，
+    # 如 {"analysis": {"workers": 2, "capacity": 32, "policy": "coalesce"}}，策略为 drop_oldest / coalesce / block
+    "capture_pipeline_stages": {},
+    "capture_pipeline_drain_timeout": 10.0,  # 停止监控时等待流水线处理完积压内容的最长秒数
+    "capture_soft_limit_kb": 1024,  # 超过该大小（KB）先保存首尾预览，全文分析在后台完成；0 表示不限制
+    "capture_hard_limit_kb": 32768,  # 超过该大小（KB）不分析、不保存正文，只记录大小与摘要；0 表示不限制
 
     # 数据与存储
     "save_raw_content": False,
@@ -19,12 +41,17 @@ DEFAULT_CONFIG = {
     "auto_cleanup": False,
     "cleanup_days": 30,
     "storage_location": "local",
+    "thumbnail_cache_mb": 64,  # 图片缩略图磁盘缓存上限（MB），超出后删除最久未使用的
+    "thumbnail_workers": 2,  # 生成缩略图的后台线程数
 
     # 隐私与安全
     "hide_passwords": True,
     "hide_credit_cards": True,
     "encrypt_data": False,
     "custom_sensitive_keywords": [],
+    "regex_backend": "auto",  # auto / re2 / re，auto 在安装 re2 时使用线性时间引擎
+    "detection_time_budget_ms": 500,  # 单条内容检测耗时上限，超出后保守脱敏
+    "region_rule_packs": ["cn"],  # 启用的地区检测规则包：cn / us_ssn / eu_iban / jp_my_number
 
     # 通知提示
     "show_notifications": True,
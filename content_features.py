@@ -0,0 +1,426 @@
+# content_features.py
+"""单次扫描提取的内容特征，供分类器与敏感检测共享。"""
+
+from __future__ import annotations
+
+import bisect
+import os
+import re
+from dataclasses import dataclass, field
+from functools import cached_property
+
+from regex_engine import compile_pattern
+from text_normalizer import NormalizedText, aligned_view, as_normalized, normalize_text
+
+# 扩展名到内容类别的映射，文件名 / 路径类内容按扩展名归类
+FILE_EXT_CATEGORIES = {
+    # 图片
+    "png": "Image",
+    "jpg": "Image",
+    "jpeg": "Image",
+    "gif": "Image",
+    "bmp": "Image",
+    "webp": "Image",
+    "tif": "Image",
+    "tiff": "Image",
+    "svg": "Image",
+    "heic": "Image",
+    "heif": "Image",
+    "psd": "Image",
+    "ai": "Image",
+    "eps": "Image",
+    # 代码
+    "py": "Code",
+    "pyw": "Code",
+    "ipynb": "Code",
+    "js": "Code",
+    "jsx": "Code",
+    "ts": "Code",
+    "tsx": "Code",
+    "java": "Code",
+    "c": "Code",
+    "cpp": "Code",
+    "cc": "Code",
+    "h": "Code",
+    "hpp": "Code",
+    "cs": "Code",
+    "go": "Code",
+    "rs": "Code",
+    "swift": "Code",
+    "kt": "Code",
+    "kts": "Code",
+    "php": "Code",
+    "rb": "Code",
+    "pl": "Code",
+    "sh": "Code",
+    "bash": "Code",
+    "ps1": "Code",
+    "sql": "Code",
+    "json": "Code",
+    "yaml": "Code",
+    "yml": "Code",
+    "xml": "Code",
+    "css": "Code",
+    "scss": "Code",
+    "less": "Code",
+    # 文档
+    "txt": "Document",
+    "md": "Document",
+    "doc": "Document",
+    "docx": "Document",
+    "rtf": "Document",
+    "odt": "Document",
+    "pdf": "Document",
+    "tex": "Document",
+    "epub": "Document",
+    # 表格
+    "xls": "Spreadsheet",
+    "xlsx": "Spreadsheet",
+    "xlsm": "Spreadsheet",
+    "ods": "Spreadsheet",
+    "csv": "Spreadsheet",
+    # 演示
+    "ppt": "Presentation",
+    "pptx": "Presentation",
+    "odp": "Presentation",
+    "key": "Presentation",
+    # 压缩包
+    "zip": "Archive",
+    "rar": "Archive",
+    "7z": "Archive",
+    "tar": "Archive",
+    "gz": "Archive",
+    "tgz": "Archive",
+    "bz2": "Archive",
+    "xz": "Archive",
+    "lz": "Archive",
+    "cab": "Archive",
+    "iso": "Archive",
+    # 音频
+    "mp3": "Audio",
+    "wav": "Audio",
+    "flac": "Audio",
+    "aac": "Audio",
+    "ogg": "Audio",
+    "m4a": "Audio",
+    "aiff": "Audio",
+    # 视频
+    "mp4": "Video",
+    "mov": "Video",
+    "avi": "Video",
+    "mkv": "Video",
+    "wmv": "Video",
+    "flv": "Video",
+    "webm": "Video",
+    "mts": "Video",
+    # 可执行文件
+    "exe": "Executable",
+    "msi": "Executable",
+    "apk": "Executable",
+    "app": "Executable",
+    "dmg": "Executable",
+    "pkg": "Executable",
+    "deb": "Executable",
+    "rpm": "Executable",
+    "bat": "Executable",
+    # 字体
+    "ttf": "Font",
+    "otf": "Font",
+    "woff": "Font",
+    "woff2": "Font",
+}
+
+# 以下规则经由 regex_engine 编译，可用时走线性时间的 RE2 后端
+_CODE_LINE_START_PATTERN = (
+    r"^\s*(def|class|import|from|for|while|if|elif|else|try|except|with|return|lambda|"
+    r"package|using|public|private|protected|interface|enum|namespace)\b"
+)
+_CODE_ASSIGN_CALL_PATTERN = r"=\s*[^=]+\([^)]*\)"
+_CODE_KEYWORD_PATTERN = (
+    r"\b(function|console\.log|System\.out\.println|print\s*\(|async\s+def|await|var\s+\w+|let\s+\w+|const\s+\w+)\b"
+)
+_STRUCTURAL_PATTERN = r"[{}\[\]]"
+_TOKEN_PATTERN = r'[^\s"\'<>]+'
+_INVALID_NAME_PATTERN = r"[^\w\-.]"
+_URL_PATTERN = r"(?:http|https)://[^\s<>\"']*"
+_EMAIL_PATTERN = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
+# 邮箱只在 @ 附近的有界窗口内匹配，避免超长 token 上的回溯
+_EMAIL_WINDOW = (64, 256)
+# 只记录长度不小于手机号的数字串，手机号、身份证、银行卡规则都以此为前提
+_DIGIT_RUN_PATTERN = r"\d{11,}"
+# 结构性代码特征达到该数量即视为代码
+CODE_MARKER_THRESHOLD = 2
+# 分类只检查首尾有界样本，多 MB 的内容也只扫描固定长度
+SAMPLE_HEAD_CHARS = 16 * 1024
+SAMPLE_TAIL_CHARS = 4 * 1024
+
+
+@dataclass
+class ContentFeatures:
+    """一条内容的共享特征，区间均为规范化视图中的 [start, end)。"""
+
+    view: NormalizedText
+    urls: list = field(default_factory=list)
+    emails: list = field(default_factory=list)
+    digit_runs: list = field(default_factory=list)
+    # 分类用的首尾样本（已去除首尾空白）与全文行数
+    sample: str = ""
+    line_count: int = 0
+
+    @property
+    def text(self):
+        return self.view.text
+
+    @property
+    def longest_digit_run(self):
+        return max((end - start for start, end in self.digit_runs), default=0)
+
+    # 以下特征只服务于分类，首次访问时才在样本上计算，
+    # 分类规则提前命中时更昂贵的特征不会被计算
+    @cached_property
+    def extension_category(self):
+        return _category_from_extension(self.sample) if self.sample else None
+
+    @cached_property
+    def code_markers(self):
+        return _count_code_markers(self.sample) if self.sample else 0
+
+    @property
+    def looks_like_code(self):
+        return self.code_markers >= CODE_MARKER_THRESHOLD
+
+
+def extract_features(text):
+    """对规范化视图做一次扫描，提取 URL、邮箱、长数字串与分类样本。
+
+    URL、邮箱与数字串会被检测器复用，需要覆盖全文；扩展名与代码特征只服务于分类，
+    按需在首尾有界样本上计算并尽早退出。
+    """
+    view = as_normalized(text)
+    features = ContentFeatures(view=view)
+    body = view.text
+    if not body or body.isspace():
+        return features
+    features.urls, features.emails, features.digit_runs = _scan_spans(body)
+    features.line_count = body.count("\n") + 1
+    features.sample = bounded_sample(body).strip()
+    return features
+
+
+def portable_spans(features):
+    """视图就是原文时返回 (urls, emails, digit_runs, line_count)，供子进程把特征传回主进程。
+
+    视图与原文不同时主进程无法廉价重建视图，返回 None。
+    """
+    if features is None or not features.view.is_identity:
+        return None
+    return features.urls, features.emails, features.digit_runs, features.line_count
+
+
+def features_from_spans(text, spans):
+    """由 portable_spans 的结果重建特征，只需在 text 首尾取样本。"""
+    urls, emails, digit_runs, line_count = spans
+    features = ContentFeatures(view=NormalizedText(text, text))
+    if line_count:
+        features.urls, features.emails, features.digit_runs = list(urls), list(emails), list(digit_runs)
+        features.line_count = line_count
+        features.sample = bounded_sample(text).strip()
+    return features
+
+
+def feature_baseline(features):
+    """增量更新所需的紧凑基准 (length, is_identity, urls, emails, digit_runs)，不保留正文。
+
+    规范化改变了长度（视图与原文不再逐字符对齐）时无法增量更新，返回 None。
+    """
+    if features is None or not features.view.is_aligned:
+        return None
+    return (
+        len(features.view.original),
+        features.view.is_identity,
+        features.urls,
+        features.emails,
+        features.digit_runs,
+    )
+
+
+def update_features(baseline, text, prefix, suffix, margin=256, max_context=8192):
+    """在上一条内容的特征基准上增量更新：text 与之共享长度为 prefix 的前缀和 suffix 的后缀。
+
+    baseline 为 feature_baseline 的结果。变化区间向外扩展到空白处重新扫描，区间外的旧命中按位移平移，
+    分类样本只取新内容首尾，扫描开销与变化区间而非全文长度成正比。新内容的规范化不再对齐，
+    或 max_context 内找不到安全边界时返回 None，由调用方完整提取。
+    """
+    previous_length, previous_identity, previous_urls, previous_emails, previous_digit_runs = baseline
+    length = len(text)
+    shift = length - previous_length
+    start = _window_start(text, max(0, prefix - margin), max_context)
+    # 终点至少深入共享后缀一个邮箱窗口，其前方的 @ 只会落在新旧相同的后缀内
+    end = _window_end(text, min(length, length - suffix + max(margin, _EMAIL_WINDOW[1])), max_context)
+    if start is None or end is None:
+        return None
+    window = normalize_text(text[start:end])
+    if not window.is_aligned:
+        return None
+    old_end = end - shift
+    if previous_identity and window.is_identity:
+        # 常见的纯 ASCII 日志：视图就是原文，无需拼接
+        view = NormalizedText(text, text)
+    else:
+        # 共享区间来自逐字符对齐的旧视图，窗口也已对齐，整段一对一翻译即得新视图
+        view = aligned_view(text)
+    features = ContentFeatures(view=view)
+    body = view.text
+    sample = bounded_sample(body).strip()
+    if not sample:
+        return features
+    urls, emails, digit_runs = _scan_spans(window.text)
+    features.urls = _splice_spans(previous_urls, urls, start, old_end, shift)
+    features.emails = _splice_spans(previous_emails, emails, start, old_end, shift)
+    features.digit_runs = _splice_spans(previous_digit_runs, digit_runs, start, old_end, shift)
+    features.line_count = body.count("\n") + 1
+    features.sample = sample
+    return features
+
+
+def _window_start(text, position, max_context):
+    """向前找到空白处，且其前方一个邮箱窗口内没有 @（否则更早的窗口会伸进重扫区间）。"""
+    floor = max(0, position - max_context)
+    after = _EMAIL_WINDOW[1]
+    while True:
+        while position > floor and not text[position - 1].isspace():
+            position -= 1
+        if position > 0 and not text[position - 1].isspace():
+            return None
+        at = text.rfind("@", max(0, position - after + 1), position)
+        if at == -1:
+            return position
+        position = at
+
+
+def _window_end(text, position, max_context):
+    """向后找到空白处，且其前方一个邮箱窗口内没有 @，区间后的旧命中才能原样沿用。"""
+    ceiling = min(len(text), position + max_context)
+    after = _EMAIL_WINDOW[1]
+    while True:
+        while position < ceiling and not text[position].isspace():
+            position += 1
+        if position == len(text):
+            return position
+        if not text[position].isspace():
+            return None
+        at = text.rfind("@", max(0, position - after + 1), position)
+        if at == -1:
+            return position
+        position = min(len(text), at + after)
+
+
+def _splice_spans(previous, window_spans, start, old_end, shift):
+    # 扫描边界落在空白处，旧区间要么整段在窗口前，要么整段在窗口后
+    head = bisect.bisect_left(previous, (start,))
+    tail = bisect.bisect_left(previous, (old_end,))
+    return (
+        previous[:head]
+        + [(span_start + start, span_end + start) for span_start, span_end in window_spans]
+        + [(span_start + shift, span_end + shift) for span_start, span_end in previous[tail:]]
+    )
+
+
+def _scan_spans(body):
+    """返回 (urls, emails, digit_runs)，区间相对 body；各类命中都不跨越空白。"""
+    urls = [match.span() for match in compile_pattern(_URL_PATTERN).finditer(body)] if "://" in body else []
+    emails = _find_emails(body) if "@" in body else []
+    digit_runs = [match.span() for match in compile_pattern(_DIGIT_RUN_PATTERN).finditer(body)]
+    return urls, emails, digit_runs
+
+
+def bounded_sample(text, head=SAMPLE_HEAD_CHARS, tail=SAMPLE_TAIL_CHARS):
+    """取首尾样本，尽量在换行处截断，避免把中间的半行当作代码特征。"""
+    if len(text) <= head + tail:
+        return text
+    head_end = text.rfind("\n", 0, head)
+    if head_end <= 0:
+        head_end = head
+    tail_start = text.find("\n", len(text) - tail)
+    if tail_start == -1:
+        tail_start = len(text) - tail
+    return text[:head_end] + "\n" + text[tail_start:]
+
+
+def _find_emails(text):
+    pattern = compile_pattern(_EMAIL_PATTERN)
+    before, after = _EMAIL_WINDOW
+    spans = []
+    last_end = 0
+    pos = text.find("@")
+    while pos != -1:
+        if pos >= last_end:
+            start = max(last_end, pos - before)
+            end = min(len(text), pos + after)
+            for match in pattern.finditer(text, start, end):
+                if match.end() == end < len(text):
+                    # 命中被窗口右边界截断：以命中自身的 @ 重新划定窗口再匹配一次
+                    anchor_end = min(len(text), text.find("@", match.start()) + after)
+                    match = pattern.match(text, match.start(), anchor_end) or match
+                    last_end = match.end()
+                    spans.append(match.span())
+                    break
+                last_end = match.end()
+                spans.append(match.span())
+        pos = text.find("@", pos + 1)
+    return spans
+
+
+def _category_from_extension(text):
+    if "." not in text:
+        return None
+    invalid_name = compile_pattern(_INVALID_NAME_PATTERN)
+    # 逐个产出 token，命中第一个已知扩展名即返回
+    for match in compile_pattern(_TOKEN_PATTERN).finditer(text):
+        token = match.group(0)
+        if "." not in token:
+            continue
+        token = token.strip('.,;:!?()[]{}\'"')
+        if not token:
+            continue
+        name, ext = os.path.splitext(token)
+        if not ext:
+            continue
+        if not name or invalid_name.search(name):
+            continue
+        category = FILE_EXT_CATEGORIES.get(ext.lstrip(".").lower())
+        if category:
+            return category
+    return None
+
+
+def _count_code_markers(sample):
+    # 任一强特征直接达到阈值；否则按行累计括号、分号与箭头等结构特征
+    if compile_pattern(_CODE_LINE_START_PATTERN, re.IGNORECASE | re.MULTILINE).search(sample):
+        return CODE_MARKER_THRESHOLD
+    if compile_pattern(_CODE_ASSIGN_CALL_PATTERN).search(sample):
+        return CODE_MARKER_THRESHOLD
+    if compile_pattern(_CODE_KEYWORD_PATTERN).search(sample):
+        return CODE_MARKER_THRESHOLD
+    structural = compile_pattern(_STRUCTURAL_PATTERN)
+    hits = 0
+    for line in _iter_lines(sample):
+        if structural.search(line):
+            hits += 1
+        if ";" in line or "->" in line:
+            hits += 1
+        if hits >= CODE_MARKER_THRESHOLD:
+            break
+    return hits
+
+
+def _iter_lines(text):
+    # 按需切分行，达到阈值提前退出时不必切完整个样本
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end == -1:
+            yield text[start:]
+            return
+        yield text[start:end]
+        start = end + 1
@@ -0,0 +1,80 @@
+# core/analysis_cache.py
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+def content_fingerprint(text: str) -> bytes:
+    """内容指纹：128 位 BLAKE2b，足以区分剪贴板内容且计算开销极低。"""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class AnalysisCache:
+    """按内容指纹缓存分析结果，规则或自定义关键词变化时自动失效。"""
+
+    def __init__(self, max_entries=256, ttl=600.0):
+        self._max_entries = max(1, int(max_entries))
+        self._ttl = float(ttl)
+        self._entries: OrderedDict[bytes, tuple[float, tuple]] = OrderedDict()
+        self._rules_key = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, fingerprint: bytes, rules_key):
+        with self._lock:
+            self._sync_rules_key(rules_key)
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                self._misses += 1
+                return None
+            stored_at, result = entry
+            if self._ttl > 0 and time.monotonic() - stored_at > self._ttl:
+                del self._entries[fingerprint]
+                self._evictions += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(fingerprint)
+            self._hits += 1
+            return result
+
+    def put(self, fingerprint: bytes, rules_key, result: tuple):
+        with self._lock:
+            self._sync_rules_key(rules_key)
+            self._entries[fingerprint] = (time.monotonic(), result)
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self):
+        with self._lock:
+            if self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "size": len(self._entries),
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+            }
+
+    def _sync_rules_key(self, rules_key):
+        if rules_key == self._rules_key:
+            return
+        if self._entries:
+            self._invalidations += 1
+            print("[调试] 检测规则或自定义关键词已变化，清空分析缓存")
+        self._entries.clear()
+        self._rules_key = rules_key
@@ -0,0 +1,143 @@
+# core/analysis_pipeline.py
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+
+from classifier import classify_scored
+from content_features import extract_features
+from sensitive_detector import detect_spans_and_mask
+from text_normalizer import normalize_text
+
+
+@dataclass
+class AnalysisContext:
+    """单条内容在各阶段之间传递的状态。"""
+
+    text: str
+    custom_keywords: list = field(default_factory=list)
+    time_budget: float | None = None
+    view: object = None
+    features: object = None
+    masked: str = ""
+    has_sensitive: bool = False
+    types: list = field(default_factory=list)
+    spans: list = field(default_factory=list)
+    category: str = "Text"
+    confidence: float = 0.0
+
+    def result(self):
+        return self.masked, self.has_sensitive, self.types, self.category, self.spans
+
+
+class NormalizeStage:
+    name = "normalize"
+
+    def run(self, context):
+        context.view = normalize_text(context.text)
+
+
+class FeatureStage:
+    name = "features"
+
+    def run(self, context):
+        context.features = extract_features(context.view)
+
+
+class DetectionStage:
+    name = "detection"
+
+    def run(self, context):
+        context.masked, context.has_sensitive, context.types, context.spans = detect_spans_and_mask(
+            context.view,
+            context.custom_keywords,
+            time_budget=context.time_budget,
+            features=context.features,
+        )
+
+
+class ClassificationStage:
+    name = "classification"
+
+    def run(self, context):
+        result = classify_scored(context.features)
+        context.category, context.confidence = result.category, result.confidence
+
+
+def default_stages():
+    return [NormalizeStage(), FeatureStage(), DetectionStage(), ClassificationStage()]
+
+
+class AnalysisPipeline:
+    """一次规范化、一次特征扫描，检测与分类共享结果；阶段可插拔并按顺序执行。
+
+    阶段对象只需提供 name 属性与 run(context) 方法。
+    """
+
+    def __init__(self, stages=None):
+        self._stages = list(stages) if stages is not None else default_stages()
+        self._timings: dict[str, float] = {}
+        self._runs = 0
+
+    def stages(self):
+        return [stage.name for stage in self._stages]
+
+    def add_stage(self, stage, before=None):
+        """插入自定义阶段；before 为已有阶段名，缺省追加到末尾。"""
+        names = self.stages()
+        index = names.index(before) if before in names else len(self._stages)
+        self._stages.insert(index, stage)
+
+    def remove_stage(self, name):
+        self._stages = [stage for stage in self._stages if stage.name != name]
+
+    def analyze(self, text, custom_keywords=None, time_budget=None):
+        """返回 (masked, has_sensitive, types, category, spans)。"""
+        return self.run(text, custom_keywords, time_budget).result()
+
+    def run(self, text, custom_keywords=None, time_budget=None):
+        """执行全部阶段并返回 AnalysisContext，调用方可以继续使用其中的特征。"""
+        context = AnalysisContext(
+            text=text,
+            custom_keywords=list(custom_keywords or []),
+            time_budget=time_budget,
+            masked=text,
+        )
+        for stage in self._stages:
+            started = time.perf_counter()
+            stage.run(context)
+            self._timings[stage.name] = self._timings.get(stage.name, 0.0) + time.perf_counter() - started
+        self._runs += 1
+        return context
+
+    def stats(self):
+        """各阶段累计耗时（毫秒）与平均每条耗时。"""
+        runs = max(1, self._runs)
+        return {
+            "runs": self._runs,
+            "stages": {
+                name: {"total_ms": total * 1000, "avg_ms": total * 1000 / runs}
+                for name, total in self._timings.items()
+            },
+        }
+
+
+_default_pipeline = None
+
+
+def analyze_content(text, custom_keywords=None, time_budget=None):
+    """使用模块级共享的默认流水线分析一条内容。"""
+    return analyze_with_features(text, custom_keywords, time_budget)[0]
+
+
+def analyze_with_features(text, custom_keywords=None, time_budget=None):
+    """返回 (result, features)：features 可作为下一条内容增量分类的基准。"""
+    global _default_pipeline
+    if _default_pipeline is None:
+        _default_pipeline = AnalysisPipeline()
+    context = _default_pipeline.run(text, custom_keywords, time_budget)
+    return context.result(), context.features
+
+
+def pipeline_stats():
+    return _default_pipeline.stats() if _default_pipeline is not None else {"runs": 0, "stages": {}}
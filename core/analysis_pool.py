@@ -0,0 +1,153 @@
+# core/analysis_pool.py
+from __future__ import annotations
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from classifier import classify_content
+from content_features import features_from_spans, portable_spans
+from core.analysis_pipeline import analyze_content, analyze_with_features
+from regex_engine import set_backend
+from rule_packs import refresh_rule_packs
+from sensitive_detector import TIMEOUT_TYPE, conservative_mask, enabled_region_packs, set_region_packs
+
+_WARM_UP_SAMPLE = "warm up 13800000000 user@example.com 127.0.0.1 110101199003078515"
+
+
+def _warm_up(backend, region_packs):
+    # 子进程初始化：选定正则后端与地区规则包，并预编译全部规则
+    set_backend(backend)
+    set_region_packs(region_packs)
+    refresh_rule_packs(force=True)
+    analyze_content(_WARM_UP_SAMPLE)
+
+
+def _ping():
+    return True
+
+
+def _analyze(text, custom_keywords, time_budget, backend, region_packs):
+    set_backend(backend)
+    set_region_packs(region_packs)
+    refresh_rule_packs()
+    result, features = analyze_with_features(text, custom_keywords, time_budget)
+    # 特征只回传区间，主进程已有原文，不必再序列化一份
+    return result, portable_spans(features)
+
+
+def classify_batch(texts, backend="auto"):
+    """子进程中批量分类，供历史记录重新分类任务使用。"""
+    set_backend(backend)
+    return [classify_content(text or "") for text in texts]
+
+
+class AnalysisPool:
+    """独立进程中执行敏感检测与分类，避免大内容与 UI 线程争抢 GIL。"""
+
+    def __init__(self, timeout=10.0, max_restarts=3, restart_window=60.0):
+        self._timeout = max(0.5, float(timeout))
+        self._max_restarts = max_restarts
+        self._restart_window = restart_window
+        self._backend = "auto"
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._restarts: list[float] = []
+        self._disabled_until = 0.0
+        self._stats = {
+            "submitted": 0,
+            "timeouts": 0,
+            "crashes": 0,
+            "restarts": 0,
+        }
+
+    def start(self, backend="auto"):
+        with self._lock:
+            self._backend = backend or "auto"
+            if self._executor is None:
+                self._executor = self._create_executor()
+        # 预热：提前拉起子进程并完成规则编译，首个大内容无需等待进程启动
+        try:
+            self._executor.submit(_ping)
+        except Exception as exc:
+            print(f"[调试] 分析进程预热失败：{exc}")
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def update_timeout(self, timeout):
+        self._timeout = max(0.5, float(timeout))
+
+    def stats(self):
+        return dict(self._stats)
+
+    def analyze(self, text, custom_keywords=None, time_budget=None):
+        """返回 (masked, has_sensitive, types, category, spans)；进程池不可用或超时时保守脱敏。"""
+        return self.analyze_with_features(text, custom_keywords, time_budget)[0]
+
+    def analyze_with_features(self, text, custom_keywords=None, time_budget=None):
+        """返回 (result, features)；子进程的视图与原文不同或保守脱敏时 features 为 None。"""
+        if time.monotonic() < self._disabled_until:
+            return self._fallback(text, "进程池处于冷却期"), None
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+            executor = self._executor
+        self._stats["submitted"] += 1
+        try:
+            future = executor.submit(_analyze, text, list(custom_keywords or []), time_budget, self._backend, enabled_region_packs())
+            result, spans = future.result(timeout=self._timeout)
+        except FutureTimeoutError:
+            self._stats["timeouts"] += 1
+            self._restart(executor, f"分析超时（>{self._timeout:.1f}s）")
+            return self._fallback(text, "分析超时"), None
+        except BrokenProcessPool as exc:
+            self._stats["crashes"] += 1
+            self._restart(executor, f"分析进程崩溃：{exc}")
+            return self._fallback(text, "分析进程崩溃"), None
+        return result, features_from_spans(text, spans) if spans is not None else None
+
+    def _create_executor(self):
+        context = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=context,
+            initializer=_warm_up,
+            # 地区规则包沿用主进程当前的启用集合
+            initargs=(self._backend, enabled_region_packs()),
+        )
+
+    def _restart(self, executor, reason):
+        print(f"[调试] {reason}，重启分析进程")
+        # 超时的任务无法取消，直接终止子进程
+        for process in list(getattr(executor, "_processes", {}).values()):
+            try:
+                process.terminate()
+            except Exception:
+                pass
+        executor.shutdown(wait=False, cancel_futures=True)
+        now = time.monotonic()
+        self._restarts = [ts for ts in self._restarts if now - ts < self._restart_window]
+        self._restarts.append(now)
+        self._stats["restarts"] += 1
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+            if len(self._restarts) > self._max_restarts:
+                # 短时间内频繁重启，进入冷却期，期间大内容直接保守脱敏
+                self._disabled_until = now + self._restart_window
+                print(f"[调试] 分析进程 {self._restart_window:.0f}s 内重启过多，暂停使用进程池")
+                return
+            if self._executor is None:
+                self._executor = self._create_executor()
+
+    @staticmethod
+    def _fallback(text, reason):
+        print(f"[调试] {reason}，对长度 {len(text)} 的内容执行保守脱敏")
+        return conservative_mask(text), True, [TIMEOUT_TYPE], "Text", []
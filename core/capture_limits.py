@@ -0,0 +1,46 @@
+# core/capture_limits.py
+from __future__ import annotations
+
+# 超过软上限：先以首尾预览入库并通知界面，全文分析在后台完成后替换
+SOFT = "soft"
+# 超过硬上限：不分析、不保存正文，只记录大小与摘要
+HARD = "hard"
+
+# 入库记录的 types 中用于标记大小限制的处理结果
+TRUNCATED_TYPE = "CAPTURE_TRUNCATED"
+OVERSIZE_TYPE = "CAPTURE_OVERSIZE"
+
+PREVIEW_HEAD_CHARS = 16 * 1024
+PREVIEW_TAIL_CHARS = 4 * 1024
+
+
+def capture_size_class(size, config):
+    """size 为 UTF-8 字节数；上限配置为 0 表示不限制。"""
+    hard = int(config.get("capture_hard_limit_kb", 32768) or 0) * 1024
+    soft = int(config.get("capture_soft_limit_kb", 1024) or 0) * 1024
+    if hard and size > hard:
+        return HARD
+    if soft and size > soft:
+        return SOFT
+    return None
+
+
+def head_tail_preview(text, head=PREVIEW_HEAD_CHARS, tail=PREVIEW_TAIL_CHARS):
+    """保留首尾各一段并在换行处截断，中间以省略说明代替，避免半行内容出现在预览两端。"""
+    if len(text) <= head + tail:
+        return text
+    head_end = text.rfind("\n", 0, head)
+    if head_end <= 0:
+        head_end = head
+    tail_start = text.find("\n", len(text) - tail)
+    if tail_start == -1 or tail_start < head_end:
+        tail_start = len(text) - tail
+    else:
+        # 跳过换行本身
+        tail_start += 1
+    omitted = tail_start - head_end
+    return f"{text[:head_end]}\n[… {omitted} characters omitted …]\n{text[tail_start:]}"
+
+
+def oversize_summary(size, digest):
+    return f"[Clip not stored: {size} bytes, BLAKE2b {digest.hex()}]"
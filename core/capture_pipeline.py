@@ -0,0 +1,229 @@
+# core/capture_pipeline.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+
+# 队列满时的处理策略
+DROP_OLDEST = "drop_oldest"  # 丢弃最早的待处理项，保证新内容入队
+COALESCE = "coalesce"  # 用新内容替换最后一个待处理项（中间状态被后一条取代）
+BLOCK = "block"  # 阻塞生产者直到有空位
+POLICIES = (DROP_OLDEST, COALESCE, BLOCK)
+
+# get() 在队列关闭且已取空时返回该哨兵
+CLOSED = object()
+
+# ClipboardWorker 捕获之后各阶段的默认设置，可由配置项 capture_pipeline_stages 按阶段覆盖。
+# 分析积压时新内容替换最后一条待分析项，持久化与界面通知不丢弃
+CAPTURE_STAGE_DEFAULTS = {
+    "analysis": {"workers": 1, "capacity": 32, "policy": COALESCE},
+    "persistence": {"workers": 1, "capacity": 64, "policy": BLOCK},
+    "notify": {"workers": 1, "capacity": 256, "policy": BLOCK},
+    # 超长内容的全文分析；每项持有完整原文，积压时丢弃最旧的，对应记录保留首尾预览
+    "deferred": {"workers": 1, "capacity": 4, "policy": DROP_OLDEST},
+}
+
+
+class BoundedQueue:
+    """有界队列，满时按 policy 处理；关闭后不再接受新项，已有项仍可取出。"""
+
+    def __init__(self, capacity=64, policy=DROP_OLDEST):
+        if policy not in POLICIES:
+            raise ValueError(f"未知的队列策略：{policy}")
+        self._capacity = max(1, int(capacity))
+        self._policy = policy
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {"put": 0, "dropped": 0, "coalesced": 0, "blocked_ms": 0.0, "high_water": 0}
+
+    @property
+    def policy(self):
+        return self._policy
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+    def put(self, item, timeout=None):
+        """入队成功返回 True；队列已关闭或阻塞等待超时返回 False。"""
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._items) >= self._capacity:
+                if self._policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self._stats["dropped"] += 1
+                elif self._policy == COALESCE:
+                    self._items[-1] = item
+                    self._stats["coalesced"] += 1
+                    self._stats["put"] += 1
+                    self._cond.notify()
+                    return True
+                else:
+                    started = time.perf_counter()
+                    deadline = None if timeout is None else started + timeout
+                    while len(self._items) >= self._capacity and not self._closed:
+                        remaining = None if deadline is None else deadline - time.perf_counter()
+                        if remaining is not None and remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    self._stats["blocked_ms"] += (time.perf_counter() - started) * 1000
+                    if self._closed or len(self._items) >= self._capacity:
+                        return False
+            self._items.append(item)
+            self._stats["put"] += 1
+            self._stats["high_water"] = max(self._stats["high_water"], len(self._items))
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """取出最早的一项；队列关闭且为空时返回 CLOSED，等待超时返回 None。"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                return None
+            if not self._items:
+                return CLOSED
+            item = self._items.popleft()
+            # 唤醒阻塞等待空位的生产者
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def clear(self):
+        """丢弃所有待处理项，返回丢弃的条数。"""
+        with self._cond:
+            count = len(self._items)
+            self._items.clear()
+            self._stats["dropped"] += count
+            self._cond.notify_all()
+            return count
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(size=len(self._items), capacity=self._capacity, policy=self._policy)
+            return stats
+
+
+class PipelineStage:
+    """流水线中的一个阶段：handler(item) 返回交给下一阶段的项，返回 None 表示到此为止。"""
+
+    def __init__(self, name, handler, workers=1, capacity=64, policy=DROP_OLDEST):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, int(workers))
+        self.queue = BoundedQueue(capacity, policy)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stats = {"processed": 0, "errors": 0, "total_ms": 0.0}
+
+    def record(self, elapsed, failed):
+        with self._lock:
+            self._stats["processed"] += 1
+            self._stats["errors"] += int(failed)
+            self._stats["total_ms"] += elapsed * 1000
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        processed = stats["processed"]
+        stats["avg_ms"] = stats["total_ms"] / processed if processed else 0.0
+        stats["workers"] = self.workers
+        stats["queue"] = self.queue.stats()
+        return stats
+
+
+class CapturePipeline:
+    """捕获之后的分阶段处理：每个阶段有独立的有界输入队列与工作线程。
+
+    捕获线程只负责 submit()，入队耗时与下游快慢无关（block 策略除外）；
+    shutdown() 按阶段顺序关闭队列并等待处理完毕，超时后丢弃剩余项。
+    """
+
+    def __init__(self, stages, on_error=None):
+        self._stages = list(stages)
+        self._on_error = on_error
+        self._started = False
+        self._submit_stats = {"submitted": 0, "rejected": 0, "total_ms": 0.0}
+
+    def stages(self):
+        return [stage.name for stage in self._stages]
+
+    def start(self):
+        if self._started:
+            return
+        self._started = True
+        for index, stage in enumerate(self._stages):
+            downstream = self._stages[index + 1] if index + 1 < len(self._stages) else None
+            for number in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._run_stage,
+                    args=(stage, downstream),
+                    name=f"capture-{stage.name}-{number}",
+                    daemon=True,
+                )
+                stage._threads.append(thread)
+                thread.start()
+
+    def submit(self, item):
+        started = time.perf_counter()
+        accepted = self._stages[0].queue.put(item) if self._stages else False
+        self._submit_stats["submitted" if accepted else "rejected"] += 1
+        self._submit_stats["total_ms"] += (time.perf_counter() - started) * 1000
+        return accepted
+
+    def shutdown(self, timeout=None):
+        """排空并停止所有阶段；返回超时后被丢弃的条数。"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        discarded = 0
+        for index, stage in enumerate(self._stages):
+            # 上游线程全部退出后再关闭本阶段队列，上游产出的项不会丢失
+            stage.queue.close()
+            for thread in stage._threads:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                thread.join(remaining)
+            if any(thread.is_alive() for thread in stage._threads):
+                for pending in self._stages[index:]:
+                    discarded += pending.queue.clear()
+                    pending.queue.close()
+                print(f"[调试] 捕获流水线在阶段 {stage.name} 排空超时，丢弃 {discarded} 条待处理内容")
+                break
+            stage._threads.clear()
+        self._started = False
+        return discarded
+
+    def stats(self):
+        submitted = self._submit_stats["submitted"] + self._submit_stats["rejected"]
+        return {
+            "submitted": self._submit_stats["submitted"],
+            "rejected": self._submit_stats["rejected"],
+            "avg_submit_ms": self._submit_stats["total_ms"] / submitted if submitted else 0.0,
+            "stages": {stage.name: stage.stats() for stage in self._stages},
+        }
+
+    def _run_stage(self, stage, downstream):
+        while True:
+            item = stage.queue.get()
+            if item is CLOSED:
+                return
+            if item is None:
+                continue
+            started = time.perf_counter()
+            failed = False
+            try:
+                result = stage.handler(item)
+            except Exception as exc:
+                failed = True
+                result = None
+                print(f"[调试] 捕获流水线阶段 {stage.name} 处理失败：{exc}")
+                if self._on_error is not None:
+                    self._on_error(stage.name, exc)
+            stage.record(time.perf_counter() - started, failed)
+            if result is not None and downstream is not None:
+                downstream.queue.put(result)
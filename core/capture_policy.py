@@ -0,0 +1,113 @@
+# core/capture_policy.py
+from __future__ import annotations
+
+import fnmatch
+import re
+import threading
+
+# 按应用生效的捕获策略，数值越小越严格；同一应用命中多条规则时取最严格的
+IGNORE = "ignore"  # 完全忽略，不读取、不分析、不入库
+METADATA_ONLY = "metadata_only"  # 只记录时间与来源应用，不读取正文
+MASK_ALL = "mask_all"  # 跳过检测，整段保守遮盖
+NO_RAW = "no_raw"  # 正常分析，但任何情况下都不保留原文
+CAPTURE = "capture"  # 未命中任何规则
+ACTIONS = (IGNORE, METADATA_ONLY, MASK_ALL, NO_RAW)
+_STRICTNESS = {action: index for index, action in enumerate(ACTIONS)}
+
+# 入库记录的 types 中用于标记策略处理结果
+METADATA_ONLY_TYPE = "POLICY_METADATA_ONLY"
+MASK_ALL_TYPE = "POLICY_MASK_ALL"
+
+_WILDCARDS = set("*?[")
+_APP_SUFFIXES = (".exe", ".app")
+
+
+def normalize_app_name(name):
+    """大小写不敏感，并去掉 .exe / .app 后缀，使 "1Password.exe" 与 "1password" 等价。"""
+    value = (name or "").strip().lower()
+    for suffix in _APP_SUFFIXES:
+        if value.endswith(suffix):
+            return value[: -len(suffix)]
+    return value
+
+
+class PolicyEngine:
+    """由配置编译出的应用策略：精确名称走字典查找，带通配符的规则按策略合并成一个正则。"""
+
+    def __init__(self, rules):
+        self._exact: dict[str, str] = {}
+        patterns: dict[str, list[str]] = {}
+        for app, action in rules:
+            if action not in _STRICTNESS:
+                print(f"[调试] 忽略未知的应用策略：{app} -> {action}")
+                continue
+            key = normalize_app_name(app)
+            if not key:
+                continue
+            if _WILDCARDS & set(key):
+                patterns.setdefault(action, []).append(fnmatch.translate(key))
+            elif key not in self._exact or _STRICTNESS[action] < _STRICTNESS[self._exact[key]]:
+                self._exact[key] = action
+        # 按严格程度排列，第一个命中的即为结果
+        self._patterns = [
+            (action, re.compile("|".join(f"(?:{item})" for item in patterns[action])))
+            for action in ACTIONS
+            if action in patterns
+        ]
+        self._lock = threading.Lock()
+        self._stats = {"evaluations": 0, "matched": {action: 0 for action in ACTIONS}, "reads_avoided": 0}
+
+    @classmethod
+    def from_config(cls, config):
+        rules = [(app, IGNORE) for app in config.get("excluded_apps", [])]
+        rules.extend((app, action) for app, action in (config.get("app_policies") or {}).items())
+        return cls(rules)
+
+    def __bool__(self):
+        return bool(self._exact or self._patterns)
+
+    def evaluate(self, app_name):
+        """返回该应用适用的策略，未命中时返回 CAPTURE。"""
+        key = normalize_app_name(app_name)
+        action = self._exact.get(key)
+        for candidate, pattern in self._patterns:
+            if action is not None and _STRICTNESS[candidate] >= _STRICTNESS[action]:
+                break
+            if pattern.fullmatch(key):
+                action = candidate
+                break
+        with self._lock:
+            self._stats["evaluations"] += 1
+            if action is not None:
+                self._stats["matched"][action] += 1
+        return action or CAPTURE
+
+    def record_read_avoided(self):
+        with self._lock:
+            self._stats["reads_avoided"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["matched"] = dict(self._stats["matched"])
+        stats["rules"] = len(self._exact) + len(self._patterns)
+        return stats
+
+
+class PolicyCache:
+    """配置中的应用规则变化时才重新编译，统计在同一套规则内累积。"""
+
+    def __init__(self):
+        self._key = None
+        self._engine = PolicyEngine([])
+
+    def get(self, config):
+        key = (
+            tuple(config.get("excluded_apps", [])),
+            tuple(sorted((config.get("app_policies") or {}).items())),
+        )
+        if key != self._key:
+            self._engine = PolicyEngine.from_config(config)
+            self._key = key
+            print(f"[调试] 应用策略已重新编译：{self._engine.stats()['rules']} 条规则")
+        return self._engine
@@ -0,0 +1,70 @@
+# core/clipboard_watcher.py
+from __future__ import annotations
+
+from PySide6.QtCore import QObject
+
+from clip_formats import HTML, URI_LIST, FormatSnapshot, normalize_format, normalize_formats, paths_to_uri_list
+
+
+class ClipboardChangeNotifier(QObject):
+    """在 GUI 线程监听 QClipboard.dataChanged，读取文本后立即交给回调。
+
+    回调通常是 ClipboardWorker.notify_clipboard_changed：读取发生在通知到达时，
+    即使工作线程正忙，连续的多次复制也会依次排队，不会被轮询间隔吞掉。
+    只有图片没有文本时交给 image_callback；QImage 是隐式共享的，跨线程传递不会复制像素。
+
+    format_selector 接收可用格式列表，返回需要读取内容的附加格式；QMimeData 按格式向
+    来源应用请求数据，未被选中的 HTML / RTF 不会被传输。
+    """
+
+    def __init__(self, clipboard, callback, parent=None, image_callback=None, format_selector=None):
+        super().__init__(parent)
+        self._clipboard = clipboard
+        self._callback = callback
+        self._image_callback = image_callback
+        self._format_selector = format_selector
+        self._notifications = 0
+        clipboard.dataChanged.connect(self._on_data_changed)
+
+    def notifications(self):
+        return self._notifications
+
+    def close(self):
+        try:
+            self._clipboard.dataChanged.disconnect(self._on_data_changed)
+        except (RuntimeError, TypeError):
+            pass
+
+    def _on_data_changed(self):
+        self._notifications += 1
+        mime = self._clipboard.mimeData()
+        if mime is None:
+            return
+        paths = [url.toLocalFile() for url in mime.urls() if url.isLocalFile()] if mime.hasUrls() else []
+        if mime.hasText() or paths:
+            # 部分平台复制文件时不提供文本，以路径列表作为正文
+            text = mime.text() if mime.hasText() else "\n".join(paths)
+            self._callback(text, self._snapshot(mime, paths, len(text)))
+        elif mime.hasImage() and self._image_callback is not None:
+            image = self._clipboard.image()
+            if not image.isNull():
+                self._image_callback(image)
+
+    def _snapshot(self, mime, paths, text_length):
+        names = mime.formats()
+        snapshot = FormatSnapshot(available=normalize_formats(names))
+        if paths and URI_LIST not in snapshot.available:
+            snapshot.available.append(URI_LIST)
+        if self._format_selector is None:
+            return snapshot
+        for wanted in self._format_selector(snapshot.available, text_length):
+            if wanted == URI_LIST:
+                data = paths_to_uri_list(paths) if paths else None
+            elif wanted == HTML and mime.hasHtml():
+                data = mime.html().encode("utf-8")
+            else:
+                name = next((name for name in names if normalize_format(name) == wanted), None)
+                data = bytes(mime.data(name)) if name else None
+            if data:
+                snapshot.data[wanted] = data
+        return snapshot
@@ -1,83 +1,477 @@
 # core/clipboard_worker.py
 from __future__ import annotations
 
+import hashlib
 import threading
+import time
+from collections import deque
 from datetime import datetime
 
 from PySide6.QtCore import QThread, Signal
 
-from clipboard_monitor import get_clipboard_text
-from platform_utils import get_active_app_name
-from classifier import classify_content
-from sensitive_detector import detect_and_mask
-from database import add_record
+from app_resolver import get_resolver
+from classifier import classify_content, classify_file_list, get_classifier_metrics
+from clip_formats import RICH_FORMATS, URI_LIST, FormatSnapshot, wanted_formats
+from clipboard_monitor import get_backend, text_fingerprint
+from core.analysis_cache import AnalysisCache, content_fingerprint
+from core.analysis_pipeline import analyze_with_features, pipeline_stats
+from core.analysis_pool import AnalysisPool
+from core.capture_limits import (
+    HARD,
+    OVERSIZE_TYPE,
+    SOFT,
+    TRUNCATED_TYPE,
+    capture_size_class,
+    head_tail_preview,
+    oversize_summary,
+)
+from core.capture_pipeline import CAPTURE_STAGE_DEFAULTS, CapturePipeline, PipelineStage
+from core.capture_policy import (
+    CAPTURE,
+    IGNORE,
+    MASK_ALL,
+    MASK_ALL_TYPE,
+    METADATA_ONLY,
+    METADATA_ONLY_TYPE,
+    NO_RAW,
+    PolicyCache,
+)
+from core.image_capture import IMAGE_FORMAT, encode_image, load_image, perceptual_hash
+from core.incremental_analysis import IncrementalAnalyzer
+from core.poll_scheduler import AdaptivePollScheduler
+from platform_utils import get_active_app_name, get_idle_seconds
+from sensitive_detector import TIMEOUT_TYPE, conservative_mask, rules_generation, set_region_packs
+from database import MASKED_PREVIEW_CHARS, add_record, get_image_hashes, record_is_active, update_record_analysis
+from image_hash import PerceptualHashIndex
+from regex_engine import set_backend
+from rule_packs import refresh_rule_packs
+
+
+# 事件驱动模式下空闲时唯一的唤醒：检查规则包是否更新
+RULE_PACK_CHECK_INTERVAL = 5.0
+# 工作线程来不及处理时最多积压的通知条数，超出后丢弃最旧的
+MAX_PENDING_EVENTS = 64
 
 
 class ClipboardWorker(QThread):
-    """后台线程轮询剪贴板并输出处理结果。"""
+    """后台线程捕获剪贴板内容：优先由变化通知驱动，不支持通知的平台退回自适应间隔的轮询。
+
+    本线程只负责捕获与去重，分析、入库与界面通知在 CapturePipeline 的各阶段线程中执行，
+    下游变慢不会推迟下一次捕获。
+    """
 
     record_ready = Signal(dict)
+    # 超长内容的后台全文分析完成后发出，载荷格式与 record_ready 相同
+    record_updated = Signal(dict)
     error = Signal(str)
+    rules_changed = Signal()
 
-    def __init__(self, config_provider, interval=0.8, parent=None):
+    def __init__(self, config_provider, interval=0.8, max_interval=3.0, parent=None):
         super().__init__(parent)
         self._config_provider = config_provider
-        self._interval = max(0.1, float(interval))
+        config = config_provider()
+        # interval 为基础轮询间隔，max_interval 为上限，实际间隔由调度器根据活跃程度决定
+        self._scheduler = AdaptivePollScheduler(
+            interval,
+            max_interval,
+            active_interval=config.get("poll_interval_active", 0.3),
+            idle_after=config.get("poll_idle_seconds", 60),
+            idle_probe=get_idle_seconds,
+        )
         self._stop_event = threading.Event()
-        self._last_text = ""
+        # 停止请求与剪贴板变化通知共用同一个唤醒事件
+        self._wake_event = threading.Event()
+        self._event_driven = False
+        # 自带变化推送的读取后端（如 Wayland 的 wl-paste --watch），运行期间作为事件源
+        self._listener_backend = None
+        self._pending = deque()
+        self._pending_lock = threading.Lock()
+        self._event_stats = {"events": 0, "dropped": 0, "latency_ms": 0.0, "reads": 0, "token_skips": 0}
+        # 只保留上一条内容的指纹，不在内存中常驻整段文本
+        self._last_fingerprint = text_fingerprint("")
+        self._last_token = None
         self._error_reported = False
         self._duplicate_logged = False
         self._blank_logged = False
         self._ignore_lock = threading.Lock()
         self._ignore_once: list[str] = []
+        self._analysis_pool: AnalysisPool | None = None
+        self._pipeline: CapturePipeline | None = None
+        # 按应用的捕获策略，excluded_apps / app_policies 变化时重新编译
+        self._policies = PolicyCache()
+        # 图片近重复索引在流水线启动时从数据库重建
+        self._image_index = PerceptualHashIndex(config.get("image_dedup_distance", 4))
+        self._image_index_lock = threading.Lock()
+        self._last_image_digest = None
+        self._image_stats = {"captured": 0, "deduplicated": 0, "stored_bytes": 0}
+        self._format_stats = {"fetched": 0, "stored": 0, "stored_bytes": 0, "withheld": 0}
+        self._size_stats = {"truncated": 0, "oversized": 0, "deferred_completed": 0, "deferred_ms": 0.0}
+        self._analysis_cache = AnalysisCache(
+            max_entries=config.get("analysis_cache_size", 256),
+            ttl=config.get("analysis_cache_ttl", 600),
+        )
+        self._incremental = IncrementalAnalyzer(
+            min_length=int(config.get("incremental_analysis_min_kb", 4)) * 1024,
+        )
+        # 分析阶段可配置多个线程，增量分析器的基准需要串行读写
+        self._incremental_lock = threading.Lock()
 
     def run(self):
-        print(f"[调试] ClipboardWorker 启动，轮询间隔：{self._interval}s")
+        self._attach_backend_listener()
+        active, base, high = self._scheduler.bounds()
+        mode = "事件驱动" if self._event_driven else f"自适应轮询，基础间隔 {base}s（活跃 {active}s，上限 {high}s）"
+        print(f"[调试] ClipboardWorker 启动（{mode}）")
         self._stop_event.clear()
+        refresh_rule_packs(force=True)
+        self._start_analysis_pool()
+        self._start_pipeline()
+        # 事件驱动模式也先读取一次，捕获启动前已在剪贴板中的内容
+        self._poll_once()
         while not self._stop_event.is_set():
-            try:
-                text = get_clipboard_text()
-                if text and text.strip():
-                    if self._should_ignore(text):
-                        print("[调试] 忽略来自应用内部的复制内容")
-                        self._last_text = text
-                        self._duplicate_logged = False
-                        self._blank_logged = False
-                        continue
-                    if text != self._last_text:
-                        preview = text.replace("\n", " ")[:60]
-                        print(f"[调试] 捕获到新的剪贴板文本（长度 {len(text)}）：{preview!r}")
-                        self._handle_clipboard_text(text)
-                        self._last_text = text
-                        self._duplicate_logged = False
-                        self._blank_logged = False
-                    else:
-                        if not self._duplicate_logged:
-                            print("[调试] 剪贴板内容未变化，跳过处理")
-                            self._duplicate_logged = True
-                else:
-                    if not self._blank_logged:
-                        print("[调试] 当前剪贴板为空或仅为空白字符，跳过")
-                        self._blank_logged = True
-                if self._error_reported:
-                    self._error_reported = False
-            except Exception as exc:
-                print(f"[调试] 读取剪贴板时出现异常：{exc}")
-                if not self._error_reported:
-                    self.error.emit(str(exc))
-                    self._error_reported = True
-            if self._stop_event.wait(self._interval):
+            timeout = RULE_PACK_CHECK_INTERVAL if self._event_driven else self._scheduler.next_interval()
+            self._wake_event.wait(timeout)
+            self._wake_event.clear()
+            if self._stop_event.is_set():
                 break
+            if refresh_rule_packs():
+                # 规则包热重载：分析缓存随规则版本号自动失效，通知界面重新脱敏历史
+                self.rules_changed.emit()
+            if self._event_driven:
+                self._drain_events()
+            else:
+                self._scheduler.record_poll(self._poll_once())
+        self._detach_backend_listener()
+        # 先排空流水线，分析阶段可能仍在使用分析进程
+        self._shutdown_pipeline()
+        self._shutdown_analysis_pool()
 
     def stop(self):
         self._stop_event.set()
+        self._wake_event.set()
         self.wait()
+        with self._pending_lock:
+            self._pending.clear()
+
+    def set_event_driven(self, enabled):
+        """由 GUI 线程的 ClipboardChangeNotifier 提供变化通知时开启，空闲时不再轮询。"""
+        self._event_driven = bool(enabled)
+        self._wake_event.set()
+
+    def is_event_driven(self):
+        return self._event_driven
+
+    def set_app_active(self, active):
+        """本应用窗口获得 / 失去焦点时由 GUI 线程调用，调整轮询节奏。"""
+        self._scheduler.set_app_active(active)
+        if not active:
+            # 切走后尽快按新的下限轮询，而不是等完当前的长间隔
+            self._wake_event.set()
+
+    def _attach_backend_listener(self):
+        if self._event_driven or self._config_provider().get("clipboard_backend", "auto") == "poll":
+            return
+        try:
+            backend = get_backend()
+        except Exception as exc:
+            print(f"[调试] 初始化剪贴板读取后端失败：{exc}")
+            return
+        if backend.supports_listener():
+            backend.set_listener(self.notify_clipboard_changed)
+            self._listener_backend = backend
+            self._event_driven = True
+
+    def _detach_backend_listener(self):
+        if self._listener_backend is not None:
+            self._listener_backend.set_listener(None)
+            self._listener_backend = None
+            self._event_driven = False
+
+    def notify_clipboard_changed(self, text, formats=None):
+        """剪贴板变化通知（在 GUI 线程或读取后端的线程调用）：文本入队并立即唤醒工作线程。
+
+        formats 为 FormatSnapshot，其中的附加格式内容已按 select_formats 的结果读取。
+        """
+        self._enqueue(text, None, formats)
+
+    def notify_clipboard_image(self, image):
+        """剪贴板中是图片时由 GUI 线程调用；QImage 为隐式共享，入队不复制像素。"""
+        self._enqueue(None, image)
+
+    def select_formats(self, available, text_length=0):
+        """在可用格式中挑出需要读取内容的附加格式（GUI 线程与本线程都会调用）。
 
-    def update_interval(self, interval):
-        self._interval = max(0.1, float(interval))
+        只有未受策略限制的应用才读取 HTML / RTF；no_raw 应用只读取文件列表用于分类，不保存。
+        text_length 为文本字符数（不超过 UTF-8 字节数），超过软上限的内容不读取附加格式。
+        """
+        config = self._config_provider()
+        enabled = config.get("capture_formats", list(RICH_FORMATS))
+        if not enabled or not any(mime in available for mime in RICH_FORMATS):
+            return []
+        if capture_size_class(text_length, config) is not None:
+            return []
+        _app_name, action = self._resolve_policy()
+        if action == CAPTURE:
+            return wanted_formats(available, enabled)
+        if action == NO_RAW:
+            return wanted_formats(available, [URI_LIST])
+        return []
+
+    def _read_formats(self, backend):
+        """轮询模式：确认是新内容后才列出格式，并只读取策略允许的附加格式。"""
+        snapshot = FormatSnapshot(available=backend.list_formats())
+        for mime in self.select_formats(snapshot.available):
+            data = backend.read_format(mime)
+            if data:
+                snapshot.data[mime] = data
+        return snapshot
+
+    def _enqueue(self, text, image, formats=None):
+        if not self.isRunning():
+            return
+        with self._pending_lock:
+            if len(self._pending) >= MAX_PENDING_EVENTS:
+                self._pending.popleft()
+                self._event_stats["dropped"] += 1
+            self._pending.append((time.perf_counter(), text, image, formats))
+        self._wake_event.set()
+
+    def capture_stats(self):
+        stats = dict(self._event_stats)
+        total_latency = stats.pop("latency_ms")
+        stats["mode"] = "event" if self._event_driven else "poll"
+        stats["avg_latency_ms"] = total_latency / stats["events"] if stats["events"] else 0.0
+        if not self._event_driven:
+            # 轮询模式的延迟按两次轮询间隔的一半估计
+            poll = self._scheduler.stats()
+            stats["poll"] = poll
+            stats["avg_latency_ms"] = poll["avg_latency_ms"]
+        return stats
+
+    def _drain_events(self):
+        while not self._stop_event.is_set():
+            with self._pending_lock:
+                if not self._pending:
+                    return
+                notified_at, text, image, formats = self._pending.popleft()
+            self._event_stats["events"] += 1
+            self._event_stats["latency_ms"] += (time.perf_counter() - notified_at) * 1000
+            if image is not None:
+                self._process_image(image)
+            else:
+                self._process_text(text, formats=formats)
+
+    def _poll_once(self):
+        """读取一次剪贴板，返回是否捕获到新内容。"""
+        try:
+            backend = get_backend()
+            token = backend.change_token()
+            if token is not None and token == self._last_token:
+                # 变化令牌未变，不必传输和解码正文
+                self._event_stats["token_skips"] += 1
+                return False
+            app_name, action = self._resolve_policy()
+            if token is not None and action in (IGNORE, METADATA_ONLY):
+                # 有变化令牌时不读取正文即可判断是新内容，按策略直接处理
+                self._last_token = token
+                self._policies.get(self._config_provider()).record_read_avoided()
+                if action == IGNORE:
+                    print(f"[调试] 按应用策略忽略来自 {app_name} 的复制内容")
+                    return False
+                self._capture("", app_name, action)
+                return True
+            text = backend.read_text()
+            image = None
+            if not (text and text.strip()) and self._config_provider().get("monitor_images", True):
+                image = backend.read_image()
+        except Exception as exc:
+            self._report_error(exc)
+            return False
+        self._event_stats["reads"] += 1
+        self._last_token = token
+        if image is not None:
+            return self._process_image(image, app_name, action)
+        # 附加格式延后到确认是新内容之后再列出与读取
+        return self._process_text(text, app_name, action, formats=lambda: self._read_formats(backend))
+
+    def _process_image(self, image, app_name=None, action=None):
+        """图片只在捕获线程做最廉价的检查，解码、哈希与压缩都在分析阶段完成。"""
+        if not self._config_provider().get("monitor_images", True):
+            return False
+        if isinstance(image, (bytes, bytearray)):
+            digest = (len(image), hashlib.blake2b(image, digest_size=16).digest())
+            if digest == self._last_image_digest:
+                return False
+            self._last_image_digest = digest
+        if action is None:
+            app_name, action = self._resolve_policy()
+        if action == IGNORE:
+            print(f"[调试] 按应用策略忽略来自 {app_name} 的图片")
+            return False
+        # 图片与文本交替复制时，下一次复制同样的文本仍应被捕获
+        self._last_fingerprint = text_fingerprint("")
+        item = {
+            "text": "",
+            "image": image,
+            "app": app_name,
+            "policy": action,
+            "timestamp": datetime.now().isoformat(),
+        }
+        if self._pipeline is None or not self._pipeline.submit(item):
+            print("[调试] 捕获流水线未运行或已满，本张图片未处理")
+            return False
+        return True
+
+    def _resolve_policy(self):
+        app_name = get_active_app_name()
+        return app_name, self._policies.get(self._config_provider()).evaluate(app_name)
+
+    def _process_text(self, text, app_name=None, action=None, formats=None):
+        changed = False
+        try:
+            if text and text.strip():
+                fingerprint = text_fingerprint(text)
+                if action is None:
+                    app_name, action = self._resolve_policy()
+                if self._should_ignore(text):
+                    print("[调试] 忽略来自应用内部的复制内容")
+                    self._last_fingerprint = fingerprint
+                    self._duplicate_logged = False
+                    self._blank_logged = False
+                elif fingerprint != self._last_fingerprint:
+                    self._last_fingerprint = fingerprint
+                    self._duplicate_logged = False
+                    self._blank_logged = False
+                    if action == IGNORE:
+                        print(f"[调试] 按应用策略忽略来自 {app_name} 的复制内容")
+                    else:
+                        if action in (CAPTURE, NO_RAW):
+                            preview = text.replace("\n", " ")[:60]
+                            print(f"[调试] 捕获到新的剪贴板文本（长度 {len(text)}）：{preview!r}")
+                        else:
+                            # 受策略保护的应用不在日志中输出内容预览
+                            print(f"[调试] 捕获到来自 {app_name} 的内容（长度 {len(text)}），应用策略 {action}")
+                        changed = True
+                        size_class = None
+                        if action != METADATA_ONLY:
+                            size_class = capture_size_class(fingerprint[0], self._config_provider())
+                        if size_class == HARD:
+                            self._capture_oversized(fingerprint, app_name, action)
+                        else:
+                            if size_class is not None:
+                                # 超长内容不读取也不保存附加格式，只保留格式列表
+                                formats = FormatSnapshot(formats.available) if isinstance(formats, FormatSnapshot) else None
+                            formats = self._fetch_formats(formats)
+                            self._capture(text if action != METADATA_ONLY else "", app_name, action, formats, size_class)
+                elif not self._duplicate_logged:
+                    print("[调试] 剪贴板内容未变化，跳过处理")
+                    self._duplicate_logged = True
+            elif not self._blank_logged:
+                print("[调试] 当前剪贴板为空或仅为空白字符，跳过")
+                self._blank_logged = True
+            if self._error_reported:
+                self._error_reported = False
+        except Exception as exc:
+            self._report_error(exc)
+        return changed
+
+    def _fetch_formats(self, formats):
+        """formats 为 FormatSnapshot，或轮询模式下延后读取的函数。"""
+        if callable(formats):
+            try:
+                formats = formats()
+            except Exception as exc:
+                # 附加格式读取失败不影响纯文本的捕获
+                print(f"[调试] 读取剪贴板附加格式失败：{exc}")
+                return None
+        if formats is not None:
+            self._format_stats["fetched"] += len(formats.data)
+        return formats
+
+    def _report_error(self, exc):
+        print(f"[调试] 读取剪贴板时出现异常：{exc}")
+        if not self._error_reported:
+            self.error.emit(str(exc))
+            self._error_reported = True
+
+    def _start_pipeline(self):
+        config = self._config_provider()
+        overrides = config.get("capture_pipeline_stages") or {}
+        handlers = {
+            "analysis": self._analysis_stage,
+            "persistence": self._persistence_stage,
+            "notify": self._notify_stage,
+            "deferred": self._deferred_stage,
+        }
+        stages = []
+        for name, handler in handlers.items():
+            settings = dict(CAPTURE_STAGE_DEFAULTS[name])
+            settings.update(overrides.get(name) or {})
+            stages.append(PipelineStage(name, handler, **settings))
+        self._pipeline = CapturePipeline(stages, on_error=self._on_stage_error)
+        self._rebuild_image_index(config)
+        self._pipeline.start()
+
+    def _rebuild_image_index(self, config):
+        index = PerceptualHashIndex(config.get("image_dedup_distance", 4))
+        try:
+            for record_id, phash in get_image_hashes():
+                index.add(record_id, phash)
+        except Exception as exc:
+            print(f"[调试] 重建图片近重复索引失败：{exc}")
+        with self._image_index_lock:
+            self._image_index = index
+
+    def _shutdown_pipeline(self):
+        if self._pipeline is None:
+            return
+        timeout = self._config_provider().get("capture_pipeline_drain_timeout", 10.0)
+        self._pipeline.shutdown(timeout=timeout)
+        self._pipeline = None
+
+    def _on_stage_error(self, stage_name, exc):
+        self.error.emit(f"{stage_name}: {exc}")
+
+    def _start_analysis_pool(self):
+        config = self._config_provider()
+        set_region_packs(config.get("region_rule_packs", ["cn"]))
+        if not config.get("analysis_pool_enabled", True):
+            return
+        if self._analysis_pool is None:
+            self._analysis_pool = AnalysisPool(timeout=config.get("analysis_pool_timeout", 10.0))
+        self._analysis_pool.start(config.get("regex_backend", "auto"))
+
+    def _shutdown_analysis_pool(self):
+        if self._analysis_pool is not None:
+            self._analysis_pool.shutdown()
+            self._analysis_pool = None
+
+    def analysis_stats(self):
+        stats = {
+            "cache": self._analysis_cache.stats(),
+            "pipeline": pipeline_stats(),
+            "classifier": get_classifier_metrics(),
+            "incremental": self._incremental.stats(),
+            "capture": self.capture_stats(),
+            "app_resolver": get_resolver().stats(),
+            "policy": self._policies.get(self._config_provider()).stats(),
+            "images": dict(self._image_stats, indexed=len(self._image_index)),
+            "formats": dict(self._format_stats),
+            "size_limits": dict(self._size_stats),
+        }
+        if self._pipeline is not None:
+            stats["capture_pipeline"] = self._pipeline.stats()
+        if self._analysis_pool is not None:
+            stats["pool"] = self._analysis_pool.stats()
+        return stats
+
+    def update_interval(self, interval, max_interval=None, active_interval=None):
+        """设置基础间隔、上限与活跃间隔，并立即唤醒按新的间隔重新计时。"""
+        self._scheduler.set_bounds(interval, max_interval, active_interval)
+        self._wake_event.set()
 
     def reset_last_seen(self):
-        self._last_text = ""
+        self._last_fingerprint = text_fingerprint("")
+        self._last_token = None
 
     def ignore_text_once(self, text: str):
         if not text:
@@ -93,25 +487,296 @@ class ClipboardWorker(QThread):
                     return True
         return False
 
-    def _handle_clipboard_text(self, text):
+    @staticmethod
+    def _time_budget(config):
+        budget_ms = config.get("detection_time_budget_ms") or 0
+        return budget_ms / 1000.0 if budget_ms > 0 else None
+
+    def _analyze(self, text, custom_kw, config, rules_key):
+        time_budget = self._time_budget(config)
+        if config.get("incremental_analysis_enabled", True):
+            # 与上一条内容共享较长前缀 / 后缀时，只重新检测变化区间
+            with self._incremental_lock:
+                result = self._incremental.analyze(text, custom_kw, rules_key, time_budget)
+            if result is not None:
+                return result
+        threshold = int(config.get("analysis_pool_threshold_kb", 256)) * 1024
+        if self._analysis_pool is not None and len(text) >= threshold:
+            # 大内容交给独立进程分析，本线程阻塞等待时释放 GIL，UI 线程不受影响
+            self._analysis_pool.update_timeout(config.get("analysis_pool_timeout", 10.0))
+            result, features = self._analysis_pool.analyze_with_features(text, custom_kw, time_budget)
+        else:
+            # 规范化与特征扫描各做一次，检测与分类共享结果
+            result, features = analyze_with_features(text, custom_kw, time_budget)
+        with self._incremental_lock:
+            # 特征留作下一条内容增量分类的基准
+            self._incremental.offer_features(text, features)
+        return result
+
+    def _capture(self, text, app_name, action=CAPTURE, formats=None, size_class=None):
+        """捕获阶段：记录时间、前台应用与策略后立即交给流水线，不等待分析。
+
+        前台应用必须在复制发生时解析，延后到分析阶段可能已切换窗口。
+        """
+        item = {
+            "text": text,
+            "app": app_name,
+            "policy": action,
+            "timestamp": datetime.now().isoformat(),
+            "formats": formats,
+            "size_class": size_class,
+        }
+        if self._pipeline is None or not self._pipeline.submit(item):
+            print("[调试] 捕获流水线未运行或已满，本条内容未处理")
+
+    def _capture_oversized(self, fingerprint, app_name, action):
+        """超过硬上限：正文不进入流水线，只记录大小与捕获时已算出的摘要。"""
+        size, digest = fingerprint
+        print(f"[调试] 内容超过硬上限（{size} 字节），只记录大小与摘要")
+        item = {
+            "text": "",
+            "app": app_name,
+            "policy": action,
+            "timestamp": datetime.now().isoformat(),
+            "oversize": (size, digest),
+        }
+        if self._pipeline is None or not self._pipeline.submit(item):
+            print("[调试] 捕获流水线未运行或已满，本条内容未处理")
+
+    def _analysis_stage(self, item):
+        if item.get("oversize") is not None:
+            return self._apply_oversize(item)
+        if item.get("image") is not None:
+            return self._image_stage(item)
+        truncated = item.get("size_class") == SOFT
+        if truncated:
+            self._prepare_truncated(item)
+        if item["policy"] in (METADATA_ONLY, MASK_ALL):
+            item = self._apply_restrictive_policy(item)
+            if truncated:
+                item["types"].append(TRUNCATED_TYPE)
+            return item
+        text = item["text"]
         config = self._config_provider()
+        (masked, has_sensitive, types, category, spans), rules_key = self._run_analysis(text, config)
+        # 作为下一条内容的增量基准
+        with self._incremental_lock:
+            self._incremental.remember(text, rules_key, (masked, has_sensitive, types, category, spans))
+        formats = item.get("formats")
+        paths = formats.file_paths() if formats is not None else []
+        if paths:
+            # 文件管理器复制的是确定的文件列表，直接按路径分类
+            category = classify_file_list(paths)
+        item["format_data"] = self._storable_formats(item, has_sensitive, config)
+        if truncated:
+            # 只检测了首尾预览，全文检测完成前按含敏感信息处理
+            has_sensitive = True
+            types = list(types) + [TRUNCATED_TYPE]
+        print(
+            f"[调试] 分类结果：category={category}, app={item['app']}, "
+            f"has_sensitive={has_sensitive}, types={list(types)}"
+        )
+        item.update(
+            masked=masked,
+            has_sensitive=has_sensitive,
+            types=list(types),
+            category=category,
+            spans=list(spans),
+            # 原文只在需要保留时继续向下游传递，超长内容的原文从不传递
+            text=text if config.get("save_raw_content") and item["policy"] != NO_RAW and not truncated else "",
+        )
+        return item
+
+    def _run_analysis(self, text, config, use_cache=True):
+        """返回 ((masked, has_sensitive, types, category, spans), rules_key)。"""
         custom_kw = config.get("custom_sensitive_keywords", [])
-        masked, has_sensitive, types = detect_and_mask(text, custom_kw)
-        app_name = get_active_app_name()
-        category = classify_content(text)
-        timestamp = datetime.now().isoformat()
-        print(f"[调试] 分类结果：category={category}, app={app_name}, has_sensitive={has_sensitive}, types={types}")
-        record_id = add_record(masked, app_name, category, types, has_sensitive, timestamp=timestamp)
-        payload = {
-            "id": record_id,
-            "timestamp": timestamp,
-            "app": app_name or "Unknown",
-            "category": category,
-            "types": types or [],
-            "masked": masked,
-            "raw": text if config.get("save_raw_content") else "",
-            "has_sensitive": has_sensitive,
+        set_backend(config.get("regex_backend", "auto"))
+        # 启用集合变化时递增规则版本，分析缓存随之失效
+        set_region_packs(config.get("region_rule_packs", ["cn"]))
+        rules_key = (rules_generation(), tuple(custom_kw))
+        fingerprint = content_fingerprint(text) if use_cache else None
+        cached = self._analysis_cache.get(fingerprint, rules_key) if use_cache else None
+        if cached is not None:
+            stats = self._analysis_cache.stats()
+            print(f"[调试] 命中分析缓存（命中率 {stats['hit_rate']:.0%}，{stats['hits']}/{stats['hits'] + stats['misses']}）")
+            return cached, rules_key
+        result = self._analyze(text, custom_kw, config, rules_key)
+        masked, has_sensitive, types, category, spans = result
+        if use_cache and TIMEOUT_TYPE not in types:
+            # 超时的保守结果可能只是暂时性的，不写入缓存
+            self._analysis_cache.put(
+                fingerprint, rules_key, (masked, has_sensitive, tuple(types), category, tuple(spans))
+            )
+        return result, rules_key
+
+    def _prepare_truncated(self, item):
+        """超过软上限：本阶段只分析首尾预览并立即入库，全文留给 deferred 阶段。"""
+        text = item["text"]
+        item["text"] = head_tail_preview(text)
+        self._size_stats["truncated"] += 1
+        if item["policy"] in (CAPTURE, NO_RAW):
+            item["deferred_text"] = text
+        print(f"[调试] 内容超过软上限（{len(text)} 字符），先保存首尾预览（{len(item['text'])} 字符）")
+
+    def _apply_oversize(self, item):
+        size, digest = item.pop("oversize")
+        self._size_stats["oversized"] += 1
+        item.update(
+            masked=oversize_summary(size, digest),
+            has_sensitive=True,
+            types=[OVERSIZE_TYPE],
+            category="Text",
+            spans=[],
+            text="",
+        )
+        return item
+
+    def _deferred_stage(self, item):
+        """后台完成超长内容的全文检测与分类，并用完整结果替换先行入库的预览。"""
+        text = item.pop("deferred_text", None)
+        if text is None:
+            return None
+        started = time.perf_counter()
+        # 全文结果可能有数 MB，不放入分析缓存
+        (masked, has_sensitive, types, category, spans), _rules_key = self._run_analysis(
+            text, self._config_provider(), use_cache=False
+        )
+        del text
+        formats = item.get("formats")
+        paths = formats.file_paths() if formats is not None else []
+        if paths:
+            category = classify_file_list(paths)
+        spans = list(spans)
+        updated = update_record_analysis(
+            item["id"],
+            masked,
+            category,
+            list(types),
+            has_sensitive,
+            spans=[(span.type, span.start, span.end, span.rule_id) for span in spans],
+        )
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self._size_stats["deferred_completed"] += 1
+        self._size_stats["deferred_ms"] += elapsed_ms
+        print(f"[调试] 超长内容全文分析完成 id={item['id']}，耗时 {elapsed_ms:.0f} ms")
+        if updated:
+            item.update(masked=masked, has_sensitive=has_sensitive, types=list(types), category=category, spans=spans)
+            self.record_updated.emit(self._payload(item))
+        return None
+
+    def _storable_formats(self, item, has_sensitive, config):
+        """附加格式保存的是未脱敏的原始内容：检测到敏感信息时与原文一样，只在开启保存原文时保留。"""
+        formats = item.get("formats")
+        if formats is None or not formats.data or item["policy"] != CAPTURE:
+            return {}
+        if has_sensitive and not config.get("save_raw_content"):
+            self._format_stats["withheld"] += len(formats.data)
+            return {}
+        return dict(formats.data)
+
+    def _image_stage(self, item):
+        """解码、感知哈希去重与压缩；近似重复的截图不再入库。"""
+        image = load_image(item.pop("image"))
+        if image is None:
+            print("[调试] 无法解码剪贴板图片，跳过")
+            return None
+        phash = perceptual_hash(image)
+        with self._image_index_lock:
+            match = self._image_index.find(phash)
+            if match is not None and not record_is_active(match[0]):
+                # 命中的记录已被删除，不再作为去重依据
+                self._image_index.remove(match[0])
+                match = None
+            if match is None:
+                # 先以占位键登记，并发的相似图片不会同时通过去重
+                self._image_index.add(id(item), phash)
+        if match is not None:
+            self._image_stats["deduplicated"] += 1
+            print(f"[调试] 图片与记录 {match[0]} 近似重复（汉明距离 {match[1]}），跳过")
+            return None
+        width, height = image.width(), image.height()
+        stored = None
+        if item["policy"] == CAPTURE:
+            # 只有未受策略限制的应用保存图片本身，其余只记录尺寸等元数据
+            data = encode_image(image)
+            stored = (IMAGE_FORMAT, width, height, data, phash)
+        print(f"[调试] 捕获图片 {width}×{height}，app={item['app']}，压缩后 {len(stored[3]) if stored else 0} 字节")
+        item.update(
+            masked=f"[Image {width}×{height}]",
+            has_sensitive=False,
+            types=[],
+            category="Image",
+            spans=[],
+            stored_image=stored,
+            phash=phash,
+            image_info={"width": width, "height": height, "size": len(stored[3]) if stored else 0},
+        )
+        return item
+
+    @staticmethod
+    def _apply_restrictive_policy(item):
+        """仅记录元数据或整段遮盖：跳过检测，原文不向下游传递。"""
+        text = item["text"]
+        if item["policy"] == METADATA_ONLY:
+            masked, category, types = "", "Text", [METADATA_ONLY_TYPE]
+        else:
+            masked, category, types = conservative_mask(text), classify_content(text), [MASK_ALL_TYPE]
+        item.update(masked=masked, has_sensitive=True, types=types, category=category, spans=[], text="")
+        return item
+
+    def _persistence_stage(self, item):
+        try:
+            item["id"] = add_record(
+                item["masked"],
+                item["app"],
+                item["category"],
+                item["types"],
+                item["has_sensitive"],
+                timestamp=item["timestamp"],
+                spans=[(span.type, span.start, span.end, span.rule_id) for span in item["spans"]],
+                image=item.get("stored_image"),
+                formats=item["formats"].available if item.get("formats") is not None else None,
+                format_data=item.get("format_data"),
+            )
+        finally:
+            if "phash" in item:
+                with self._image_index_lock:
+                    self._image_index.remove(id(item))
+        if "phash" in item:
+            with self._image_index_lock:
+                self._image_index.add(item["id"], item["phash"])
+            self._image_stats["captured"] += 1
+            self._image_stats["stored_bytes"] += item["image_info"]["size"]
+        if item.get("format_data"):
+            self._format_stats["stored"] += len(item["format_data"])
+            self._format_stats["stored_bytes"] += sum(len(data) for data in item["format_data"].values())
+        return item
+
+    def _notify_stage(self, item):
+        self.record_ready.emit(self._payload(item))
+        # 超长内容继续交给 deferred 阶段做全文分析
+        return item if item.get("deferred_text") is not None else None
+
+    def _payload(self, item):
+        """界面信号的载荷：不含超长原文，脱敏内容最多携带 MASKED_PREVIEW_CHARS 个字符。"""
+        masked = item["masked"]
+        return {
+            "id": item["id"],
+            "timestamp": item["timestamp"],
+            "app": item["app"] or "Unknown",
+            "category": item["category"],
+            "types": item["types"] or [],
+            "masked": masked[:MASKED_PREVIEW_CHARS],
+            # 超出部分由界面在展示详情时从数据库读取
+            "masked_length": len(masked),
+            "raw": item["text"],
+            # 含原文偏移的区间只在内存中随记录传递，供原文高亮与不重新检测的重新脱敏
+            "spans": item["spans"],
+            "has_sensitive": item["has_sensitive"],
+            # 图片记录只携带尺寸信息，缩略图由界面按需从数据库生成
+            "image": item.get("image_info"),
+            "formats": item["formats"].available if item.get("formats") is not None else [],
+            "stored_formats": sorted(item.get("format_data") or {}),
             "is_favorite": False,
             "is_deleted": False,
         }
-        self.record_ready.emit(payload)
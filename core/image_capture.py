@@ -0,0 +1,49 @@
+# core/image_capture.py
+from __future__ import annotations
+
+from PySide6.QtCore import QBuffer, QByteArray, QIODevice, Qt
+from PySide6.QtGui import QImage
+
+from image_hash import HASH_HEIGHT, HASH_WIDTH, dhash
+
+# 截图以大面积纯色为主，无损 PNG 的压缩率已经很高，且所有平台的 Qt 都内置该编码器
+IMAGE_FORMAT = "png"
+
+
+def load_image(data):
+    """把剪贴板原始数据（PNG / TIFF / BMP 等）解码为 QImage，已是 QImage 时原样返回。"""
+    if isinstance(data, QImage):
+        return data
+    image = QImage.fromData(bytes(data))
+    return image if not image.isNull() else None
+
+
+def encode_image(image, image_format=IMAGE_FORMAT):
+    buffer = QByteArray()
+    device = QBuffer(buffer)
+    device.open(QIODevice.WriteOnly)
+    if not image.save(device, image_format.upper()):
+        raise ValueError(f"图片编码失败：{image_format}")
+    device.close()
+    return bytes(buffer.data())
+
+
+def perceptual_hash(image):
+    """先缩到 9×8 再转灰度，开销与原图尺寸基本无关。"""
+    small = image.scaled(HASH_WIDTH, HASH_HEIGHT, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    gray = small.convertToFormat(QImage.Format_Grayscale8)
+    stride = gray.bytesPerLine()
+    raw = bytes(gray.constBits())
+    # 每行可能有对齐填充，按 bytesPerLine 取出有效像素
+    pixels = b"".join(raw[row * stride: row * stride + HASH_WIDTH] for row in range(HASH_HEIGHT))
+    return dhash(pixels)
+
+
+def make_thumbnail(data, max_width, max_height):
+    """在线程池中调用：解码压缩数据并生成 PNG 缩略图字节。"""
+    image = load_image(data)
+    if image is None:
+        return None
+    if image.width() > max_width or image.height() > max_height:
+        image = image.scaled(max_width, max_height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return encode_image(image)
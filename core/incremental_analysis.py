@@ -0,0 +1,138 @@
+# core/incremental_analysis.py
+from __future__ import annotations
+
+from classifier import classify_features
+from content_features import extract_features, feature_baseline, update_features
+from sensitive_detector import TIMEOUT_TYPE, detect_delta
+
+# 指纹分块长度：共享前缀 / 后缀按整块判定，块内的差异交给增量检测两侧的 margin 重扫
+_FINGERPRINT_BLOCK = 4096
+
+
+def text_fingerprints(text, block=_FINGERPRINT_BLOCK):
+    """返回 (head, tail)：从开头、从末尾按定长切块的指纹列表，两端不满一块的部分单独成块。
+
+    指纹只在本进程内比较，直接使用字符串哈希；多 MB 的内容也只保留几千个整数。
+    """
+    length = len(text)
+    head = [hash(text[index:index + block]) for index in range(0, length, block)]
+    tail = [hash(text[max(0, index - block):index]) for index in range(length, 0, -block)]
+    return head, tail
+
+
+def shared_affixes(previous, current, previous_length, length, block=_FINGERPRINT_BLOCK):
+    """由两段文本的指纹估算 (prefix, suffix)：公共前缀与公共后缀的长度，按块向下取整。
+
+    结果可能比真实值短，但不会越过任何不同的字符；二者之和不超过较短者。
+    """
+    limit = min(previous_length, length)
+    prefix = min(limit, block * _matching_blocks(previous[0], current[0]))
+    suffix = min(limit - prefix, block * _matching_blocks(previous[1], current[1]))
+    return prefix, suffix
+
+
+def _matching_blocks(previous, current):
+    count = 0
+    for old, new in zip(previous, current):
+        if old != new:
+            break
+        count += 1
+    return count
+
+
+class IncrementalAnalyzer:
+    """记住上一条内容的分析结果；新内容与之共享较长的前缀或后缀时只重扫变化区间。
+
+    典型场景是反复复制同一段不断变长的日志，追加部分的检测开销与增量成正比。
+    基准只保留长度、分块指纹、命中区间及其脱敏片段与特征区间，不保留上一条的原文或完整脱敏结果。
+    """
+
+    def __init__(self, min_length=4096, min_shared_ratio=0.5, margin=256):
+        self._min_length = max(0, int(min_length))
+        self._min_shared_ratio = float(min_shared_ratio)
+        self._margin = max(0, int(margin))
+        self._previous = None
+        # (text, features)：最近一次分析得到的特征，remember 同一条内容时一并记住
+        self._offered = None
+        # (text, fingerprints)：analyze 已经算出的指纹，remember 同一条内容时直接复用
+        self._fingerprinted = None
+        self._stats = {
+            "hits": 0,
+            "fallbacks": 0,
+            "scanned_chars": 0,
+            "total_chars": 0,
+        }
+
+    def reset(self):
+        self._previous = None
+        self._offered = None
+        self._fingerprinted = None
+
+    def offer_features(self, text, features):
+        """全文分析时顺带得到的特征，作为下一次增量分类的基准。"""
+        self._offered = (text, features) if features is not None else None
+
+    def remember(self, text, rules_key, result):
+        masked, _has_sensitive, types, _category, spans = result
+        offered, self._offered = self._offered, None
+        fingerprinted, self._fingerprinted = self._fingerprinted, None
+        if TIMEOUT_TYPE in types:
+            # 保守脱敏的结果没有区间，无法作为增量基准
+            self._previous = None
+            return
+        features = offered[1] if offered is not None and offered[0] is text else None
+        if fingerprinted is not None and fingerprinted[0] is text:
+            fingerprints = fingerprinted[1]
+        else:
+            fingerprints = text_fingerprints(text)
+        spans = list(spans)
+        masks = [masked[span.start:span.end] for span in spans]
+        self._previous = (len(text), fingerprints, spans, masks, rules_key, feature_baseline(features))
+
+    def analyze(self, text, custom_keywords, rules_key, time_budget=None):
+        """可以增量分析时返回 (masked, has_sensitive, types, category, spans)，否则返回 None。"""
+        previous = self._previous
+        if previous is None or len(text) < self._min_length:
+            return None
+        previous_length, previous_fingerprints, previous_spans, previous_masks, previous_key, baseline = previous
+        if previous_key != rules_key:
+            return None
+        fingerprints = text_fingerprints(text)
+        self._fingerprinted = (text, fingerprints)
+        prefix, suffix = shared_affixes(previous_fingerprints, fingerprints, previous_length, len(text))
+        if prefix + suffix < self._min_shared_ratio * len(text):
+            return None
+        detected = detect_delta(
+            previous_length,
+            previous_spans,
+            previous_masks,
+            text,
+            prefix,
+            suffix,
+            custom_keywords,
+            time_budget,
+            margin=self._margin,
+        )
+        if detected is None:
+            self._stats["fallbacks"] += 1
+            return None
+        masked, has_sensitive, types, spans = detected
+        changed = len(text) - prefix - suffix
+        self._stats["hits"] += 1
+        self._stats["scanned_chars"] += changed + 2 * self._margin
+        self._stats["total_chars"] += len(text)
+        print(f"[调试] 增量分析：共享前缀 {prefix}、后缀 {suffix}，变化 {changed} 字符")
+        features = None
+        if baseline is not None:
+            features = update_features(baseline, text, prefix, suffix, margin=self._margin)
+        if features is None:
+            # 基准来自缓存等没有特征的路径，或新内容无法增量更新：完整提取一次，之后的增量从这里平移
+            features = extract_features(text)
+        self._offered = (text, features)
+        return masked, has_sensitive, types, classify_features(features), spans
+
+    def stats(self):
+        stats = dict(self._stats)
+        total = stats["total_chars"]
+        stats["scanned_ratio"] = min(1.0, stats["scanned_chars"] / total) if total else 0.0
+        return stats
@@ -0,0 +1,119 @@
+# core/poll_scheduler.py
+from __future__ import annotations
+
+import time
+from collections import deque
+
+
+class AdaptivePollScheduler:
+    """轮询模式下的自适应间隔：平时按基础间隔轮询，只有内容刚变化（连续复制）时才收紧到
+    active_interval，持续无变化时从基础间隔按指数退避到上限。
+
+    系统空闲（无键鼠输入）或本应用窗口处于前台时，用户不会在其他应用中复制，直接使用上限；
+    窗口失去焦点或用户回到电脑前时回到基础间隔。
+    """
+
+    def __init__(self, interval=0.8, max_interval=3.0, active_interval=0.3, backoff=2.0, burst_window=2.0,
+                 idle_after=60.0, idle_probe=None, clock=time.monotonic):
+        self._backoff = max(1.0, float(backoff))
+        # 变化后保持下限的时长，覆盖连续复制的场景
+        self._burst_window = max(0.0, float(burst_window))
+        self._idle_after = float(idle_after)
+        # 返回系统空闲秒数的函数，无法获取时返回 None
+        self._idle_probe = idle_probe
+        self._clock = clock
+        self._active = self._base = self._max = self._interval = 0.1
+        self.set_bounds(interval, max_interval, active_interval)
+        self._interval = self._base
+        self._last_change = clock()
+        self._last_poll = None
+        self._app_active = False
+        self._idle_checked = 0.0
+        self._idle = False
+        self._wakeups = deque()
+        self._changes = 0
+        self._latency_total = 0.0
+        self._latency_samples = 0
+
+    def set_bounds(self, interval, max_interval=None, active_interval=None):
+        """interval 为基础间隔；active_interval 不超过基础间隔，max_interval 不低于基础间隔。"""
+        self._base = max(0.1, float(interval))
+        self._max = max(self._base, float(max_interval if max_interval is not None else self._max))
+        active = float(active_interval if active_interval is not None else self._active)
+        self._active = min(self._base, max(0.1, active))
+        self._interval = min(max(self._interval, self._active), self._max)
+
+    def bounds(self):
+        return self._active, self._base, self._max
+
+    def set_app_active(self, active):
+        active = bool(active)
+        if self._app_active and not active:
+            # 离开本应用窗口后回到基础间隔，真正复制后再收紧
+            self._interval = self._base
+            self._last_change = self._clock()
+        self._app_active = active
+
+    def next_interval(self):
+        """下一次轮询前应等待的秒数。"""
+        if self._app_active or self._user_idle():
+            return self._max
+        return self._interval
+
+    def record_poll(self, changed):
+        """每次轮询后调用；changed 表示读到了与上一条不同的内容。"""
+        now = self._clock()
+        self._wakeups.append(now)
+        while self._wakeups and now - self._wakeups[0] > 60.0:
+            self._wakeups.popleft()
+        if changed:
+            if self._last_poll is not None:
+                # 变化发生在上一次与本次轮询之间，按均匀分布估计平均延迟
+                self._latency_total += (now - self._last_poll) / 2
+                self._latency_samples += 1
+            self._changes += 1
+            self._last_change = now
+            self._interval = self._active
+        elif now - self._last_change >= self._burst_window:
+            # 活跃窗口结束：先回到基础间隔，再从基础间隔开始退避
+            if self._interval < self._base:
+                self._interval = self._base
+            else:
+                self._interval = min(self._max, self._interval * self._backoff)
+        self._last_poll = now
+
+    def _user_idle(self):
+        if self._idle_probe is None:
+            return False
+        now = self._clock()
+        # 空闲查询本身有系统调用开销，每秒最多一次
+        if now - self._idle_checked >= 1.0:
+            self._idle_checked = now
+            try:
+                idle_seconds = self._idle_probe()
+            except Exception:
+                idle_seconds = None
+            was_idle = self._idle
+            self._idle = idle_seconds is not None and idle_seconds >= self._idle_after
+            if was_idle and not self._idle:
+                # 用户回到电脑前，从基础间隔重新开始
+                self._interval = self._base
+                self._last_change = now
+        return self._idle
+
+    def stats(self):
+        now = self._clock()
+        recent = [stamp for stamp in self._wakeups if now - stamp <= 60.0]
+        return {
+            "interval": self._max if self._app_active or self._idle else self._interval,
+            "active_interval": self._active,
+            "base_interval": self._base,
+            "max_interval": self._max,
+            "wakeups_per_min": len(recent),
+            "changes": self._changes,
+            "avg_latency_ms": (
+                self._latency_total * 1000 / self._latency_samples if self._latency_samples else 0.0
+            ),
+            "user_idle": self._idle,
+            "app_active": self._app_active,
+        }
@@ -0,0 +1,144 @@
+# core/reclassify_job.py
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from PySide6.QtCore import QThread, Signal
+
+from classifier import FILE_LIST_CATEGORY
+from clip_formats import URI_LIST
+from core.analysis_pool import classify_batch
+from core.capture_limits import OVERSIZE_TYPE, TRUNCATED_TYPE
+from core.capture_policy import MASK_ALL_TYPE, METADATA_ONLY_TYPE
+from database import (
+    apply_reclassify_batch,
+    clear_job_state,
+    count_reclassify_candidates,
+    fetch_reclassify_batch,
+    get_job_state,
+)
+
+# 这些类别依据的手机号、邮箱、证件号在入库时已被脱敏，
+# 对脱敏文本重新分类会丢失证据，只允许被更明确的类别覆盖
+_MASKED_EVIDENCE_CATEGORIES = {"Email", "Phone", "ID"}
+_WEAK_CATEGORIES = {"Text", "Business"}
+# 依据文件列表或图片本身得出的类别，脱敏文本中没有对应证据，保持不变
+_NON_TEXT_CATEGORIES = {FILE_LIST_CATEGORY, "Image"}
+# 按策略或大小限制入库的记录，正文只是占位、整段遮盖或首尾预览，不能代表原内容
+_PLACEHOLDER_TYPES = {METADATA_ONLY_TYPE, MASK_ALL_TYPE, TRUNCATED_TYPE, OVERSIZE_TYPE}
+
+
+def is_reclassifiable(types_serialized, formats_serialized):
+    """文件列表的类别来自路径（可能是任意多数类别），带占位标记的记录没有可分类的正文。"""
+    if URI_LIST in (formats_serialized or "").split(","):
+        return False
+    return not any(t in _PLACEHOLDER_TYPES for t in (types_serialized or "").split(","))
+
+
+def resolve_category(previous, new):
+    if previous in _NON_TEXT_CATEGORIES:
+        return previous
+    if previous in _MASKED_EVIDENCE_CATEGORIES and new in _WEAK_CATEGORIES:
+        return previous
+    return new
+
+
+class ReclassifyJob(QThread):
+    """分类规则变化后，按批次在进程池中重新分类历史记录，只写回类别变化的行。"""
+
+    JOB_NAME = "reclassify"
+
+    progress = Signal(int, int)
+    completed = Signal(int)
+    error = Signal(str)
+
+    def __init__(self, batch_size=500, workers=None, backend="auto", state=None, parent=None):
+        super().__init__(parent)
+        self._stop_event = threading.Event()
+        self._batch_size = max(1, int(batch_size))
+        self._workers = max(1, int(workers or min(4, os.cpu_count() or 1)))
+        self._backend = backend or "auto"
+        if state is None:
+            state = {
+                "last_id": 0,
+                "done": 0,
+                "total": None,
+                "changed": 0,
+                # "旧类别->新类别" 的变更计数
+                "transitions": {},
+            }
+        self._state = dict(state)
+
+    @classmethod
+    def pending_state(cls):
+        return get_job_state(cls.JOB_NAME)
+
+    @classmethod
+    def resume(cls, batch_size=500, workers=None, backend="auto", parent=None):
+        state = cls.pending_state()
+        if not state:
+            return None
+        return cls(batch_size=batch_size, workers=workers, backend=backend, state=state, parent=parent)
+
+    def state(self):
+        return dict(self._state)
+
+    def request_stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        state = self._state
+        executor = None
+        try:
+            if state.get("total") is None:
+                state["total"] = count_reclassify_candidates(0)
+            print(f"[调试] 开始重新分类历史记录：total={state['total']}, 检查点 id={state['last_id']}, 进程数={self._workers}")
+            self.progress.emit(state["done"], state["total"])
+            executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            while not self._stop_event.is_set():
+                rows = fetch_reclassify_batch(state["last_id"], self._batch_size)
+                if not rows:
+                    break
+                candidates = [row[:5] for row in rows if is_reclassifiable(row[4], row[5])]
+                categories = self._classify(executor, [row[1] for row in candidates]) if candidates else []
+                updates = []
+                transitions = state.setdefault("transitions", {})
+                for (record_id, masked, app, previous, types_serialized), new in zip(candidates, categories):
+                    category = resolve_category(previous, new)
+                    if category == previous:
+                        continue
+                    updates.append((record_id, masked, app, category, types_serialized))
+                    key = f"{previous}->{category}"
+                    transitions[key] = transitions.get(key, 0) + 1
+                state["last_id"] = rows[-1][0]
+                state["done"] = min(state["total"], state["done"] + len(rows))
+                state["changed"] += len(updates)
+                apply_reclassify_batch(updates, self.JOB_NAME, state)
+                self.progress.emit(state["done"], state["total"])
+            if self._stop_event.is_set():
+                print(f"[调试] 重新分类任务已暂停，检查点 id={state['last_id']}")
+                return
+            clear_job_state(self.JOB_NAME)
+            print(f"[调试] 重新分类完成，共更新 {state['changed']} 条记录：{state.get('transitions')}")
+            self.completed.emit(state["changed"])
+        except Exception as exc:
+            print(f"[调试] 重新分类任务失败：{exc}")
+            self.error.emit(str(exc))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def _classify(self, executor, texts):
+        # 按进程数切分，每个子进程处理一段，结果按原顺序拼回
+        size = max(1, -(-len(texts) // self._workers))
+        chunks = [texts[i:i + size] for i in range(0, len(texts), size)]
+        categories = []
+        for chunk_result in executor.map(classify_batch, chunks, [self._backend] * len(chunks)):
+            categories.extend(chunk_result)
+        return categories
@@ -0,0 +1,131 @@
+# core/remask_job.py
+from __future__ import annotations
+
+import threading
+
+from PySide6.QtCore import QThread, Signal
+
+from database import (
+    apply_remask_batch,
+    clear_job_state,
+    count_remask_candidates,
+    fetch_remask_batch,
+    get_job_state,
+    get_spans_for_records,
+    split_remask_keywords,
+)
+from sensitive_detector import DetectionSpan, detect_spans_and_mask, rebase_spans, rules_generation
+
+
+class RemaskJob(QThread):
+    """后台按批次对历史记录重新应用当前脱敏规则，检查点写入数据库，重启后可续跑。"""
+
+    JOB_NAME = "remask"
+
+    progress = Signal(int, int)
+    completed = Signal(int)
+    error = Signal(str)
+
+    def __init__(self, keywords=None, custom_keywords=None, batch_size=200, state=None, parent=None):
+        super().__init__(parent)
+        self._stop_event = threading.Event()
+        self._batch_size = max(1, int(batch_size))
+        if state is None:
+            keywords = [kw for kw in (keywords or []) if kw]
+            state = {
+                # keywords 为空表示规则集变化，需要扫描全部历史
+                "keywords": keywords,
+                "custom_keywords": list(custom_keywords or []),
+                "rules_generation": rules_generation(),
+                # FTS 阶段只处理可整词检索的关键词，scan 阶段只为其余关键词做子串扫描
+                "phase": "fts" if split_remask_keywords(keywords)[0] else "scan",
+                "last_id": 0,
+                "done": 0,
+                "total": None,
+                "updated": 0,
+            }
+        self._state = dict(state)
+
+    @classmethod
+    def pending_state(cls):
+        return get_job_state(cls.JOB_NAME)
+
+    @classmethod
+    def resume(cls, custom_keywords=None, batch_size=200, parent=None):
+        state = cls.pending_state()
+        if not state:
+            return None
+        if custom_keywords is not None:
+            state["custom_keywords"] = list(custom_keywords)
+        return cls(state=state, batch_size=batch_size, parent=parent)
+
+    def keywords(self):
+        return list(self._state.get("keywords") or [])
+
+    def request_stop(self):
+        self._stop_event.set()
+
+    @staticmethod
+    def _needs_scan(keywords):
+        fts_keywords, scan_keywords = split_remask_keywords(keywords)
+        # 没有关键词表示规则集变化，需要扫描全部历史
+        return bool(scan_keywords) or not fts_keywords
+
+    def _count_total(self, keywords):
+        """只统计实际会执行的阶段；两个阶段的记录互不重叠。"""
+        total = 0
+        if split_remask_keywords(keywords)[0]:
+            total += count_remask_candidates(keywords, 0, use_fts=True)
+        if self._needs_scan(keywords):
+            total += count_remask_candidates(keywords, 0, use_fts=False)
+        return total
+
+    def run(self):
+        state = self._state
+        keywords = state.get("keywords") or []
+        custom_keywords = state.get("custom_keywords") or []
+        try:
+            if state.get("total") is None:
+                state["total"] = self._count_total(keywords)
+            print(f"[调试] 开始重新脱敏历史记录：keywords={keywords}, phase={state['phase']}, total={state['total']}")
+            self.progress.emit(state["done"], state["total"])
+            while state["phase"] in ("fts", "scan"):
+                use_fts = state["phase"] == "fts"
+                while not self._stop_event.is_set():
+                    rows = fetch_remask_batch(keywords, state["last_id"], self._batch_size, use_fts=use_fts)
+                    if not rows:
+                        break
+                    updates = []
+                    stored_spans = None
+                    for record_id, masked, app, category, types_serialized in rows:
+                        new_masked, has_sensitive, new_types, edits = detect_spans_and_mask(masked or "", custom_keywords)
+                        if new_masked == masked:
+                            continue
+                        if stored_spans is None:
+                            stored_spans = get_spans_for_records(row[0] for row in rows)
+                        # 旧区间按新增脱敏的长度变化平移，无需回溯原文
+                        previous = [DetectionSpan(*span) for span in stored_spans.get(record_id, [])]
+                        spans = [
+                            (span.type, span.start, span.end, span.rule_id)
+                            for span in rebase_spans(previous, edits)
+                        ]
+                        merged = [t for t in (types_serialized or "").split(",") if t]
+                        merged += [t for t in new_types if t not in merged]
+                        updates.append((record_id, new_masked, app, category, ",".join(merged), bool(merged), spans))
+                    state["last_id"] = rows[-1][0]
+                    state["done"] = min(state["total"], state["done"] + len(rows))
+                    state["updated"] += len(updates)
+                    apply_remask_batch(updates, self.JOB_NAME, state)
+                    self.progress.emit(state["done"], state["total"])
+                if self._stop_event.is_set():
+                    print(f"[调试] 重新脱敏任务已暂停，检查点 id={state['last_id']}")
+                    return
+                # FTS 阶段结束后，只有存在无法整词检索的关键词时才需要子串扫描
+                state["phase"] = "scan" if use_fts and self._needs_scan(keywords) else "finished"
+                state["last_id"] = 0
+            clear_job_state(self.JOB_NAME)
+            print(f"[调试] 重新脱敏完成，共更新 {state['updated']} 条记录")
+            self.completed.emit(state["updated"])
+        except Exception as exc:
+            print(f"[调试] 重新脱敏任务失败：{exc}")
+            self.error.emit(str(exc))
@@ -0,0 +1,149 @@
+# core/thumbnails.py
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QObject, Signal
+
+from core.image_capture import make_thumbnail
+from database import get_image_blob
+
+THUMBNAIL_DIR = os.path.expanduser("~/.clipguard/cache/thumbnails")
+THUMBNAIL_SIZE = (320, 200)
+
+
+class ThumbnailCache:
+    """磁盘上的缩略图 LRU 缓存：总大小超过上限时删除最久未使用的文件。
+
+    访问时更新文件的修改时间，重启后按修改时间恢复使用顺序。
+    """
+
+    def __init__(self, directory=THUMBNAIL_DIR, max_bytes=64 * 1024 * 1024):
+        self._directory = directory
+        self._max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._total = 0
+        self._stats = {"hits": 0, "misses": 0, "evicted": 0}
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(".png"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+        for _mtime, key, size in sorted(files):
+            self._entries[key] = size
+            self._total += size
+        with self._lock:
+            self._evict()
+
+    def _path(self, key):
+        return os.path.join(self._directory, f"{key}.png")
+
+    def get(self, key):
+        """命中时返回文件路径并标记为最近使用。"""
+        key = str(key)
+        with self._lock:
+            if key not in self._entries:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            self.discard(key)
+            return None
+        return path
+
+    def put(self, key, data):
+        key = str(key)
+        path = self._path(key)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as handle:
+            handle.write(data)
+        os.replace(temp_path, path)
+        with self._lock:
+            self._total -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total += len(data)
+            self._evict()
+        return path
+
+    def discard(self, key):
+        key = str(key)
+        with self._lock:
+            self._total -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self._total > self._max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total -= size
+            self._stats["evicted"] += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._total, max_bytes=self._max_bytes)
+
+
+class ThumbnailService(QObject):
+    """按需生成图片记录的缩略图：读库、解码与缩放都在线程池中完成，GUI 线程只加载结果文件。"""
+
+    thumbnailReady = Signal(int, str)
+
+    def __init__(self, cache=None, workers=2, size=THUMBNAIL_SIZE, parent=None):
+        super().__init__(parent)
+        self._cache = cache or ThumbnailCache()
+        self._size = size
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix="thumbnail")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def request(self, record_id):
+        """缓存命中时直接返回路径；否则提交后台生成并返回 None，完成后发出 thumbnailReady。"""
+        path = self._cache.get(record_id)
+        if path is not None:
+            return path
+        with self._lock:
+            if record_id in self._pending:
+                return None
+            self._pending.add(record_id)
+        self._executor.submit(self._generate, record_id)
+        return None
+
+    def discard(self, record_id):
+        self._cache.discard(record_id)
+
+    def stats(self):
+        return self._cache.stats()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _generate(self, record_id):
+        path = ""
+        try:
+            blob = get_image_blob(record_id)
+            if blob is not None:
+                data = make_thumbnail(blob[1], *self._size)
+                if data is not None:
+                    path = self._cache.put(record_id, data)
+        except Exception as exc:
+            print(f"[调试] 生成缩略图失败 id={record_id}：{exc}")
+        finally:
+            with self._lock:
+                self._pending.discard(record_id)
+        # 跨线程发射，槽函数在 GUI 线程执行；空路径表示该记录没有可用的图片
+        self.thumbnailReady.emit(record_id, path)
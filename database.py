@@ -1,9 +1,12 @@
 # database.py
+import json
 import sqlite3
 import os
 from datetime import datetime
 
 DB_PATH = os.path.expanduser("~/.clipguard/clipboard.db")
+# 列表查询只取脱敏内容的前若干字符，超长记录的全文在详情页按需读取
+MASKED_PREVIEW_CHARS = 32 * 1024
 
 def init_db():
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
@@ -23,6 +26,48 @@ def init_db():
     """)
     _ensure_column(conn, "is_favorite", "INTEGER DEFAULT 0")
     _ensure_column(conn, "is_deleted", "INTEGER DEFAULT 0")
+    # 复制时剪贴板提供的全部格式（MIME，逗号分隔），只是列表，不含内容
+    _ensure_column(conn, "formats", "TEXT")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS maintenance_jobs (
+            name TEXT PRIMARY KEY,
+            state TEXT NOT NULL,
+            updated_at TEXT
+        )
+    """)
+    # 每条记录的脱敏区间（脱敏结果中的偏移），界面高亮与后续重算无需再次检测
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS detection_spans (
+            record_id INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            start INTEGER NOT NULL,
+            end INTEGER NOT NULL,
+            rule_id TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_detection_spans_record ON detection_spans(record_id)")
+    # 图片记录的压缩数据单独存放，列表查询不会读到大字段；phash 为 64 位感知哈希（按有符号整数存储）
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS clip_images (
+            record_id INTEGER PRIMARY KEY,
+            format TEXT NOT NULL,
+            width INTEGER,
+            height INTEGER,
+            size INTEGER,
+            phash INTEGER,
+            data BLOB NOT NULL
+        )
+    """)
+    # HTML / RTF / 文件列表等附加格式的内容，只在详情页切换格式时按需读取
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS clip_formats (
+            record_id INTEGER NOT NULL,
+            mime TEXT NOT NULL,
+            size INTEGER,
+            data BLOB NOT NULL,
+            PRIMARY KEY (record_id, mime)
+        )
+    """)
     _ensure_fts(conn)
     conn.commit()
     conn.close()
@@ -35,23 +80,153 @@ def _ensure_column(conn, column, definition):
         conn.execute(f"ALTER TABLE clipboard ADD COLUMN {column} {definition}")
 
 
-def add_record(masked, app, category, sensitive_types, has_sensitive, timestamp=None):
+def add_record(
+    masked, app, category, sensitive_types, has_sensitive, timestamp=None, spans=None, image=None,
+    formats=None, format_data=None,
+):
+    """spans 为 (type, start, end, rule_id) 序列，与记录在同一事务中写入。
+
+    image 为 (format, width, height, data, phash)，图片数据写入 clip_images。
+    formats 为可用格式列表；format_data 为 {mime: bytes}，写入 clip_formats。
+    """
     conn = sqlite3.connect(DB_PATH)
     if timestamp is None:
         timestamp = datetime.now().isoformat()
     types_serialized = ",".join(sensitive_types)
     print(f"[调试] 写入数据库：app={app}, category={category}, has_sensitive={has_sensitive}, types={types_serialized}, timestamp={timestamp}")
     cursor = conn.execute("""
-        INSERT INTO clipboard (masked_content, source_app, category, sensitive_types, has_sensitive, timestamp, is_favorite, is_deleted)
-        VALUES (?, ?, ?, ?, ?, ?, 0, 0)
-    """, (masked, app, category, types_serialized, has_sensitive, timestamp))
+        INSERT INTO clipboard (masked_content, source_app, category, sensitive_types, has_sensitive, timestamp, is_favorite, is_deleted, formats)
+        VALUES (?, ?, ?, ?, ?, ?, 0, 0, ?)
+    """, (masked, app, category, types_serialized, has_sensitive, timestamp, ",".join(formats or []) or None))
     row_id = cursor.lastrowid
+    _replace_spans(conn, row_id, spans)
+    if image is not None:
+        image_format, width, height, data, phash = image
+        conn.execute(
+            "INSERT OR REPLACE INTO clip_images (record_id, format, width, height, size, phash, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (row_id, image_format, width, height, len(data), _to_signed64(phash), sqlite3.Binary(data)),
+        )
+    if format_data:
+        conn.executemany(
+            "INSERT OR REPLACE INTO clip_formats (record_id, mime, size, data) VALUES (?, ?, ?, ?)",
+            [(row_id, mime, len(data), sqlite3.Binary(data)) for mime, data in format_data.items()],
+        )
     _upsert_fts(conn, row_id, masked, app, category, types_serialized)
     conn.commit()
     conn.close()
     return row_id
 
 
+def _to_signed64(value):
+    if value is None:
+        return None
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def get_image_blob(record_id):
+    """返回 (format, data)，记录没有图片时返回 None。"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return conn.execute("SELECT format, data FROM clip_images WHERE record_id = ?", (record_id,)).fetchone()
+    finally:
+        conn.close()
+
+
+def get_record_formats(record_id):
+    """已保存的附加格式 [(mime, size)]，不读取内容。"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return conn.execute(
+            "SELECT mime, size FROM clip_formats WHERE record_id = ? ORDER BY mime", (record_id,)
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+def get_format_blob(record_id, mime):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        row = conn.execute(
+            "SELECT data FROM clip_formats WHERE record_id = ? AND mime = ?", (record_id, mime)
+        ).fetchone()
+    finally:
+        conn.close()
+    return bytes(row[0]) if row else None
+
+
+def record_is_active(record_id):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        row = conn.execute("SELECT is_deleted FROM clipboard WHERE id = ?", (record_id,)).fetchone()
+    finally:
+        conn.close()
+    return row is not None and not row[0]
+
+
+def get_image_hashes():
+    """未删除图片记录的 [(record_id, phash)]，用于重建近重复索引。"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        rows = conn.execute(
+            """
+            SELECT i.record_id, i.phash
+            FROM clip_images AS i
+            JOIN clipboard AS c ON c.id = i.record_id
+            WHERE i.phash IS NOT NULL AND c.is_deleted = 0
+            """
+        ).fetchall()
+    finally:
+        conn.close()
+    return [(record_id, phash & ((1 << 64) - 1)) for record_id, phash in rows]
+
+
+def get_record_spans(record_id):
+    """按起点排序返回 [(type, start, end, rule_id), ...]。"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        rows = conn.execute(
+            "SELECT type, start, end, rule_id FROM detection_spans WHERE record_id = ? ORDER BY start",
+            (record_id,),
+        ).fetchall()
+    finally:
+        conn.close()
+    return rows
+
+
+def get_spans_for_records(record_ids):
+    """批量读取多条记录的区间，返回 {record_id: [(type, start, end, rule_id), ...]}。"""
+    record_ids = list(record_ids)
+    spans = {record_id: [] for record_id in record_ids}
+    if not record_ids:
+        return spans
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        placeholders = ",".join("?" * len(record_ids))
+        rows = conn.execute(
+            f"""
+            SELECT record_id, type, start, end, rule_id
+            FROM detection_spans
+            WHERE record_id IN ({placeholders})
+            ORDER BY record_id, start
+            """,
+            record_ids,
+        ).fetchall()
+    finally:
+        conn.close()
+    for record_id, *span in rows:
+        spans[record_id].append(tuple(span))
+    return spans
+
+
+def _replace_spans(conn, record_id, spans):
+    conn.execute("DELETE FROM detection_spans WHERE record_id = ?", (record_id,))
+    if spans:
+        conn.executemany(
+            "INSERT INTO detection_spans (record_id, type, start, end, rule_id) VALUES (?, ?, ?, ?, ?)",
+            [(record_id, kind, start, end, rule_id) for kind, start, end, rule_id in spans],
+        )
+
+
 def set_deleted(record_id, deleted=True):
     conn = sqlite3.connect(DB_PATH)
     flag = 1 if deleted else 0
@@ -65,6 +240,9 @@ def delete_permanently(record_id):
     conn = sqlite3.connect(DB_PATH)
     print(f"[调试] 永久删除数据库记录 id={record_id}")
     conn.execute("DELETE FROM clipboard WHERE id = ?", (record_id,))
+    conn.execute("DELETE FROM detection_spans WHERE record_id = ?", (record_id,))
+    conn.execute("DELETE FROM clip_images WHERE record_id = ?", (record_id,))
+    conn.execute("DELETE FROM clip_formats WHERE record_id = ?", (record_id,))
     _delete_fts(conn, record_id)
     conn.commit()
     conn.close()
@@ -79,6 +257,39 @@ def set_favorite(record_id, favorite=True):
     conn.close()
 
 
+def get_masked_content(record_id):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        row = conn.execute("SELECT masked_content FROM clipboard WHERE id = ?", (record_id,)).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+def update_record_analysis(record_id, masked, category, sensitive_types, has_sensitive, spans=None):
+    """超过软上限的内容在后台完成全文分析后，用完整结果替换先行入库的首尾预览。"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        row = conn.execute("SELECT source_app FROM clipboard WHERE id = ?", (record_id,)).fetchone()
+        if row is None:
+            # 分析期间记录已被永久删除
+            return False
+        types_serialized = ",".join(sensitive_types)
+        conn.execute(
+            "UPDATE clipboard SET masked_content = ?, category = ?, sensitive_types = ?, has_sensitive = ? WHERE id = ?",
+            (masked, category, types_serialized, has_sensitive, record_id),
+        )
+        _replace_spans(conn, record_id, spans)
+        _upsert_fts(conn, record_id, masked, row[0], category, types_serialized)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return True
+
+
 def get_all_records(limit=200):
     return get_records(limit=limit)
 
@@ -93,49 +304,236 @@ def get_records(limit=200, search=None):
             cursor = conn.execute(
                 """
                 SELECT c.id,
-                       c.masked_content,
+                       substr(c.masked_content, 1, ?),
                        c.source_app,
                        c.category,
                        c.sensitive_types,
                        c.has_sensitive,
                        c.timestamp,
                        c.is_favorite,
-                       c.is_deleted
+                       c.is_deleted,
+                       c.formats,
+                       length(c.masked_content)
                 FROM clipboard_fts
                 JOIN clipboard c ON c.id = clipboard_fts.rowid
                 WHERE clipboard_fts MATCH ?
                 ORDER BY rank, c.timestamp DESC
                 LIMIT ?
                 """,
-                (match_query, limit),
+                (MASKED_PREVIEW_CHARS, match_query, limit),
             )
         else:
             cursor = conn.execute(
                 """
-                SELECT id, masked_content, source_app, category, sensitive_types, has_sensitive, timestamp, is_favorite, is_deleted
+                SELECT id, substr(masked_content, 1, ?), source_app, category, sensitive_types, has_sensitive, timestamp,
+                       is_favorite, is_deleted, formats, length(masked_content)
                 FROM clipboard
                 ORDER BY timestamp DESC
                 LIMIT ?
                 """,
-                (limit,),
+                (MASKED_PREVIEW_CHARS, limit),
             )
         rows = cursor.fetchall()
     except sqlite3.OperationalError as exc:
         print(f"[调试] FTS 查询失败，退回全文数据：{exc}")
         cursor = conn.execute(
             """
-            SELECT id, masked_content, source_app, category, sensitive_types, has_sensitive, timestamp, is_favorite, is_deleted
+            SELECT id, substr(masked_content, 1, ?), source_app, category, sensitive_types, has_sensitive, timestamp,
+                       is_favorite, is_deleted, formats, length(masked_content)
             FROM clipboard
             ORDER BY timestamp DESC
             LIMIT ?
             """,
-            (limit,),
+            (MASKED_PREVIEW_CHARS, limit),
         )
         rows = cursor.fetchall()
     conn.close()
     return rows
 
 
+def get_job_state(name):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        row = conn.execute("SELECT state FROM maintenance_jobs WHERE name = ?", (name,)).fetchone()
+    finally:
+        conn.close()
+    if not row:
+        return None
+    try:
+        return json.loads(row[0])
+    except ValueError:
+        return None
+
+
+def save_job_state(name, state):
+    conn = sqlite3.connect(DB_PATH)
+    _save_job_state(conn, name, state)
+    conn.commit()
+    conn.close()
+
+
+def clear_job_state(name):
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("DELETE FROM maintenance_jobs WHERE name = ?", (name,))
+    conn.commit()
+    conn.close()
+
+
+def _save_job_state(conn, name, state):
+    conn.execute(
+        """
+        INSERT INTO maintenance_jobs(name, state, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at
+        """,
+        (name, json.dumps(state, ensure_ascii=False), datetime.now().isoformat()),
+    )
+
+
+def count_remask_candidates(keywords, after_id=0, use_fts=False):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        where, params = _remask_filter(keywords, use_fts)
+        row = conn.execute(
+            f"SELECT COUNT(*) FROM clipboard WHERE id > ? AND {where}",
+            (after_id, *params),
+        ).fetchone()
+    except sqlite3.OperationalError as exc:
+        print(f"[调试] 统计待重新脱敏记录失败：{exc}")
+        return 0
+    finally:
+        conn.close()
+    return row[0] if row else 0
+
+
+def fetch_remask_batch(keywords, after_id=0, limit=200, use_fts=False):
+    """按 id 升序取一批待重新脱敏的记录；keywords 为空时返回全部记录。"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        where, params = _remask_filter(keywords, use_fts)
+        rows = conn.execute(
+            f"""
+            SELECT id, masked_content, source_app, category, sensitive_types
+            FROM clipboard
+            WHERE id > ? AND {where}
+            ORDER BY id
+            LIMIT ?
+            """,
+            (after_id, *params, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+    return rows
+
+
+def apply_remask_batch(updates, job_name, state):
+    """在同一事务中更新记录、脱敏区间、FTS 索引与任务检查点，保证中断后可安全续跑。"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        for record_id, masked, app, category, types_serialized, has_sensitive, spans in updates:
+            conn.execute(
+                "UPDATE clipboard SET masked_content = ?, sensitive_types = ?, has_sensitive = ? WHERE id = ?",
+                (masked, types_serialized, has_sensitive, record_id),
+            )
+            _replace_spans(conn, record_id, spans)
+            _upsert_fts(conn, record_id, masked, app, category, types_serialized)
+        _save_job_state(conn, job_name, state)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def count_reclassify_candidates(after_id=0):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        row = conn.execute("SELECT COUNT(*) FROM clipboard WHERE id > ?", (after_id,)).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else 0
+
+
+def fetch_reclassify_batch(after_id=0, limit=500):
+    """按 id 升序流式读取一批记录，供重新分类任务使用；formats 用于跳过文件列表记录。"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        rows = conn.execute(
+            """
+            SELECT id, masked_content, source_app, category, sensitive_types, formats
+            FROM clipboard
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+            """,
+            (after_id, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+    return rows
+
+
+def apply_reclassify_batch(updates, job_name, state):
+    """只写回类别变化的记录，FTS 与任务检查点在同一事务中提交。"""
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        for record_id, masked, app, category, types_serialized in updates:
+            conn.execute("UPDATE clipboard SET category = ? WHERE id = ?", (category, record_id))
+            _upsert_fts(conn, record_id, masked, app, category, types_serialized)
+        _save_job_state(conn, job_name, state)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def split_remask_keywords(keywords):
+    """返回 (fts_keywords, scan_keywords)。
+
+    纯 ASCII 字母数字的关键词可由 unicode61 分词后按词前缀检索，FTS 命中即为结果；
+    CJK、含标点等无法作为整词检索的关键词只能用 instr() 子串扫描。
+    """
+    fts_keywords = []
+    scan_keywords = []
+    for kw in keywords or []:
+        kw = (kw or "").strip()
+        if not kw:
+            continue
+        if kw.isascii() and kw.replace("_", "").isalnum():
+            fts_keywords.append(kw)
+        else:
+            scan_keywords.append(kw)
+    return fts_keywords, scan_keywords
+
+
+def build_keyword_match_query(keywords):
+    """为可被 unicode61 分词的关键词构造 FTS 前缀查询，其余关键词忽略；没有可检索的关键词时返回空串。"""
+    fts_keywords, _scan_keywords = split_remask_keywords(keywords)
+    if not fts_keywords:
+        return ""
+    return "masked_content : (" + " OR ".join(f'"{kw}"*' for kw in fts_keywords) + ")"
+
+
+def _remask_filter(keywords, use_fts):
+    """use_fts 为 True 时只取 FTS 命中的行；否则只为无法走 FTS 的关键词做子串扫描，
+    并排除 FTS 阶段已处理的行，两个阶段互不重叠。keywords 为空时返回全部记录。"""
+    fts_keywords, scan_keywords = split_remask_keywords(keywords)
+    if not fts_keywords and not scan_keywords:
+        return "1", ()
+    match_query = build_keyword_match_query(fts_keywords)
+    fts_rows = "id IN (SELECT rowid FROM clipboard_fts WHERE clipboard_fts MATCH ?)"
+    if use_fts:
+        return (fts_rows, (match_query,)) if match_query else ("0", ())
+    if not scan_keywords:
+        return "0", ()
+    clause = "(" + " OR ".join("instr(masked_content, ?) > 0" for _ in scan_keywords) + ")"
+    if not match_query:
+        return clause, tuple(scan_keywords)
+    return f"{clause} AND NOT {fts_rows}", (*scan_keywords, match_query)
+
+
 def _ensure_fts(conn):
     cursor = conn.execute(
         "SELECT name FROM sqlite_master WHERE type='table' AND name='clipboard_fts'"
@@ -0,0 +1,49 @@
+# detector_packs/__init__.py
+"""按地区 / 类别划分的内置检测规则包。
+
+只有用户启用的规则包才会被导入并编译；每个模块提供 PATTERNS（与 SENSITIVE_PATTERNS 同格式），
+可选提供 VALIDATORS 以注册该地区专用的批量校验器。
+"""
+
+import importlib
+
+# 规则包元数据：id -> 模块名、地区、类别与设置页显示用的翻译键
+REGION_PACKS = {
+    "cn": {
+        "module": "cn",
+        "region": "CN",
+        "category": "identity",
+        "label": "settings.privacy.packs.cn",
+    },
+    "us_ssn": {
+        "module": "us_ssn",
+        "region": "US",
+        "category": "identity",
+        "label": "settings.privacy.packs.us_ssn",
+    },
+    "eu_iban": {
+        "module": "eu_iban",
+        "region": "EU",
+        "category": "financial",
+        "label": "settings.privacy.packs.eu_iban",
+    },
+    "jp_my_number": {
+        "module": "jp_my_number",
+        "region": "JP",
+        "category": "identity",
+        "label": "settings.privacy.packs.jp_my_number",
+    },
+}
+
+# 与改动前的行为保持一致：默认只启用中国大陆身份证与手机号
+DEFAULT_REGION_PACKS = ("cn",)
+
+
+def available_packs():
+    return list(REGION_PACKS)
+
+
+def load_pack_module(pack_id):
+    """导入规则包模块，未知 id 抛出 KeyError。"""
+    meta = REGION_PACKS[pack_id]
+    return importlib.import_module(f"{__name__}.{meta['module']}")
@@ -0,0 +1,18 @@
+# detector_packs/cn.py
+"""中国大陆：居民身份证号（GB 11643 校验）与手机号。"""
+
+PATTERNS = {
+    "ID_CARD": {
+        "pattern": r"\b([1-9]\d{5}(18|19|20)\d{2}(0[1-9]|1[0-2])(0[1-9]|[12]\d|3[01])\d{3}[\dXx])\b",
+        "mask": lambda x: x[:6] + "********" + x[-4:] if len(x) == 18 else x,
+        "validator": "gb11643",
+        "min_digit_run": 17,
+        "priority": 50,
+    },
+    "PHONE": {
+        "pattern": r"\b(1[3-9]\d{9})\b",
+        "mask": lambda x: x[:3] + "****" + x[-4:],
+        "min_digit_run": 11,
+        "priority": 30,
+    },
+}
@@ -0,0 +1,33 @@
+# detector_packs/jp_my_number.py
+"""日本个人编号（マイナンバー，12 位），按官方检查位算法校验。"""
+
+PATTERNS = {
+    "JP_MY_NUMBER": {
+        "pattern": r"\b(\d{4}[ -]?\d{4}[ -]?\d{4})\b",
+        "mask": lambda x: "**** **** " + x[-4:],
+        "validator": "jp_my_number",
+        "priority": 35,
+    },
+}
+
+# 自右向左第 n 位（不含检查位）的权重：n<=6 为 n+1，其余为 n-5
+_WEIGHTS = tuple(n + 1 if n <= 6 else n - 5 for n in range(1, 12))
+
+
+def validate_my_number(candidates):
+    results = []
+    for value in candidates:
+        digits = value.replace(" ", "").replace("-", "")
+        if len(digits) != 12 or not digits.isdigit():
+            results.append(False)
+            continue
+        body = digits[:11][::-1]
+        remainder = sum(map(int.__mul__, map(int, body), _WEIGHTS)) % 11
+        check = 0 if remainder <= 1 else 11 - remainder
+        results.append(check == int(digits[11]))
+    return results
+
+
+VALIDATORS = {
+    "jp_my_number": validate_my_number,
+}
@@ -0,0 +1,28 @@
+# detector_packs/us_ssn.py
+"""美国社会安全号（SSN），按 SSA 规则排除不会签发的号段。"""
+
+PATTERNS = {
+    "US_SSN": {
+        "pattern": r"\b(\d{3}-\d{2}-\d{4})\b",
+        "mask": lambda x: "***-**-" + x[-4:],
+        "validator": "us_ssn",
+        "requires": "-",
+        "priority": 35,
+    },
+}
+
+
+def validate_ssn(candidates):
+    """区域号不为 000/666/9xx，组号不为 00，序列号不为 0000。"""
+    results = []
+    for value in candidates:
+        area, group, serial = value.split("-")
+        results.append(
+            area not in ("000", "666") and not area.startswith("9") and group != "00" and serial != "0000"
+        )
+    return results
+
+
+VALIDATORS = {
+    "us_ssn": validate_ssn,
+}
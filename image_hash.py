@@ -0,0 +1,86 @@
+# image_hash.py
+"""图片感知哈希：64 位 dHash 与按分段分桶的近重复索引。
+
+dHash 对缩放、轻微压缩与少量像素变化不敏感，同一窗口连续截图的汉明距离通常在个位数。
+本模块只处理灰度像素，不依赖任何图像库；缩放由调用方（Qt）完成。
+"""
+
+HASH_WIDTH = 9
+HASH_HEIGHT = 8
+HASH_BITS = (HASH_WIDTH - 1) * HASH_HEIGHT
+
+
+def dhash(gray_pixels, width=HASH_WIDTH, height=HASH_HEIGHT):
+    """gray_pixels 为 width×height 的灰度字节（行优先），逐行比较相邻像素得到 64 位哈希。"""
+    value = 0
+    for row in range(height):
+        offset = row * width
+        for col in range(width - 1):
+            value = (value << 1) | (gray_pixels[offset + col] < gray_pixels[offset + col + 1])
+    return value
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+class PerceptualHashIndex:
+    """近重复查找：把 64 位哈希切成 max_distance + 1 段分别建桶。
+
+    由抽屉原理，距离不超过 max_distance 的两个哈希至少有一段完全相同，
+    因此只需比较与查询哈希共享某一段的候选，无需遍历全部历史。
+    """
+
+    def __init__(self, max_distance=4):
+        self._max_distance = max(0, int(max_distance))
+        bands = self._max_distance + 1
+        width, extra = divmod(HASH_BITS, bands)
+        self._bands = []
+        shift = 0
+        for index in range(bands):
+            size = width + (1 if index < extra else 0)
+            self._bands.append((shift, (1 << size) - 1))
+            shift += size
+        self._buckets = {}
+        self._hashes = {}
+
+    @property
+    def max_distance(self):
+        return self._max_distance
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def _keys(self, value):
+        return [(index, (value >> shift) & mask) for index, (shift, mask) in enumerate(self._bands)]
+
+    def add(self, record_id, value):
+        self.remove(record_id)
+        self._hashes[record_id] = value
+        for key in self._keys(value):
+            self._buckets.setdefault(key, set()).add(record_id)
+
+    def remove(self, record_id):
+        value = self._hashes.pop(record_id, None)
+        if value is None:
+            return
+        for key in self._keys(value):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(record_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def find(self, value):
+        """返回 (record_id, distance)：距离最近且不超过 max_distance 的已有记录，没有时返回 None。"""
+        best = None
+        seen = set()
+        for key in self._keys(value):
+            for record_id in self._buckets.get(key, ()):
+                if record_id in seen:
+                    continue
+                seen.add(record_id)
+                distance = hamming(value, self._hashes[record_id])
+                if distance <= self._max_distance and (best is None or distance < best[1]):
+                    best = (record_id, distance)
+        return best
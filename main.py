@@ -1,4 +1,6 @@
 # main.py
+import argparse
+import multiprocessing
 import sys
 
 try:
@@ -10,13 +12,48 @@ except ImportError:
 from ui.main_window import ClipGuardWindow
 
 
+def _run_reclassify_cli(workers=None):
+    """命令行方式重新分类历史记录：有未完成的任务时从检查点续跑。"""
+    from config import load_config
+    from core.reclassify_job import ReclassifyJob
+    from database import init_db
+
+    init_db()
+    backend = load_config().get("regex_backend", "auto")
+    job = ReclassifyJob.resume(workers=workers, backend=backend) or ReclassifyJob(workers=workers, backend=backend)
+    result = {"updated": None, "error": None}
+    job.progress.connect(lambda done, total: print(f"重新分类进度：{done}/{total}"))
+    job.completed.connect(lambda updated: result.update(updated=updated))
+    job.error.connect(lambda message: result.update(error=message))
+    try:
+        # 在当前线程同步执行，Ctrl+C 时保留检查点
+        job.run()
+    except KeyboardInterrupt:
+        job.request_stop()
+        print("已中断，下次运行将从检查点继续")
+        return 1
+    if result["error"]:
+        print(f"重新分类失败：{result['error']}")
+        return 1
+    print(f"重新分类完成，更新 {result['updated']} 条记录，变更明细：{job.state().get('transitions')}")
+    return 0
+
+
 def main():
+    # 打包后的可执行文件需要此调用，分析子进程才能正常启动
+    multiprocessing.freeze_support()
+    parser = argparse.ArgumentParser(description="ClipGuard 剪贴板隐私助手")
+    parser.add_argument("--reclassify", action="store_true", help="按当前分类规则重新分类历史记录后退出")
+    parser.add_argument("--workers", type=int, default=None, help="重新分类使用的进程数")
+    args, qt_args = parser.parse_known_args()
+    if args.reclassify:
+        sys.exit(_run_reclassify_cli(args.workers))
     if sys.platform == "darwin":
         try:
             import AppKit  # noqa: F401
         except ImportError:
             print("[警告] 建议安装 pyobjc-framework-AppKit，以便准确识别当前前台应用。")
-    app = QApplication.instance() or QApplication(sys.argv)
+    app = QApplication.instance() or QApplication(sys.argv[:1] + qt_args)
     window = ClipGuardWindow()
     window.show()
     sys.exit(app.exec())
@@ -1,63 +1,91 @@
 # platform_utils.py
-import subprocess
+import os
 import sys
 import ctypes
 
+from app_resolver import get_resolver
+
+
+def get_active_app_name():
+    """当前前台应用名；解析结果按焦点变化缓存，见 app_resolver.AppResolver。"""
+    return get_resolver().resolve()
 
-def _get_windows_process_name():
-    try:
-        import win32gui
-        import win32process
-        import psutil
-
-        hwnd = win32gui.GetForegroundWindow()
-        if not hwnd:
-            return "Unknown"
-        _, pid = win32process.GetWindowThreadProcessId(hwnd)
-        return psutil.Process(pid).name()
-    except ImportError:
-        # 回退使用 ctypes 仅拿窗口标题
-        user32 = ctypes.windll.user32
-        hwnd = user32.GetForegroundWindow()
-        if not hwnd:
-            return "Unknown"
-        length = user32.GetWindowTextLengthW(hwnd)
-        if length == 0:
-            return "Unknown"
-        buffer = ctypes.create_unicode_buffer(length + 1)
-        user32.GetWindowTextW(hwnd, buffer, length + 1)
-        return buffer.value or "Unknown"
-    except Exception:
-        return "Unknown"
 
+def _get_windows_idle_seconds():
+    class LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
 
-def _get_macos_app_name():
+    info = LASTINPUTINFO()
+    info.cbSize = ctypes.sizeof(info)
+    if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+        return None
+    millis = (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+    return millis / 1000.0
+
+
+def _get_macos_idle_seconds():
     try:
-        from AppKit import NSWorkspace
-        app = NSWorkspace.sharedWorkspace().activeApplication()
-        name = app.get("NSApplicationName")
-        if name:
-            return name
+        import Quartz
     except ImportError:
-        pass
-    except Exception:
-        pass
+        return None
+    return float(Quartz.CGEventSourceSecondsSinceLastEventType(
+        Quartz.kCGEventSourceStateCombinedSessionState,
+        Quartz.kCGAnyInputEventType,
+    ))
 
-    # AppleScript 回退方案
+
+_xss = None
+
+
+def _get_x11_idle_seconds():
+    # 通过 libXss 查询 X 服务器的输入空闲时间，连接在进程内复用
+    global _xss
+    if _xss is None:
+        _xss = False
+        try:
+            import ctypes.util
+
+            xlib = ctypes.cdll.LoadLibrary(ctypes.util.find_library("X11") or "libX11.so.6")
+            xss = ctypes.cdll.LoadLibrary(ctypes.util.find_library("Xss") or "libXss.so.1")
+            xlib.XOpenDisplay.restype = ctypes.c_void_p
+            xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+            xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+            xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+            xss.XScreenSaverAllocInfo.restype = ctypes.c_void_p
+            xss.XScreenSaverQueryInfo.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_void_p]
+            display = xlib.XOpenDisplay(None)
+            if display:
+                _xss = (xss, display, xlib.XDefaultRootWindow(display), xss.XScreenSaverAllocInfo())
+        except OSError:
+            pass
+    if not _xss:
+        return None
+
+    class XScreenSaverInfo(ctypes.Structure):
+        _fields_ = [
+            ("window", ctypes.c_ulong),
+            ("state", ctypes.c_int),
+            ("kind", ctypes.c_int),
+            ("til_or_since", ctypes.c_ulong),
+            ("idle", ctypes.c_ulong),
+            ("event_mask", ctypes.c_ulong),
+        ]
+
+    xss, display, root, info = _xss
+    if not xss.XScreenSaverQueryInfo(display, root, info):
+        return None
+    return XScreenSaverInfo.from_address(info).idle / 1000.0
+
+
+def get_idle_seconds():
+    """距离最近一次键盘或鼠标输入的秒数，平台不支持时返回 None。"""
     try:
-        script = 'tell application "System Events" to get name of first process whose frontmost is true'
-        output = subprocess.check_output(["osascript", "-e", script], text=True)
-        result = output.strip()
-        if result:
-            return result
+        if sys.platform == "win32":
+            return _get_windows_idle_seconds()
+        if sys.platform == "darwin":
+            return _get_macos_idle_seconds()
+        if os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+            return _get_x11_idle_seconds()
     except Exception:
         pass
-    return "Unknown"
-
-
-def get_active_app_name():
-    if sys.platform == "win32":
-        return _get_windows_process_name()
-    if sys.platform == "darwin":
-        return _get_macos_app_name()
-    return "Unknown (Linux)"
+    return None
@@ -0,0 +1,79 @@
+# regex_engine.py
+"""正则后端封装：优先使用线性时间的 RE2 引擎，不可用时回退到标准库 re。"""
+
+import re
+import threading
+
+try:
+    import re2  # google-re2 / pyre2，提供线性时间匹配保证
+except ImportError:  # noqa: F401
+    re2 = None
+
+BACKEND_AUTO = "auto"
+BACKEND_RE2 = "re2"
+BACKEND_STDLIB = "re"
+
+_lock = threading.Lock()
+_backend = BACKEND_RE2 if re2 is not None else BACKEND_STDLIB
+_cache = {}
+
+
+def available_backends():
+    backends = [BACKEND_STDLIB]
+    if re2 is not None:
+        backends.insert(0, BACKEND_RE2)
+    return backends
+
+
+def backend_name():
+    return _backend
+
+
+def is_linear_time():
+    return _backend == BACKEND_RE2
+
+
+def set_backend(name=BACKEND_AUTO):
+    """切换正则后端，返回实际生效的后端名称。"""
+    global _backend
+    name = (name or BACKEND_AUTO).strip().lower()
+    if name == BACKEND_RE2 and re2 is None:
+        print("[调试] 未安装 re2 绑定，正则后端回退为标准库 re")
+        name = BACKEND_STDLIB
+    if name not in (BACKEND_RE2, BACKEND_STDLIB):
+        name = BACKEND_RE2 if re2 is not None else BACKEND_STDLIB
+    with _lock:
+        if name != _backend:
+            _backend = name
+            _cache.clear()
+    return _backend
+
+
+def compile_pattern(pattern, flags=0):
+    """按当前后端编译正则并缓存；RE2 不支持的语法自动回退到 re。"""
+    key = (pattern, flags)
+    compiled = _cache.get(key)
+    if compiled is not None:
+        return compiled
+    compiled = None
+    if _backend == BACKEND_RE2:
+        try:
+            compiled = re2.compile(_with_inline_flags(pattern, flags))
+        except Exception as exc:
+            print(f"[调试] RE2 无法编译 {pattern!r}，回退标准库 re：{exc}")
+    if compiled is None:
+        compiled = re.compile(pattern, flags)
+    with _lock:
+        _cache[key] = compiled
+    return compiled
+
+
+def _with_inline_flags(pattern, flags):
+    inline = ""
+    if flags & re.IGNORECASE:
+        inline += "i"
+    if flags & re.MULTILINE:
+        inline += "m"
+    if flags & re.DOTALL:
+        inline += "s"
+    return f"(?{inline}){pattern}" if inline else pattern
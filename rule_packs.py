@@ -0,0 +1,220 @@
+# rule_packs.py
+"""外部检测规则包：从 JSON/TOML 文件加载规则，规范化结果按文件哈希缓存到磁盘，并支持热重载。"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from functools import partial
+
+from regex_engine import compile_pattern
+from sensitive_detector import MASK_STRATEGIES, VALIDATORS, DetectionRule, set_extra_rules
+
+try:
+    import tomllib  # Python 3.11+
+except ImportError:  # noqa: F401
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+RULES_DIR = os.path.expanduser("~/.clipguard/rules")
+CACHE_DIR = os.path.expanduser("~/.clipguard/cache/rule_packs")
+SOURCE_NAME = "rule_packs"
+
+# 缓存格式变化时递增，旧缓存自动失效
+_CACHE_FORMAT = 1
+_PACK_SUFFIXES = (".json", ".toml")
+_FLAG_NAMES = {
+    "IGNORECASE": re.IGNORECASE,
+    "MULTILINE": re.MULTILINE,
+    "DOTALL": re.DOTALL,
+}
+_MASK_OPTIONS = ("keep_start", "keep_end", "mask_text")
+
+
+class RulePackError(ValueError):
+    """规则包内容不合法。"""
+
+
+def load_rule_pack(path):
+    """加载单个规则包，返回 DetectionRule 列表；规范化结果按文件内容哈希缓存。"""
+    with open(path, "rb") as f:
+        payload = f.read()
+    digest = hashlib.sha256(payload).hexdigest()
+    specs = _read_cache(digest)
+    if specs is None:
+        specs = _normalize_pack(path, _parse_pack(path, payload))
+        _write_cache(digest, specs)
+    return [_build_rule(spec) for spec in specs]
+
+
+def load_rule_packs(directory=RULES_DIR):
+    rules = []
+    for path in _list_pack_files(directory):
+        try:
+            rules.extend(load_rule_pack(path))
+        except (OSError, RulePackError, ValueError) as exc:
+            print(f"[调试] 规则包 {os.path.basename(path)} 加载失败，已跳过：{exc}")
+    return rules
+
+
+class RulePackWatcher:
+    """基于目录快照（文件名 + mtime + 大小）的轻量文件监视器，变化时重新加载规则包。"""
+
+    def __init__(self, directory=RULES_DIR, min_interval=2.0):
+        self._directory = directory
+        self._min_interval = float(min_interval)
+        self._snapshot = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def poll(self, force=False):
+        """检查规则目录，发生变化时重新编译并注册规则，返回是否重新加载。"""
+        now = time.monotonic()
+        if not force and now - self._last_check < self._min_interval:
+            return False
+        with self._lock:
+            self._last_check = now
+            snapshot = _directory_snapshot(self._directory)
+            if snapshot == self._snapshot:
+                return False
+            self._snapshot = snapshot
+            rules = load_rule_packs(self._directory)
+            set_extra_rules(SOURCE_NAME, rules)
+            print(f"[调试] 已加载外部规则包：{len(snapshot)} 个文件，{len(rules)} 条规则")
+            return True
+
+
+_default_watcher = None
+
+
+def refresh_rule_packs(force=False):
+    """使用默认目录的共享监视器刷新规则包，可在工作线程或分析子进程中反复调用。"""
+    global _default_watcher
+    if _default_watcher is None:
+        _default_watcher = RulePackWatcher()
+    return _default_watcher.poll(force=force)
+
+
+def _list_pack_files(directory):
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return []
+    return [os.path.join(directory, name) for name in names if name.lower().endswith(_PACK_SUFFIXES)]
+
+
+def _directory_snapshot(directory):
+    snapshot = []
+    for path in _list_pack_files(directory):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        snapshot.append((os.path.basename(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(snapshot)
+
+
+def _parse_pack(path, payload):
+    if path.lower().endswith(".toml"):
+        if tomllib is None:
+            raise RulePackError("当前 Python 不支持 TOML，请安装 tomli 或改用 JSON")
+        return tomllib.loads(payload.decode("utf-8"))
+    return json.loads(payload.decode("utf-8"))
+
+
+def _normalize_pack(path, data):
+    if not isinstance(data, dict) or not isinstance(data.get("rules"), list):
+        raise RulePackError("规则包需要包含 rules 列表")
+    pack_name = str(data.get("name") or os.path.splitext(os.path.basename(path))[0])
+    specs = []
+    for index, raw in enumerate(data["rules"]):
+        if not isinstance(raw, dict):
+            raise RulePackError(f"第 {index + 1} 条规则格式错误")
+        regex = raw.get("regex")
+        kind = raw.get("type")
+        if not regex or not kind:
+            raise RulePackError(f"第 {index + 1} 条规则缺少 regex 或 type")
+        flags = 0
+        for name in raw.get("flags", ["IGNORECASE"]):
+            if name not in _FLAG_NAMES:
+                raise RulePackError(f"未知的正则标志 {name}")
+            flags |= _FLAG_NAMES[name]
+        validator = raw.get("validator") or None
+        if validator == "none":
+            validator = None
+        if validator is not None and validator not in VALIDATORS:
+            raise RulePackError(f"未知的校验器 {validator}")
+        mask = raw.get("mask", "full")
+        if mask not in MASK_STRATEGIES:
+            raise RulePackError(f"未知的脱敏策略 {mask}")
+        try:
+            compiled = re.compile(regex, flags)
+        except re.error as exc:
+            raise RulePackError(f"规则 {kind} 的正则无效：{exc}") from exc
+        group = int(raw.get("group", 1 if compiled.groups else 0))
+        if group > compiled.groups:
+            raise RulePackError(f"规则 {kind} 没有第 {group} 个分组")
+        specs.append({
+            "type": str(kind).upper(),
+            "pattern": regex,
+            "flags": flags,
+            "group": group,
+            "validator": validator,
+            "mask": mask,
+            "mask_options": {key: raw[key] for key in _MASK_OPTIONS if key in raw},
+            "priority": int(raw.get("priority", 0)),
+            "requires": raw.get("requires") or None,
+            "multiline": bool(raw.get("multiline")) or bool(flags & re.DOTALL),
+            "rule_id": str(raw.get("id") or f"{pack_name}:{index + 1}"),
+            "source": pack_name,
+        })
+    return specs
+
+
+def _build_rule(spec):
+    rule = DetectionRule(
+        type=spec["type"],
+        pattern=spec["pattern"],
+        mask=partial(MASK_STRATEGIES[spec["mask"]], **spec["mask_options"]),
+        flags=spec["flags"],
+        priority=spec["priority"],
+        group=spec["group"],
+        validator=spec["validator"],
+        requires=spec["requires"],
+        multiline=spec.get("multiline", False),
+        rule_id=spec["rule_id"],
+        source=spec["source"],
+    )
+    # 加载时即完成编译，匹配阶段直接命中 regex_engine 的编译缓存
+    compile_pattern(rule.pattern, rule.flags)
+    return rule
+
+
+def _cache_path(digest):
+    return os.path.join(CACHE_DIR, f"{digest}.json")
+
+
+def _read_cache(digest):
+    try:
+        with open(_cache_path(digest), "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("format") != _CACHE_FORMAT:
+        return None
+    return cached.get("rules")
+
+
+def _write_cache(digest, specs):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = _cache_path(digest) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"format": _CACHE_FORMAT, "rules": specs}, f, ensure_ascii=False)
+        os.replace(tmp_path, _cache_path(digest))
+    except OSError as exc:
+        print(f"[调试] 写入规则包缓存失败：{exc}")
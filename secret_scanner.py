@@ -0,0 +1,199 @@
+# secret_scanner.py
+"""密钥扫描：已知前缀的云服务密钥、JWT、PEM 私钥，以及基于香农熵的高熵 token 检测。"""
+
+import base64
+import binascii
+import math
+from collections import Counter
+
+from regex_engine import compile_pattern
+
+# 已知格式的密钥规则，由 sensitive_detector 编译为检测规则（区分大小写）
+SECRET_PATTERNS = {
+    "PRIVATE_KEY": {
+        "pattern": r"(-----BEGIN (?:RSA |EC |DSA |OPENSSH |ENCRYPTED |PGP )?PRIVATE KEY(?: BLOCK)?-----[\s\S]*?-----END (?:RSA |EC |DSA |OPENSSH |ENCRYPTED |PGP )?PRIVATE KEY(?: BLOCK)?-----)",
+        "requires": "PRIVATE KEY",
+        "keep": 0,
+        "priority": 100,
+        # 跨多行匹配，增量检测遇到该规则时退回全文检测
+        "multiline": True,
+    },
+    "JWT": {
+        "pattern": r"\b(eyJ[A-Za-z0-9_-]{8,}\.eyJ[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]{8,})",
+        "requires": "eyJ",
+        "keep": 3,
+        "priority": 90,
+    },
+    "AWS_ACCESS_KEY": {
+        "pattern": r"\b((?:AKIA|ASIA|AGPA|AIDA|AROA|ANPA|ANVA|AIPA)[0-9A-Z]{16})\b",
+        "keep": 4,
+        "priority": 90,
+    },
+    "AWS_SECRET_KEY": {
+        "pattern": r"(?i:aws_?secret_?access_?key|aws_?secret)[\"']?\s*[=:]\s*[\"']?([A-Za-z0-9/+=]{40})(?![A-Za-z0-9/+=])",
+        "keep": 0,
+        "priority": 90,
+    },
+    "GITHUB_TOKEN": {
+        "pattern": r"\b((?:ghp|gho|ghu|ghs|ghr)_[A-Za-z0-9]{36,255}|github_pat_[A-Za-z0-9_]{22,255})\b",
+        "requires": "_",
+        "keep": 4,
+        "priority": 90,
+    },
+    "SLACK_TOKEN": {
+        "pattern": r"\b(xox[abposr]-[A-Za-z0-9-]{10,})",
+        "requires": "xox",
+        "keep": 5,
+        "priority": 90,
+    },
+    "GOOGLE_API_KEY": {
+        "pattern": r"\b(AIza[0-9A-Za-z_-]{35})",
+        "requires": "AIza",
+        "keep": 4,
+        "priority": 90,
+    },
+    "STRIPE_KEY": {
+        "pattern": r"\b((?:sk|rk|pk)_(?:live|test)_[0-9A-Za-z]{16,})",
+        "requires": "_",
+        "keep": 8,
+        "priority": 90,
+    },
+    "OPENAI_API_KEY": {
+        "pattern": r"\b(sk-(?:proj-)?[A-Za-z0-9_-]{20,})",
+        "requires": "sk-",
+        "keep": 3,
+        "priority": 90,
+    },
+    "BEARER_TOKEN": {
+        "pattern": r"\b[Bb]earer\s+([A-Za-z0-9\-._~+/]{16,}=*)",
+        "requires": "earer",
+        "keep": 0,
+        "priority": 85,
+    },
+}
+
+HIGH_ENTROPY_TYPE = "HIGH_ENTROPY_SECRET"
+# 高熵扫描排在结构化规则之后，已被其他规则占用的区间不会重复标记
+HIGH_ENTROPY_PRIORITY = 5
+
+# 候选 token：base64 / hex / url-safe 字符组成的长串
+_TOKEN_PATTERN = r"[A-Za-z0-9+/=_\-]{20,}"
+_UUID_PATTERN = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+_MIN_TOKEN_LENGTH = 20
+_MIN_HEX_LENGTH = 32
+_MAX_TOKEN_LENGTH = 4096
+_MAX_ENTROPY_THRESHOLD = 4.2
+_HEX_ENTROPY_THRESHOLD = 3.0
+# 随机串中相邻字符类别切换的比例约为 0.6，驼峰标识符通常低于 0.35
+_MIN_CLASS_SWITCH_RATIO = 0.4
+# MD5 / git SHA-1 / SHA-256 的十六进制长度：提交哈希与校验和是最常被复制的字符串，
+# 只有前面出现密钥类关键词时才按密钥处理
+_DIGEST_HEX_LENGTHS = frozenset((32, 40, 64))
+# 在 token 之前多少个字符内查找密钥类关键词
+_KEYWORD_WINDOW = 40
+_KEYWORD_PATTERN = r"(?i:key|secret|token|passw(?:or)?d|pwd|credential|auth)"
+# 向前查找 URL 协议头的最大距离，超过此长度的 URL 不再视为链接
+_URL_LOOKBACK = 2048
+_URL_STOP_CHARS = frozenset(" \t\r\n<>\"'")
+
+# 预计算字符类别表：str.translate 一次映射整个 token，避免逐字符的 Python 循环
+_CLASS_TABLE = {}
+for _code in range(ord("a"), ord("z") + 1):
+    _CLASS_TABLE[_code] = "l"
+for _code in range(ord("A"), ord("Z") + 1):
+    _CLASS_TABLE[_code] = "u"
+for _code in range(ord("0"), ord("9") + 1):
+    _CLASS_TABLE[_code] = "d"
+for _char in "+/=_-":
+    _CLASS_TABLE[ord(_char)] = "s"
+_HEX_CHARS = frozenset("0123456789abcdefABCDEF")
+# 预计算 log2 表，熵计算只做查表与整数乘加
+_LOG2 = [0.0] + [math.log2(i) for i in range(1, _MAX_TOKEN_LENGTH + 1)]
+
+
+def shannon_entropy(token):
+    """每字符香农熵（bit），字符计数由 Counter 在 C 层完成。"""
+    length = min(len(token), _MAX_TOKEN_LENGTH)
+    if not length:
+        return 0.0
+    token = token[:length]
+    log_length = _LOG2[length]
+    total = 0.0
+    for count in Counter(token).values():
+        total += count * (log_length - _LOG2[count])
+    return total / length
+
+
+def _looks_like_secret(token):
+    if _HEX_CHARS.issuperset(token) and not token.isdigit():
+        return len(token) >= _MIN_HEX_LENGTH and shannon_entropy(token) >= _HEX_ENTROPY_THRESHOLD
+    classes = token.translate(_CLASS_TABLE)
+    # 必须同时包含数字与字母：纯字母多为单词或标识符，纯数字多为编号
+    if "d" not in classes or ("l" not in classes and "u" not in classes):
+        return False
+    switches = sum(map(str.__ne__, classes, classes[1:]))
+    if switches < _MIN_CLASS_SWITCH_RATIO * (len(classes) - 1):
+        return False
+    threshold = min(_MAX_ENTROPY_THRESHOLD, _LOG2[min(len(token), _MAX_TOKEN_LENGTH)] - 0.8)
+    return shannon_entropy(token) >= threshold
+
+
+def _is_digest(token):
+    return len(token) in _DIGEST_HEX_LENGTHS and _HEX_CHARS.issuperset(token)
+
+
+def _decodes_to_text(token):
+    """base64（含 url-safe 变体）解码后是可打印的 UTF-8 文本，说明只是普通文字的编码。"""
+    if "-" in token or "_" in token:
+        token = token.replace("-", "+").replace("_", "/")
+    try:
+        decoded = base64.b64decode(token + "=" * (-len(token) % 4), validate=True).decode("utf-8")
+    except (binascii.Error, ValueError):
+        return False
+    return decoded.replace("\n", " ").replace("\t", " ").isprintable()
+
+
+def _in_url(text, start):
+    """start 是否落在 http(s) 链接内部：向前找到协议头，且中间没有空白或引号等断开字符。"""
+    # token 字符集包含 /，候选 token 可能从 :// 中的斜杠开始
+    scheme = text.rfind("://", max(0, start - _URL_LOOKBACK), start + 2)
+    if scheme == -1 or not text.endswith(("http", "https"), max(0, scheme - 5), scheme):
+        return False
+    return _URL_STOP_CHARS.isdisjoint(text[scheme:start])
+
+
+def mask_secret(value, keep=0):
+    if keep and len(value) > keep + 4:
+        return value[:keep] + "*" * min(len(value) - keep, 32)
+    if len(value) <= 64:
+        return "*" * len(value)
+    return f"********[{len(value)}]"
+
+
+def iter_high_entropy_tokens(text):
+    """遍历高熵 token，产出 (start, end)。
+
+    摘要长度的十六进制串、解码为普通文本的 base64 以及 http(s) 链接中的路径与参数值
+    （播放列表、文件分享 ID 等）默认放过，前面带有 key / secret / token 等关键词时仍按密钥处理。
+    """
+    uuid_pattern = compile_pattern(_UUID_PATTERN)
+    keyword_pattern = compile_pattern(_KEYWORD_PATTERN)
+    for match in compile_pattern(_TOKEN_PATTERN).finditer(text):
+        start, end = match.span()
+        token = match.group(0)
+        assign = token.rstrip("=").rfind("=")
+        if assign != -1:
+            # base64 的 = 只出现在末尾，中间的 = 是 api_key=... 形式的赋值，只检查等号后的值
+            start += assign + 1
+            token = token[assign + 1:]
+        token = token.strip("=")
+        if len(token) < _MIN_TOKEN_LENGTH:
+            continue
+        if uuid_pattern.fullmatch(token):
+            continue
+        if not _looks_like_secret(token):
+            continue
+        if _is_digest(token) or _decodes_to_text(token) or _in_url(text, start):
+            if not keyword_pattern.search(text, max(0, start - _KEYWORD_WINDOW), start):
+                continue
+        yield start, end
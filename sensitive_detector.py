@@ -1,46 +1,735 @@
 # sensitive_detector.py
+import bisect
 import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Optional
 
+from regex_engine import compile_pattern
+from secret_scanner import (
+    HIGH_ENTROPY_PRIORITY,
+    HIGH_ENTROPY_TYPE,
+    SECRET_PATTERNS,
+    iter_high_entropy_tokens,
+    mask_secret,
+)
+from detector_packs import DEFAULT_REGION_PACKS, REGION_PACKS, load_pack_module
+from text_normalizer import as_normalized, normalize_text
+
+# 与地区无关的内置规则；身份证、手机号等地区性规则位于 detector_packs，按需加载
 SENSITIVE_PATTERNS = {
-    "ID_CARD": {
-        "pattern": r"\b([1-9]\d{5}(18|19|20)\d{2}(0[1-9]|1[0-2])(0[1-9]|[12]\d|3[01])\d{3}[\dXx])\b",
-        "mask": lambda x: x[:6] + "********" + x[-4:] if len(x) == 18 else x
-    },
     "BANK_CARD": {
         "pattern": r"\b(\d{16,19})\b",
-        "mask": lambda x: x[:4] + " **** **** " + x[-4:]
-    },
-    "PHONE": {
-        "pattern": r"\b(1[3-9]\d{9})\b",
-        "mask": lambda x: x[:3] + "****" + x[-4:]
+        "mask": lambda x: x[:4] + " **** **** " + x[-4:],
+        "validator": "luhn",
+        "min_digit_run": 16,
+        "priority": 40,
     },
     "EMAIL": {
         "pattern": r"\b([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})\b",
-        "mask": lambda x: re.sub(r"(?<=.).(?=.*@)", "*", x)
+        "mask": lambda x: re.sub(r"(?<=.).(?=.*@)", "*", x),
+        # 不含 @ 的文本不可能命中；命中时只在 @ 附近的有界窗口内匹配，避免长 token 上的回溯
+        "requires": "@",
+        "anchor": "@",
+        "window": (64, 256),
+        # 与分类器共用同一正则，传入共享特征时直接复用其邮箱区间
+        "feature": "emails",
+        "priority": 20,
     },
     "IP_ADDRESS": {
-        "pattern": r"\b(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\b",
-        "mask": lambda x: "*.*.*.*"
+        "pattern": r"\b((?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?))\b",
+        "mask": lambda x: "*.*.*.*",
+        "requires": ".",
+        "priority": 10,
     }
 }
 
+# 超出单条剪贴板检测预算时写入的类型标记
+TIMEOUT_TYPE = "DETECTION_TIMEOUT"
+CUSTOM_TYPE = "CUSTOM"
+
+_CONSERVATIVE_MASK_PATTERN = re.compile(r"\w")
+
+
+def _mask_full(value, **_options):
+    return "*" * len(value)
+
+
+def _mask_partial(value, keep_start=3, keep_end=4, **_options):
+    if len(value) <= keep_start + keep_end:
+        return "*" * len(value)
+    return value[:keep_start] + "*" * (len(value) - keep_start - keep_end) + value[len(value) - keep_end:]
+
+
+def _mask_fixed(value, mask_text="****", **_options):
+    return mask_text
+
+
+def _mask_email(value, **_options):
+    return re.sub(r"(?<=.).(?=.*@)", "*", value)
+
+
+# 规则包可按名称引用的脱敏策略
+MASK_STRATEGIES = {
+    "full": _mask_full,
+    "partial": _mask_partial,
+    "fixed": _mask_fixed,
+    "email": _mask_email,
+}
+
+# Luhn 中偶数位（自右向左）乘 2 后的各位数字之和，预先做成翻译表
+_LUHN_DOUBLED = str.maketrans("0123456789", "0246813579")
+# GB 11643-1999 前 17 位加权因子与校验码
+_GB11643_WEIGHTS = (7, 9, 10, 5, 8, 4, 2, 1, 6, 3, 7, 9, 10, 5, 8, 4, 2)
+_GB11643_CHECK_CODES = "10X98765432"
+
+
+def validate_luhn(candidates):
+    """批量 Luhn 校验，返回与 candidates 等长的布尔列表。"""
+    results = []
+    for value in candidates:
+        digits = value.replace(" ", "").replace("-", "")
+        if not digits.isdigit():
+            results.append(False)
+            continue
+        total = sum(map(int, digits[-1::-2])) + sum(map(int, digits[-2::-2].translate(_LUHN_DOUBLED)))
+        results.append(total % 10 == 0)
+    return results
+
+
+def validate_gb11643(candidates):
+    """批量校验 18 位身份证号码的 GB 11643 校验码。"""
+    results = []
+    for value in candidates:
+        body = value[:17]
+        if len(value) != 18 or not body.isdigit():
+            results.append(False)
+            continue
+        total = sum(map(int.__mul__, map(int, body), _GB11643_WEIGHTS))
+        results.append(_GB11643_CHECK_CODES[total % 11] == value[17].upper())
+    return results
+
+
+# 规则包可按名称引用的候选校验器：接收一条内容中某规则的全部候选，返回等长布尔列表，
+# False 对应的候选会被丢弃
+VALIDATORS = {
+    "none": None,
+    "luhn": validate_luhn,
+    "gb11643": validate_gb11643,
+}
+
+
+@dataclass
+class DetectionRule:
+    """单条检测规则，内置规则与外部规则包统一编译成该结构。"""
+
+    type: str
+    pattern: str
+    mask: Callable[[str], str]
+    flags: int = re.IGNORECASE
+    priority: int = 0
+    group: int = 1
+    validator: Optional[str] = None
+    requires: Optional[str] = None
+    anchor: Optional[str] = None
+    window: Optional[tuple] = None
+    rule_id: str = ""
+    source: str = "builtin"
+    # 非正则扫描阶段：接收文本并产出 (start, end)，设置后忽略 pattern
+    scanner: Optional[Callable] = None
+    # 共享特征中的区间列表名，提供特征时直接作为候选，不再重复匹配
+    feature: Optional[str] = None
+    # 共享特征中最长数字串短于该值时整条规则跳过
+    min_digit_run: int = 0
+    # 匹配可能跨行、长度无上界，增量检测无法只扫描局部
+    multiline: bool = False
+
+    def compiled(self):
+        return compile_pattern(self.pattern, self.flags)
+
+
+_metrics = {
+    "scans": 0,
+    "timeouts": 0,
+    # 各类型被校验器否决的候选数
+    "rejections": {},
+}
+
+# 规则集版本号，规则变化时递增，供分析缓存等判断失效
+_rules_generation = 0
+_rules_lock = threading.Lock()
+_extra_rules = {}
+_active_rules = None
+# 已启用的地区规则包；模块与规则在首次需要时才导入、构建
+_enabled_packs = tuple(DEFAULT_REGION_PACKS)
+_loaded_packs = {}
+
+
+@dataclass(frozen=True)
+class DetectionSpan:
+    """一处脱敏命中。start / end 为脱敏结果中的区间（随记录入库，供界面高亮）；
+    source_start / source_end 为原文中的区间，只在内存中有效，原文可用时据此重新脱敏。
+    """
+
+    type: str
+    start: int
+    end: int
+    rule_id: str = ""
+    source_start: int = -1
+    source_end: int = -1
+
+
+class DetectionTimeout(Exception):
+    """单条内容的检测耗时超出预算。"""
+
+
+def get_detector_metrics():
+    metrics = dict(_metrics)
+    metrics["rejections"] = dict(_metrics["rejections"])
+    return metrics
+
+
+def rules_generation():
+    return _rules_generation
+
+
+def bump_rules_generation():
+    global _rules_generation, _active_rules
+    with _rules_lock:
+        _rules_generation += 1
+        _active_rules = None
+    return _rules_generation
+
+
+def set_extra_rules(source, rules):
+    """注册（或替换）某个来源的外部规则，传入空列表即移除。"""
+    with _rules_lock:
+        if rules:
+            _extra_rules[source] = list(rules)
+        else:
+            _extra_rules.pop(source, None)
+    bump_rules_generation()
+
+
+def set_region_packs(pack_ids):
+    """设置启用的地区规则包，返回是否发生变化；未知 id 会被忽略。"""
+    global _enabled_packs
+    enabled = tuple(pack_id for pack_id in REGION_PACKS if pack_id in set(pack_ids or ()))
+    if enabled == _enabled_packs:
+        return False
+    _enabled_packs = enabled
+    bump_rules_generation()
+    return True
+
+
+def enabled_region_packs():
+    return list(_enabled_packs)
+
+
+def _region_rules():
+    rules = []
+    for pack_id in _enabled_packs:
+        rules.extend(_load_region_pack(pack_id))
+    return rules
+
+
+def _load_region_pack(pack_id):
+    rules = _loaded_packs.get(pack_id)
+    if rules is not None:
+        return rules
+    module = load_pack_module(pack_id)
+    for name, validator in getattr(module, "VALIDATORS", {}).items():
+        VALIDATORS.setdefault(name, validator)
+    rules = [_builtin_rule(key, spec, source=f"pack:{pack_id}") for key, spec in module.PATTERNS.items()]
+    _loaded_packs[pack_id] = rules
+    print(f"[调试] 已加载地区规则包 {pack_id}：{len(rules)} 条规则")
+    return rules
+
+
+def active_rules():
+    rules = _active_rules
+    if rules is not None:
+        return rules
+    return _rebuild_active_rules()
+
+
+def _rebuild_active_rules():
+    global _active_rules
+    with _rules_lock:
+        if _active_rules is None:
+            combined = [_builtin_rule(key, spec) for key, spec in SENSITIVE_PATTERNS.items()]
+            combined.extend(_region_rules())
+            combined.extend(_secret_rules())
+            for extra in _extra_rules.values():
+                combined.extend(extra)
+            # 优先级高的规则先匹配，重叠区间以高优先级为准
+            combined.sort(key=lambda rule: -rule.priority)
+            _active_rules = combined
+        return _active_rules
+
+
+def _builtin_rule(key, spec, source="builtin"):
+    return DetectionRule(
+        type=key,
+        pattern=spec["pattern"],
+        mask=spec["mask"],
+        flags=spec.get("flags", re.IGNORECASE),
+        priority=spec.get("priority", 0),
+        validator=spec.get("validator"),
+        requires=spec.get("requires"),
+        anchor=spec.get("anchor"),
+        window=spec.get("window"),
+        rule_id=key.lower(),
+        feature=spec.get("feature"),
+        min_digit_run=spec.get("min_digit_run", 0),
+        multiline=spec.get("multiline", False),
+        source=source,
+    )
+
+
+def _secret_rules():
+    rules = [
+        DetectionRule(
+            type=key,
+            pattern=spec["pattern"],
+            mask=partial(mask_secret, keep=spec["keep"]),
+            flags=0,
+            priority=spec["priority"],
+            requires=spec.get("requires"),
+            multiline=spec.get("multiline", False),
+            rule_id=key.lower(),
+            source="secrets",
+        )
+        for key, spec in SECRET_PATTERNS.items()
+    ]
+    rules.append(
+        DetectionRule(
+            type=HIGH_ENTROPY_TYPE,
+            pattern="",
+            mask=mask_secret,
+            priority=HIGH_ENTROPY_PRIORITY,
+            rule_id="high_entropy",
+            source="secrets",
+            scanner=iter_high_entropy_tokens,
+        )
+    )
+    return rules
+
+
+def conservative_mask(text):
+    """保守脱敏：遮盖全部字母数字，仅保留空白与标点以维持版式。"""
+    return _CONSERVATIVE_MASK_PATTERN.sub("*", text)
+
+
+def detect_and_mask(text, custom_keywords=None, time_budget=None, features=None):
+    """检测并脱敏文本；time_budget（秒）超时后返回保守脱敏结果并打上超时标记。
+
+    text 可以是 str，也可以是调用方已构建好的 NormalizedText（与分类器共享）；
+    检测在规范化视图上进行，脱敏结果按偏移映射写回原文。
+    features 为同一视图上提取的 ContentFeatures，提供时复用其中的候选区间。
+    """
+    masked, has_sensitive, types, _spans = detect_spans_and_mask(text, custom_keywords, time_budget, features)
+    return masked, has_sensitive, types
+
+
+def detect_spans_and_mask(text, custom_keywords=None, time_budget=None, features=None):
+    """与 detect_and_mask 相同，额外返回 DetectionSpan 列表；超时的保守结果不带区间。"""
+    _metrics["scans"] += 1
+    deadline = time.perf_counter() + time_budget if time_budget else None
+    view = features.view if features is not None else as_normalized(text)
+    try:
+        return _detect_and_mask(view, custom_keywords, deadline, features)
+    except DetectionTimeout:
+        _metrics["timeouts"] += 1
+        print(f"[调试] 敏感检测超出预算 {time_budget:.3f}s（长度 {len(view.original)}），已保守脱敏")
+        return conservative_mask(view.original), True, [TIMEOUT_TYPE], []
+
+
+def detect_delta(previous_length, previous_spans, previous_masks, text, prefix, suffix,
+                 custom_keywords=None, time_budget=None, margin=256, max_context=8192):
+    """增量检测：text 与上一条内容（长度为 previous_length）共享长度为 prefix 的前缀和 suffix 的后缀。
+
+    只重新扫描变化区间及其两侧 margin 个字符（向外扩展到换行或空白处），区间外沿用上一次的
+    DetectionSpan（按起点有序、带原文偏移）及其脱敏片段 previous_masks，脱敏结果由新内容与这些片段拼出，
+    不需要上一条的原文或完整脱敏结果。无法安全增量时返回 None，由调用方做全文检测。
+    """
+    for rule in active_rules():
+        if rule.multiline and (not rule.requires or rule.requires in text):
+            return None
+    if previous_spans and previous_spans[0].source_start < 0:
+        return None
+    length = len(text)
+    # 上一条内容中后缀的起点，及后缀映射到新内容时的位移
+    tail = previous_length - suffix
+    shift = length - previous_length
+    source_starts = [span.source_start for span in previous_spans]
+    start = max(0, prefix - margin)
+    end = min(length, length - suffix + margin)
+    while True:
+        start = _scan_boundary(text, start, -1, max_context)
+        end = _scan_boundary(text, end, 1, max_context)
+        if start is None or end is None:
+            return None
+        # 扫描区间不能截断上一次的命中：与边界相交的旧区间整段纳入重扫
+        grown = False
+        idx = bisect.bisect_left(source_starts, start) - 1
+        if idx >= 0 and previous_spans[idx].source_end > start:
+            start, grown = previous_spans[idx].source_start, True
+        old_end = end - shift
+        idx = bisect.bisect_left(source_starts, old_end) - 1
+        if idx >= 0:
+            span = previous_spans[idx]
+            if max(span.source_start, tail) < old_end < span.source_end:
+                end, grown = span.source_end + shift, True
+        if not grown:
+            break
+
+    masked_region, _, region_types, region_spans = detect_spans_and_mask(
+        text[start:end], custom_keywords, time_budget
+    )
+    if TIMEOUT_TYPE in region_types:
+        return None
+    # 扫描区间之外的旧命中及其脱敏片段原样沿用，只需定位区间两端在旧脱敏结果中的位置
+    head_count = bisect.bisect_left(source_starts, start)
+    tail_index = bisect.bisect_left(source_starts, end - shift)
+    masked_start = _masked_position(previous_spans, head_count, start)
+    masked_end = _masked_position(previous_spans, tail_index, end - shift)
+    parts = []
+    _append_masked(parts, text, 0, start, previous_spans[:head_count], previous_masks[:head_count], 0)
+    parts.append(masked_region)
+    _append_masked(parts, text, end, length, previous_spans[tail_index:], previous_masks[tail_index:], shift)
+    # 自定义关键词与全文检测一样在最终结果上补做一遍，跨越扫描边界的关键词也不会漏掉
+    joined = "".join(parts)
+    masked = mask_keywords(joined, custom_keywords)
+    masked_shift = masked_start + len(masked_region) - masked_end
+    spans = previous_spans[:head_count]
+    spans.extend(
+        DetectionSpan(
+            span.type,
+            span.start + masked_start,
+            span.end + masked_start,
+            span.rule_id,
+            span.source_start + start,
+            span.source_end + start,
+        )
+        for span in region_spans
+    )
+    spans.extend(
+        DetectionSpan(
+            span.type,
+            span.start + masked_shift,
+            span.end + masked_shift,
+            span.rule_id,
+            span.source_start + shift,
+            span.source_end + shift,
+        )
+        for span in previous_spans[tail_index:]
+    )
+    found_types = list(dict.fromkeys(span.type for span in spans))
+    if masked is not joined and CUSTOM_TYPE not in found_types:
+        found_types.append(CUSTOM_TYPE)
+    return masked, bool(found_types), found_types, spans
+
+
+def _append_masked(parts, text, start, end, spans, masks, shift):
+    """把原文 [start, end) 追加到 parts，其中沿用的旧命中（原文偏移加 shift 后）替换为对应的脱敏片段。"""
+    cursor = start
+    for span, replacement in zip(spans, masks):
+        parts.append(text[cursor:span.source_start + shift])
+        parts.append(replacement)
+        cursor = span.source_end + shift
+    parts.append(text[cursor:end])
+
+
+def _masked_position(spans, count, position):
+    """原文位置 position 在脱敏结果中的位置；spans[:count] 为位于它之前的全部命中。"""
+    if not count:
+        return position
+    span = spans[count - 1]
+    return span.end + position - span.source_end
+
+
+def _scan_boundary(text, position, direction, max_context):
+    """把扫描边界外推到换行处；max_context 内没有换行时退而求其次找空白，仍没有返回 None。"""
+    if direction < 0:
+        if position <= 0:
+            return 0
+        floor = max(0, position - max_context)
+        newline = text.rfind("\n", floor, position)
+        if newline != -1:
+            return newline + 1
+        if floor == 0:
+            return 0
+        for index in range(position - 1, floor - 1, -1):
+            if text[index].isspace():
+                return index + 1
+        return None
+    if position >= len(text):
+        return len(text)
+    ceiling = min(len(text), position + max_context)
+    newline = text.find("\n", position, ceiling)
+    if newline != -1:
+        return newline
+    if ceiling == len(text):
+        return len(text)
+    for index in range(position, ceiling):
+        if text[index].isspace():
+            return index
+    return None
+
+
+def remask_from_spans(original, spans, reveal_types=(), masks=None, custom_keywords=None):
+    """按已记录的区间重新生成脱敏结果，不再运行检测。
+
+    reveal_types 中的类型保留原文；masks 为 {类型: 脱敏函数}，用于更换脱敏样式，
+    未指定时沿用命中规则当前的脱敏方式。custom_keywords 与检测时相同，最后再遮盖一遍，
+    保证关键词不会因更换样式或显示某一类型而露出。返回 (masked, spans)，spans 为新结果中的区间。
+
+    需要原文与 source_* 偏移，只有本次会话中仍保留原文的记录可用；目前仅作为接口提供，
+    界面与重新脱敏任务都不调用它（入库记录不保存原文，任务只能在脱敏结果上重新检测）。
+    """
+    rules = {rule.rule_id: rule for rule in active_rules()}
+    reveal_types = set(reveal_types or ())
+    masks = masks or {}
+    parts = []
+    new_spans = []
+    cursor = 0
+    length = 0
+    for span in sorted(spans, key=lambda item: item.source_start):
+        if span.source_start < cursor or span.source_end > len(original):
+            continue
+        head = original[cursor:span.source_start]
+        parts.append(head)
+        length += len(head)
+        value = original[span.source_start:span.source_end]
+        if span.type in reveal_types:
+            replacement = value
+        else:
+            mask = masks.get(span.type)
+            if mask is None:
+                rule = rules.get(span.rule_id)
+                mask = rule.mask if rule is not None else _mask_full
+            replacement = mask(normalize_text(value).text)
+        parts.append(replacement)
+        new_spans.append(DetectionSpan(
+            span.type, length, length + len(replacement), span.rule_id, span.source_start, span.source_end,
+        ))
+        length += len(replacement)
+        cursor = span.source_end
+    parts.append(original[cursor:])
+    return mask_keywords("".join(parts), custom_keywords), new_spans
+
+
+def rebase_spans(previous, edits):
+    """previous 为旧脱敏结果中的区间，edits 为在旧结果上再次脱敏产生的区间（source_* 指向旧结果）。
+
+    返回新结果中的全部区间：完全落在旧区间内的新命中并入旧区间，与旧区间部分重叠时丢弃旧区间，
+    其余旧区间按前面的长度变化平移。
+    """
+    edits = sorted(edits, key=lambda item: item.source_start)
+    starts = [edit.source_start for edit in edits]
+    # deltas[i] 为前 i 个新命中累计的长度变化
+    deltas = [0]
+    for edit in edits:
+        deltas.append(deltas[-1] + (edit.end - edit.start) - (edit.source_end - edit.source_start))
+    absorbed = set()
+    rebased = []
+    for span in previous:
+        first = bisect.bisect_left(starts, span.start)
+        if first > 0 and edits[first - 1].source_end > span.start:
+            continue
+        last = bisect.bisect_left(starts, span.end)
+        if any(edits[idx].source_end > span.end for idx in range(first, last)):
+            continue
+        absorbed.update(range(first, last))
+        rebased.append(DetectionSpan(span.type, span.start + deltas[first], span.end + deltas[last], span.rule_id))
+    # 新命中的 source_* 指向旧脱敏结果而非原文，入库时不再需要
+    rebased.extend(
+        DetectionSpan(edit.type, edit.start, edit.end, edit.rule_id)
+        for idx, edit in enumerate(edits)
+        if idx not in absorbed
+    )
+    rebased.sort(key=lambda item: item.start)
+    return rebased
+
+
+def _check_deadline(deadline):
+    if deadline is not None and time.perf_counter() > deadline:
+        raise DetectionTimeout()
+
+
+def _iter_matches(rule, pattern, text, deadline):
+    if not rule.anchor:
+        yield from pattern.finditer(text)
+        return
+    before, after = rule.window
+    last_end = 0
+    pos = text.find(rule.anchor)
+    while pos != -1:
+        if pos >= last_end:
+            _check_deadline(deadline)
+            start = max(last_end, pos - before)
+            end = min(len(text), pos + after)
+            for match in pattern.finditer(text, start, end):
+                if match.end() == end < len(text):
+                    # 命中被窗口右边界截断：以命中自身的锚点重新划定窗口再匹配一次
+                    anchor_end = min(len(text), text.find(rule.anchor, match.start()) + after)
+                    match = pattern.match(text, match.start(), anchor_end) or match
+                    last_end = match.end()
+                    yield match
+                    break
+                last_end = match.end()
+                yield match
+        pos = text.find(rule.anchor, pos + 1)
+
+
+class _SpanSet:
+    """互不重叠的已占用区间，按起点有序存放以便二分判断重叠。"""
+
+    def __init__(self):
+        self._starts = []
+        self._ends = []
+
+    def overlaps(self, start, end):
+        idx = bisect.bisect_right(self._starts, start)
+        if idx > 0 and self._ends[idx - 1] > start:
+            return True
+        return idx < len(self._starts) and self._starts[idx] < end
+
+    def add(self, start, end):
+        idx = bisect.bisect_right(self._starts, start)
+        self._starts.insert(idx, start)
+        self._ends.insert(idx, end)
+
+
+def _iter_candidate_spans(rule, text, deadline, features):
+    if features is not None and rule.feature:
+        yield from getattr(features, rule.feature)
+        return
+    for match in _iter_matches(rule, rule.compiled(), text, deadline):
+        yield match.span(rule.group)
+
+
+def _find_spans(text, custom_keywords, deadline, features=None):
+    """返回按优先级消解重叠后的 (start, end, rule) 列表，rule 为 None 表示自定义关键词。"""
+    spans = []
+    occupied = _SpanSet()
+    longest_digit_run = features.longest_digit_run if features is not None else None
+
+    # 内置规则与外部规则包
+    for rule in active_rules():
+        if rule.requires and rule.requires not in text:
+            continue
+        if longest_digit_run is not None and longest_digit_run < rule.min_digit_run:
+            continue
+        _check_deadline(deadline)
+        if rule.scanner is not None:
+            for start, end in rule.scanner(text):
+                if not occupied.overlaps(start, end):
+                    spans.append((start, end, rule))
+                    occupied.add(start, end)
+                _check_deadline(deadline)
+            continue
+        validator = VALIDATORS.get(rule.validator) if rule.validator else None
+        if validator is None:
+            for start, end in _iter_candidate_spans(rule, text, deadline, features):
+                if start == end or occupied.overlaps(start, end):
+                    continue
+                spans.append((start, end, rule))
+                occupied.add(start, end)
+                _check_deadline(deadline)
+            continue
+        # 带校验器的规则先收集全部候选，再一次性批量校验
+        candidates = []
+        for start, end in _iter_candidate_spans(rule, text, deadline, features):
+            if start != end and not occupied.overlaps(start, end):
+                candidates.append((start, end))
+        if not candidates:
+            continue
+        _check_deadline(deadline)
+        verdicts = validator([text[start:end] for start, end in candidates])
+        rejected = 0
+        for (start, end), accepted in zip(candidates, verdicts):
+            if not accepted:
+                rejected += 1
+                continue
+            spans.append((start, end, rule))
+            occupied.add(start, end)
+        if rejected:
+            rejections = _metrics["rejections"]
+            rejections[rule.type] = rejections.get(rule.type, 0) + rejected
+
+    # 自定义关键词，与正文使用同一套规范化
+    for kw in custom_keywords or []:
+        kw = normalize_text(kw).text if kw else kw
+        if not kw:
+            continue
+        pos = text.find(kw)
+        while pos != -1:
+            end = pos + len(kw)
+            if not occupied.overlaps(pos, end):
+                spans.append((pos, end, None))
+                occupied.add(pos, end)
+            pos = text.find(kw, end)
+
+    spans.sort(key=lambda item: item[0])
+    return spans
+
 
-def detect_and_mask(text, custom_keywords=None):
-    masked = text
-    found_types = set()
+def _detect_and_mask(view, custom_keywords, deadline, features=None):
+    text = view.text
+    spans = _find_spans(text, custom_keywords, deadline, features)
+    original = view.original
+    if not spans:
+        masked = mask_keywords(original, custom_keywords)
+        if masked is original:
+            return original, False, [], []
+        return masked, True, [CUSTOM_TYPE], []
+    parts = []
+    found_types = []
+    detected = []
+    cursor = 0
+    length = 0
+    for start, end, rule in spans:
+        # 脱敏值取自规范化视图（全角、零宽字符不影响掩码长度），写回原文对应区间
+        value = text[start:end]
+        orig_start, orig_end = view.to_original(start, end)
+        orig_start = max(orig_start, cursor)
+        if orig_end <= orig_start:
+            continue
+        parts.append(original[cursor:orig_start])
+        length += orig_start - cursor
+        if rule is None:
+            replacement = "*" * len(value)
+            kind, rule_id = CUSTOM_TYPE, "custom"
+        else:
+            replacement = rule.mask(value)
+            kind, rule_id = rule.type, rule.rule_id
+        parts.append(replacement)
+        detected.append(DetectionSpan(kind, length, length + len(replacement), rule_id, orig_start, orig_end))
+        length += len(replacement)
+        if kind not in found_types:
+            found_types.append(kind)
+        cursor = orig_end
+    parts.append(original[cursor:])
+    masked = "".join(parts)
+    keyword_masked = mask_keywords(masked, custom_keywords)
+    if keyword_masked is not masked and CUSTOM_TYPE not in found_types:
+        found_types.append(CUSTOM_TYPE)
+    return keyword_masked, True, found_types, detected
 
-    # 内置规则
-    for key, rule in SENSITIVE_PATTERNS.items():
-        for match in re.finditer(rule["pattern"], text, re.IGNORECASE):
-            original = match.group(1)
-            masked = masked.replace(original, rule["mask"](original), 1)
-            found_types.add(key)
 
-    # 自定义关键词
-    if custom_keywords:
-        for kw in custom_keywords:
-            if kw and kw in masked:
-                masked = masked.replace(kw, "*" * len(kw))
-                found_types.add("CUSTOM")
+def mask_keywords(masked, custom_keywords):
+    """在脱敏结果上再遮盖一遍自定义关键词，未改动时原样返回同一对象。
 
-    return masked, len(found_types) > 0, list(found_types)
\ No newline at end of file
+    区间按优先级消解后，落在邮箱、URL 等命中内部（或跨越其边界）的关键词不会单独成为区间，
+    而这些规则的脱敏方式可能保留部分原文；用户明确标记的关键词必须在结果中不可见。
+    替换前后长度相同，已有区间的偏移不受影响。
+    """
+    result = masked
+    for kw in custom_keywords or []:
+        if kw and kw in result:
+            result = result.replace(kw, "*" * len(kw))
+    return result
@@ -0,0 +1,184 @@
+# text_normalizer.py
+"""文本规范化：NFKC、全角折叠、零宽字符移除与常见形近字替换，并保留到原文的偏移映射。
+
+检测与分类都在规范化视图上进行，脱敏时再通过偏移映射回原文位置；
+同一条内容只规范化一次，由各分析阶段共享同一个 NormalizedText。
+"""
+
+import re
+import unicodedata
+from array import array
+
+from regex_engine import compile_pattern
+
+# 零宽字符与软连字符，规范化视图中直接删除
+_INVISIBLE_CHARS = frozenset("\u00ad\u180e\u200b\u200c\u200d\u2060\u2061\u2062\u2063\u2064\ufeff")
+
+# 常见的西里尔 / 希腊形近字母，NFKC 不会处理，按拉丁字母折叠
+_CONFUSABLES = {
+    "а": "a", "е": "e", "о": "o", "р": "p", "с": "c", "у": "y", "х": "x", "ѕ": "s",
+    "і": "i", "ј": "j", "ԁ": "d",
+    "А": "A", "В": "B", "Е": "E", "К": "K", "М": "M", "Н": "H", "О": "O", "Р": "P",
+    "С": "C", "Т": "T", "У": "Y", "Х": "X", "Ѕ": "S", "І": "I", "Ј": "J",
+    "α": "a", "ο": "o", "ν": "v", "ρ": "p", "τ": "t", "υ": "u",
+    "Α": "A", "Β": "B", "Ε": "E", "Ζ": "Z", "Η": "H", "Ι": "I", "Κ": "K", "Μ": "M",
+    "Ν": "N", "Ο": "O", "Ρ": "P", "Τ": "T", "Υ": "Y", "Χ": "X",
+}
+
+# 逐字符预计算的码位范围：BMP、数学字母数字符号、带圈/带括号字母数字
+_TABLE_RANGES = ((0x80, 0x10000), (0x1D400, 0x1D800), (0x1F100, 0x1F200))
+_CLUSTER_CACHE_LIMIT = 4096
+_cluster_cache = {}
+# 惰性构建：一对一替换的翻译表，以及会改变长度（需要偏移映射）的字符模式
+_tables = None
+
+
+class NormalizedText:
+    """规范化视图：text 为规范化后的文本，original 为原文。
+
+    starts[i] / ends[i] 记录规范化字符 i 来源于原文的 [start, end) 区间；
+    两者为 None 时视图与原文逐字符对齐（仅有一对一替换）。
+    """
+
+    __slots__ = ("original", "text", "_starts", "_ends")
+
+    def __init__(self, original, text, starts=None, ends=None):
+        self.original = original
+        self.text = text
+        self._starts = starts
+        self._ends = ends
+
+    @property
+    def is_identity(self):
+        return self._starts is None and self.text is self.original
+
+    @property
+    def is_aligned(self):
+        """视图与原文逐字符对齐，同一偏移在两者中指向同一个字符。"""
+        return self._starts is None
+
+    def to_original(self, start, end):
+        """将规范化视图中的 [start, end) 映射为原文区间。"""
+        if self._starts is None or start >= end:
+            return start, end
+        return self._starts[start], self._ends[end - 1]
+
+    def __len__(self):
+        return len(self.text)
+
+
+def normalize_text(text):
+    """构建规范化视图；纯 ASCII 文本不复制，直接返回恒等视图。
+
+    一对一的替换（全角字符、形近字母等）用 str.translate 整段完成，偏移不变；
+    只有删除、展开或组合字符这类改变长度的片段才逐簇处理并记录偏移映射。
+    """
+    text = text or ""
+    if text.isascii():
+        return NormalizedText(text, text)
+    translate_table, complex_pattern = _get_tables()
+    translated = text.translate(translate_table)
+    matches = list(complex_pattern.finditer(text))
+    if not matches:
+        return NormalizedText(text, translated)
+
+    parts = []
+    starts = array("q")
+    ends = array("q")
+    cursor = 0
+    for match in matches:
+        run_start, run_end = match.span()
+        # 组合字符需要与前一个基字符一起规范化
+        if unicodedata.combining(text[run_start]) and run_start > cursor:
+            run_start -= 1
+        if cursor < run_start:
+            parts.append(translated[cursor:run_start])
+            starts.extend(range(cursor, run_start))
+            ends.extend(range(cursor + 1, run_start + 1))
+        _append_normalized_run(parts, starts, ends, text[run_start:run_end], run_start)
+        cursor = run_end
+    if cursor < len(text):
+        parts.append(translated[cursor:])
+        starts.extend(range(cursor, len(text)))
+        ends.extend(range(cursor + 1, len(text) + 1))
+    return NormalizedText(text, "".join(parts), starts, ends)
+
+
+def aligned_view(text):
+    """已知 text 中没有改变长度的字符时，只做一对一翻译构建对齐视图，跳过逐簇扫描。"""
+    text = text or ""
+    if text.isascii():
+        return NormalizedText(text, text)
+    translate_table, _ = _get_tables()
+    return NormalizedText(text, text.translate(translate_table))
+
+
+def as_normalized(value):
+    """接受 str 或 NormalizedText，保证各分析阶段拿到同一种视图。"""
+    if isinstance(value, NormalizedText):
+        return value
+    return normalize_text(value)
+
+
+def _get_tables():
+    global _tables
+    if _tables is None:
+        _tables = _build_tables()
+    return _tables
+
+
+def _build_tables():
+    translate_table = {}
+    complex_ranges = []
+    for low, high in _TABLE_RANGES:
+        for code in range(low, high):
+            char = chr(code)
+            if 0xD800 <= code < 0xE000:
+                continue
+            if char in _INVISIBLE_CHARS or unicodedata.combining(char):
+                folded = None
+            else:
+                folded = unicodedata.normalize("NFKC", char)
+            if folded is not None and len(folded) == 1:
+                folded = _CONFUSABLES.get(folded, folded)
+                if folded != char:
+                    translate_table[code] = folded
+                continue
+            if complex_ranges and complex_ranges[-1][1] == code - 1:
+                complex_ranges[-1][1] = code
+            else:
+                complex_ranges.append([code, code])
+    char_class = "".join(
+        re.escape(chr(low)) if low == high else f"{re.escape(chr(low))}-{re.escape(chr(high))}"
+        for low, high in complex_ranges
+    )
+    return translate_table, compile_pattern(f"[{char_class}]+")
+
+
+def _append_normalized_run(parts, starts, ends, run, offset):
+    # 以“基字符 + 其后的组合字符”为一簇做规范化，簇内输出字符都映射回整簇
+    index = 0
+    length = len(run)
+    while index < length:
+        end = index + 1
+        while end < length and unicodedata.combining(run[end]):
+            end += 1
+        folded = _fold_cluster(run[index:end])
+        if folded:
+            parts.append(folded)
+            starts.extend([offset + index] * len(folded))
+            ends.extend([offset + end] * len(folded))
+        index = end
+
+
+def _fold_cluster(cluster):
+    folded = _cluster_cache.get(cluster)
+    if folded is not None:
+        return folded
+    folded = "".join(char for char in cluster if char not in _INVISIBLE_CHARS)
+    folded = unicodedata.normalize("NFKC", folded)
+    folded = "".join(_CONFUSABLES.get(char, char) for char in folded)
+    if len(_cluster_cache) >= _CLUSTER_CACHE_LIMIT:
+        _cluster_cache.clear()
+    _cluster_cache[cluster] = folded
+    return folded
@@ -0,0 +1,43 @@
+"""测量前台应用解析的耗时：焦点未变化时应命中缓存，单次解析为微秒级。
+
+在桌面会话中运行（Windows / macOS / X11）：
+    python tools/benchmark_app_resolver.py [--calls 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app_resolver import AppResolver  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    resolver = AppResolver()
+    started = time.perf_counter()
+    name = resolver.resolve()
+    first_us = (time.perf_counter() - started) * 1e6
+    started = time.perf_counter()
+    for _ in range(args.calls):
+        resolver.resolve()
+    elapsed_us = (time.perf_counter() - started) * 1e6
+    stats = resolver.stats()
+    resolver.close()
+    print(f"前台应用：{name}")
+    print(f"首次解析：{first_us:.1f} µs")
+    print(f"后续平均：{elapsed_us / args.calls:.2f} µs（{args.calls} 次）")
+    print(f"统计：{stats}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""对比超长内容的首条记录耗时：全文分析 vs 软上限下的首尾预览分析。
+
+预览分析耗时应与内容大小基本无关，全文分析留给后台 deferred 阶段。
+
+运行方式：
+    python tools/benchmark_capture_limits.py [--sizes-mb 1,4,16]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from core.analysis_pipeline import analyze_content  # noqa: E402
+from core.capture_limits import PREVIEW_HEAD_CHARS, PREVIEW_TAIL_CHARS, head_tail_preview  # noqa: E402
+
+_LINE = "2024-05-01 12:00:00 INFO request id=42 user=alice@example.com path=/api/v1/items status=200\n"
+
+
+def _make_text(size):
+    return (_LINE * (size // len(_LINE) + 1))[:size]
+
+
+def _measure(text):
+    started = time.perf_counter()
+    analyze_content(text)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes-mb", default="1,4,16", help="内容大小（MB），逗号分隔")
+    args = parser.parse_args()
+
+    # 预览带有省略说明行，长度上限略高于首尾之和
+    preview_cap = PREVIEW_HEAD_CHARS + PREVIEW_TAIL_CHARS + 64
+    print(f"{'size MB':<10}{'full ms':>12}{'preview ms':>12}{'preview chars':>15}")
+    failed = False
+    for size_mb in (float(value) for value in args.sizes_mb.split(",")):
+        text = _make_text(int(size_mb * 1024 * 1024))
+        full_ms = _measure(text)
+        started = time.perf_counter()
+        preview = head_tail_preview(text)
+        preview_ms = (time.perf_counter() - started) * 1000 + _measure(preview)
+        print(f"{size_mb:<10g}{full_ms:>12.1f}{preview_ms:>12.1f}{len(preview):>15}")
+        if len(preview) > preview_cap:
+            print(f"[失败] 预览长度 {len(preview)} 超过上限 {preview_cap}")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
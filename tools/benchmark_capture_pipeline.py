@@ -0,0 +1,65 @@
+"""模拟下游阶段变慢时的捕获耗时：捕获线程只负责入队，耗时应与下游延迟无关。
+
+运行方式：
+    python tools/benchmark_capture_pipeline.py [--clips 200] [--delays 0,5,50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from core.capture_pipeline import CAPTURE_STAGE_DEFAULTS, CapturePipeline, PipelineStage  # noqa: E402
+
+
+def _slow(delay):
+    def handler(item):
+        time.sleep(delay)
+        return item
+
+    return handler
+
+
+def measure(clips, delay):
+    delivered = []
+    stages = [
+        PipelineStage("analysis", _slow(delay), **CAPTURE_STAGE_DEFAULTS["analysis"]),
+        PipelineStage("persistence", _slow(delay / 2), **CAPTURE_STAGE_DEFAULTS["persistence"]),
+        PipelineStage("notify", delivered.append, **CAPTURE_STAGE_DEFAULTS["notify"]),
+    ]
+    pipeline = CapturePipeline(stages)
+    pipeline.start()
+    worst = 0.0
+    for index in range(clips):
+        started = time.perf_counter()
+        pipeline.submit({"text": f"clip {index}"})
+        worst = max(worst, time.perf_counter() - started)
+        time.sleep(0.001)
+    pipeline.shutdown()
+    stats = pipeline.stats()
+    return stats["avg_submit_ms"], worst * 1000, len(delivered), stats["stages"]["analysis"]["queue"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clips", type=int, default=200)
+    parser.add_argument("--delays", default="0,5,50", help="下游每条耗时（毫秒），逗号分隔")
+    args = parser.parse_args()
+
+    print(f"{'delay ms':<10}{'avg submit ms':>15}{'max submit ms':>15}{'delivered':>11}{'coalesced':>11}")
+    averages = []
+    for delay_ms in (float(value) for value in args.delays.split(",")):
+        average, worst, delivered, queue = measure(args.clips, delay_ms / 1000)
+        averages.append(average)
+        print(f"{delay_ms:<10.0f}{average:>15.4f}{worst:>15.4f}{delivered:>11}{queue['coalesced']:>11}")
+    # 入队耗时应在同一量级，下游慢 10 倍不应让捕获慢 10 倍
+    return 1 if max(averages) > 10 * max(min(averages), 0.01) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
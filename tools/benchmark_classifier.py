@@ -0,0 +1,119 @@
+"""分类器回归与延迟基准：带标注语料上的类别必须全部一致，并输出不同体量下的分类耗时。
+
+每条语料与每个大体量样本还会与全文分类（样本取整段内容）比较，
+首尾有界样本得出的类别与全文不一致时以非零状态退出。
+
+运行方式：
+    python tools/benchmark_classifier.py [--max-mb 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from classifier import classify_content, classify_features  # noqa: E402
+from content_features import extract_features  # noqa: E402
+
+# (期望类别, 内容)
+LABELLED_CORPUS = [
+    ("Text", ""),
+    ("Text", "   \n\t  "),
+    ("Text", "今天天气不错，下午一起去散步吧。"),
+    ("Text", "Lunch at noon? Let me know."),
+    ("Business", "请在周五前把合同和发票寄给客户。"),
+    ("Business", "Attached is the updated invoice for the Q3 agreement."),
+    ("URL", "https://example.com/docs/getting-started?ref=clipguard"),
+    ("URL", "文档地址：http://intranet.local/wiki/首页"),
+    ("Email", "alice.wang@example.com"),
+    ("Email", "有问题请联系 support@example.org，我们会尽快回复"),
+    ("Phone", "13800138000"),
+    ("Phone", "客户电话 13912345678 请回电"),
+    ("ID", "11010120000101002X"),
+    ("Image", "screenshot-2024.png"),
+    ("Image", "C:\\Users\\bob\\Desktop\\logo final.jpg"),
+    ("Document", "请查看 report.pdf 中的第三节"),
+    ("Spreadsheet", "请核对 export-2024-05.csv 里的数据"),
+    ("Archive", "release-1.2.0.tar.gz"),
+    ("Video", "meeting-recording.mp4"),
+    ("Code", "def load(path):\n    return open(path).read()\n"),
+    ("Code", "import os\nprint(os.getcwd())"),
+    ("Code", "const total = items.reduce((a, b) => a + b, 0);"),
+    ("Code", "function greet(name) {\n  console.log('hi ' + name);\n}"),
+    ("Code", "SELECT id, name FROM users WHERE id = 1;\nSELECT count(*) FROM orders;"),
+    ("Code", "{\n  \"name\": \"clipguard\",\n  \"tags\": [\"a\", \"b\"]\n}"),
+    ("Code", "public class Main {\n    public static void main(String[] args) {}\n}"),
+    ("Code", "x = compute(1, 2)"),
+]
+
+LARGE_SAMPLES = {
+    "prose": "Please review the attached notes before the weekly sync and add your comments. ",
+    "code": "def handler(event):\n    value = event.get('value')\n    return {'ok': bool(value)}\n",
+    "log": "2024-05-01T10:00:00Z INFO status=200 path=/api/v1/items latency=12ms\n",
+}
+
+
+def classify_full(text):
+    """不取样的全文分类：扩展名与代码特征在整段内容上计算。"""
+    features = extract_features(text)
+    if features.sample:
+        features.sample = features.text.strip()
+    return classify_features(features)
+
+
+def check_sampled(text, sampled):
+    full = classify_full(text)
+    if full != sampled:
+        print(f"[失败] 样本分类 {sampled} 与全文分类 {full} 不一致：长度 {len(text)}，{text[:50]!r}")
+        return 1
+    return 0
+
+
+def check_corpus():
+    failures = 0
+    for expected, text in LABELLED_CORPUS:
+        actual = classify_content(text)
+        if actual != expected:
+            failures += 1
+            print(f"[失败] 期望 {expected}，实际 {actual}：{text[:50]!r}")
+        failures += check_sampled(text, actual)
+    print(f"标注语料：{len(LABELLED_CORPUS) - failures}/{len(LABELLED_CORPUS)} 条类别一致")
+    return failures
+
+
+def measure_latency(max_mb):
+    sizes = []
+    size = 16 * 1024
+    while size <= max_mb * 1024 * 1024:
+        sizes.append(size)
+        size *= 4
+    print(f"{'kind':<8}{'size':>12}{'classify ms':>14}")
+    failures = 0
+    for kind, unit in LARGE_SAMPLES.items():
+        for size in sizes:
+            text = unit * (size // len(unit) + 1)
+            classify_content(text)
+            started = time.perf_counter()
+            category = classify_content(text)
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"{kind:<8}{len(text):>12}{elapsed:>14.2f}  {category}")
+            failures += check_sampled(text, category)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-mb", type=int, default=8)
+    args = parser.parse_args()
+    failures = check_corpus()
+    failures += measure_latency(args.max_mb)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""对比剪贴板读取后端在空闲轮询时的 CPU 占用与唤醒次数。
+
+pyperclip 在 Linux 上每次读取都会启动 xclip / xsel / wl-paste 子进程；
+常驻后端（Windows 系统 API、Wayland 的 wl-paste --watch）读取时不产生子进程。
+当前环境不可用的后端（例如未安装 pyperclip）标记为跳过，其余后端照常测量。
+与 ClipboardWorker 一致，每次轮询先比较变化令牌，令牌未变时不读取正文（full reads 列）。
+需要在 Linux 图形会话中运行：
+    python tools/benchmark_clipboard_backend.py [--seconds 30] [--interval 0.8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import resource
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from clipboard_monitor import BackendUnavailable, PyperclipBackend, create_backend  # noqa: E402
+
+
+def _cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime, children.ru_utime + children.ru_stime
+
+
+def measure(backend, seconds, interval):
+    backend.read_text()  # 预热：建立连接或等待首次推送
+    own_before, children_before = _cpu_seconds()
+    reads = full_reads = 0
+    last_token = None
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        token = backend.change_token()
+        if token is None or token != last_token:
+            backend.read_text()
+            full_reads += 1
+            last_token = token
+        reads += 1
+        time.sleep(interval)
+    own_after, children_after = _cpu_seconds()
+    return {
+        "reads": reads,
+        "full_reads": full_reads,
+        "wakeups_per_min": reads * 60.0 / seconds,
+        "own_cpu_ms": (own_after - own_before) * 1000,
+        "children_cpu_ms": (children_after - children_before) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--interval", type=float, default=0.8)
+    args = parser.parse_args()
+
+    backends = [PyperclipBackend()]
+    native = create_backend()
+    if native.persistent:
+        backends.append(native)
+    else:
+        native.close()
+        native = None
+        print("当前环境没有常驻后端可用，只测量 pyperclip")
+    print(f"{'backend':<14}{'polls':>8}{'full reads':>12}{'wakeups/min':>14}{'own cpu ms':>13}{'child cpu ms':>14}")
+    measured = 0
+    for backend in backends:
+        try:
+            result = measure(backend, args.seconds, args.interval)
+        except BackendUnavailable as exc:
+            print(f"{backend.name:<14}跳过：{exc}")
+            continue
+        finally:
+            backend.close()
+        measured += 1
+        print(
+            f"{backend.name:<14}{result['reads']:>8}{result['full_reads']:>12}{result['wakeups_per_min']:>14.1f}"
+            f"{result['own_cpu_ms']:>13.1f}{result['children_cpu_ms']:>14.1f}"
+        )
+    if native is not None and native.supports_listener():
+        # 事件驱动时工作线程只在剪贴板变化时被唤醒，空闲读取次数为 0
+        print(f"{native.name} 支持变化推送，ClipboardWorker 空闲时不轮询")
+    if not measured:
+        print("[失败] 没有可用的剪贴板读取后端")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
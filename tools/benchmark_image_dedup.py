@@ -0,0 +1,82 @@
+"""对比感知哈希分段索引与逐条比较的近重复查找：结果应一致，索引耗时不随历史条数线性增长。
+
+运行方式：
+    python tools/benchmark_image_dedup.py [--history 20000] [--queries 2000] [--distance 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from image_hash import HASH_BITS, PerceptualHashIndex, hamming  # noqa: E402
+
+
+def _flip(value, bits, rng):
+    for bit in rng.sample(range(HASH_BITS), bits):
+        value ^= 1 << bit
+    return value
+
+
+def linear_find(hashes, value, max_distance):
+    best = None
+    for record_id, stored in hashes.items():
+        distance = hamming(value, stored)
+        if distance <= max_distance and (best is None or distance < best[1]):
+            best = (record_id, distance)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--history", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--distance", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    hashes = {record_id: rng.getrandbits(HASH_BITS) for record_id in range(args.history)}
+    index = PerceptualHashIndex(args.distance)
+    for record_id, value in hashes.items():
+        index.add(record_id, value)
+
+    # 一半查询是已有图片的轻微变化（应命中），一半是全新图片
+    queries = []
+    for _ in range(args.queries):
+        if rng.random() < 0.5:
+            target = rng.randrange(args.history)
+            queries.append(_flip(hashes[target], rng.randint(0, args.distance), rng))
+        else:
+            queries.append(rng.getrandbits(HASH_BITS))
+
+    started = time.perf_counter()
+    indexed = [index.find(value) for value in queries]
+    index_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    linear = [linear_find(hashes, value, args.distance) for value in queries]
+    linear_ms = (time.perf_counter() - started) * 1000
+
+    # 多条记录距离相同时命中的 id 可能不同，只比较距离
+    mismatches = sum(
+        1 for a, b in zip(indexed, linear) if (a is None) != (b is None) or (a is not None and a[1] != b[1])
+    )
+    hits = sum(1 for item in indexed if item is not None)
+    print(f"history={args.history} queries={args.queries} distance<={args.distance} hits={hits}")
+    print(f"{'method':<10}{'total ms':>12}{'per query us':>15}")
+    print(f"{'index':<10}{index_ms:>12.1f}{index_ms * 1000 / args.queries:>15.1f}")
+    print(f"{'linear':<10}{linear_ms:>12.1f}{linear_ms * 1000 / args.queries:>15.1f}")
+    if mismatches:
+        print(f"[失败] {mismatches} 条查询的结果与逐条比较不一致")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""模拟反复复制不断变长的日志，对比全文分析与增量分析的耗时，并校验两者结果一致。
+
+增量分析的检测与分类特征都只重扫变化区间，耗时应与追加量相关而与日志总长无关。
+
+运行方式：
+    python tools/benchmark_incremental.py [--lines 20000] [--steps 10]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from core.analysis_pipeline import AnalysisPipeline  # noqa: E402
+from core.incremental_analysis import IncrementalAnalyzer  # noqa: E402
+
+LOG_LINES = [
+    "2024-05-01T10:00:{sec:02d}Z INFO status=200 path=/api/v1/items latency=12ms\n",
+    "2024-05-01T10:00:{sec:02d}Z WARN retry user=alice.wang@example.com attempt=2\n",
+    "2024-05-01T10:00:{sec:02d}Z INFO callback phone=13800138000 order=20240501\n",
+    "2024-05-01T10:00:{sec:02d}Z DEBUG payload={{\"id\": 42, \"ok\": true}}\n",
+]
+
+
+def _log(rng, count):
+    return "".join(rng.choice(LOG_LINES).format(sec=rng.randrange(60)) for _ in range(count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    pipeline = AnalysisPipeline()
+    incremental = IncrementalAnalyzer()
+    rules_key = ("benchmark",)
+    text = _log(rng, args.lines)
+    context = pipeline.run(text)
+    incremental.offer_features(text, context.features)
+    incremental.remember(text, rules_key, context.result())
+    mismatches = 0
+    total_full = total_incremental = 0.0
+    print(f"{'step':<6}{'size':>10}{'full ms':>12}{'incremental ms':>16}")
+    for step in range(args.steps):
+        # 大多数情况是在末尾追加，偶尔在开头插入
+        added = _log(rng, rng.randint(1, 20))
+        text = added + text if step % 5 == 4 else text + added
+        started = time.perf_counter()
+        expected = pipeline.analyze(text)
+        full_time = time.perf_counter() - started
+        started = time.perf_counter()
+        actual = incremental.analyze(text, [], rules_key)
+        incremental_time = time.perf_counter() - started
+        flag = ""
+        if actual is None:
+            flag = "  退回全文分析"
+            actual = expected
+        elif tuple(actual[:4]) != tuple(expected[:4]) or list(actual[4]) != list(expected[4]):
+            mismatches += 1
+            flag = "  结果不一致"
+        incremental.remember(text, rules_key, actual)
+        total_full += full_time
+        total_incremental += incremental_time
+        print(f"{step:<6}{len(text):>10}{full_time * 1000:>12.2f}{incremental_time * 1000:>16.2f}{flag}")
+    print(f"total{'':>11}{total_full * 1000:>12.2f}{total_incremental * 1000:>16.2f}")
+    print(f"增量统计：{incremental.stats()}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
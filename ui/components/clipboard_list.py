@@ -1,4 +1,5 @@
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtGui import QPixmap
 from PySide6.QtWidgets import (
     QFrame,
     QGridLayout,
@@ -13,6 +14,7 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from classifier import category_group
 from ui.i18n import Translator
 
 
@@ -39,6 +41,8 @@ class ClipboardCard(QFrame):
         self._copy_button = None
         self._delete_button = None
         self._restore_button = None
+        self._thumbnail = None
+        self._thumbnail_loaded = False
         self._build_ui()
         self._apply_translations()
 
@@ -92,6 +96,14 @@ class ClipboardCard(QFrame):
         header_layout.addWidget(self._delete_button)
         layout.addWidget(header)
 
+        if self.is_image():
+            # 缩略图在卡片进入可视区域后才加载，先保留占位高度避免滚动时布局跳动
+            self._thumbnail = QLabel(self)
+            self._thumbnail.setObjectName("cardThumbnail")
+            self._thumbnail.setAlignment(Qt.AlignCenter)
+            self._thumbnail.setMinimumHeight(120)
+            layout.addWidget(self._thumbnail)
+
         preview = QLabel(self.record.get("masked_preview", self.record.get("masked", "")) or "")
         preview.setObjectName("cardContent")
         preview.setWordWrap(True)
@@ -111,6 +123,23 @@ class ClipboardCard(QFrame):
         footer_layout.addStretch(1)
         layout.addWidget(footer)
 
+    def is_image(self):
+        return category_group(self.record.get("category")) == "image"
+
+    def needs_thumbnail(self):
+        return self._thumbnail is not None and not self._thumbnail_loaded
+
+    def set_thumbnail(self, path: str):
+        if self._thumbnail is None:
+            return
+        self._thumbnail_loaded = True
+        pixmap = QPixmap(path) if path else QPixmap()
+        if pixmap.isNull():
+            # 策略限制未保存图片或数据已损坏，只保留文字说明
+            self._thumbnail.hide()
+            return
+        self._thumbnail.setPixmap(pixmap)
+
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
             self.clicked.emit(self.row)
@@ -162,6 +191,7 @@ class ClipboardCardView(QWidget):
         self._translator = translator
         self._mode = "list"
         self._cards = []
+        self._thumbnail_provider = None
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -178,6 +208,7 @@ class ClipboardCardView(QWidget):
         self.grid.setVerticalSpacing(16)
         self.scroll.setWidget(self.container)
         layout.addWidget(self.scroll)
+        self.scroll.verticalScrollBar().valueChanged.connect(self._schedule_thumbnails)
 
     def set_mode(self, mode: str):
         if mode not in ("list", "grid"):
@@ -186,6 +217,44 @@ class ClipboardCardView(QWidget):
             self._mode = mode
             self._reflow_cards()
 
+    def set_thumbnail_provider(self, provider):
+        """provider 需提供 request(record_id) 与 thumbnailReady(int, str) 信号，通常是 ThumbnailService。"""
+        if self._thumbnail_provider is not None:
+            self._thumbnail_provider.thumbnailReady.disconnect(self._on_thumbnail_ready)
+        self._thumbnail_provider = provider
+        if provider is not None:
+            provider.thumbnailReady.connect(self._on_thumbnail_ready)
+            self._schedule_thumbnails()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._schedule_thumbnails()
+
+    def _schedule_thumbnails(self, *args):
+        # 等本轮布局完成后再计算可见区域
+        QTimer.singleShot(0, self._load_visible_thumbnails)
+
+    def _load_visible_thumbnails(self):
+        if self._thumbnail_provider is None:
+            return
+        viewport = self.scroll.viewport()
+        top = self.scroll.verticalScrollBar().value()
+        bottom = top + viewport.height()
+        for card in self._cards:
+            if not card.needs_thumbnail() or card.record.get("id") is None:
+                continue
+            geometry = card.geometry()
+            if geometry.bottom() < top or geometry.top() > bottom:
+                continue
+            path = self._thumbnail_provider.request(card.record["id"])
+            if path is not None:
+                card.set_thumbnail(path)
+
+    def _on_thumbnail_ready(self, record_id: int, path: str):
+        for card in self._cards:
+            if card.record.get("id") == record_id and card.needs_thumbnail():
+                card.set_thumbnail(path)
+
     def set_records(self, records):
         for card in self._cards:
             card.setParent(None)
@@ -224,6 +293,7 @@ class ClipboardCardView(QWidget):
             c = idx % columns
             self.grid.addWidget(card, r, c)
         self.grid.setColumnStretch(columns, 1)
+        self._schedule_thumbnails()
 
 
 class ClipboardListWidget(QWidget):
@@ -368,6 +438,9 @@ class ClipboardListWidget(QWidget):
         for signal, handler in self._model_connections:
             signal.connect(handler)
 
+    def set_thumbnail_provider(self, provider):
+        self.card_view.set_thumbnail_provider(provider)
+
     def select_first_row(self):
         self.select_row(0)
 
@@ -13,6 +13,7 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from classifier import SIDEBAR_GROUPS
 from ui.i18n import Translator
 
 
@@ -112,12 +113,7 @@ class SidebarWidget(QWidget):
 
         self._type_section = self._build_button_section(
             "sidebar.section.types",
-            [
-                ("sidebar.filter.text", "type:text"),
-                ("sidebar.filter.image", "type:image"),
-                ("sidebar.filter.url", "type:url"),
-                ("sidebar.filter.code", "type:code"),
-            ],
+            [(f"sidebar.filter.{group}", f"type:{group}") for group in SIDEBAR_GROUPS],
             self.contentFilterRequested,
             "filter",
         )
@@ -72,6 +72,11 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "detail.masked_placeholder": "脱敏内容将在此显示",
         "detail.raw_placeholder_enabled": "刚刚捕获的数据会显示原始内容。",
         "detail.raw_placeholder_disabled": "已关闭保存原始内容。",
+        "detail.format.plain": "纯文本",
+        "detail.format.text/html": "HTML",
+        "detail.format.text/rtf": "RTF",
+        "detail.format.text/uri-list": "文件列表",
+        "detail.format.available": "复制时可用的格式: {value}",
 
         # Actions
         "action.copy": "复制",
@@ -101,9 +106,14 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "status.history.refreshed": "历史记录已刷新",
         "status.settings.saved": "设置已保存",
         "status.format.failed": "无法格式化该内容",
+        "status.format.missing": "该格式的内容已不存在",
         "status.favorite.invalid": "该记录缺少标识，无法调整收藏状态",
         "status.favorite.added": "已加入收藏",
         "status.favorite.removed": "已取消收藏",
+        "status.remask.progress": "正在按新规则重新脱敏历史记录：{done}/{total}",
+        "status.remask.finished": "历史记录重新脱敏完成，更新 {count} 条",
+        "status.reclassify.progress": "正在重新分类历史记录：{done}/{total}",
+        "status.reclassify.finished": "历史记录重新分类完成，更新 {count} 条",
 
         # Settings dialog
         "settings.title": "设置",
@@ -121,14 +131,20 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "settings.monitoring.images": "监控图片内容",
         "settings.monitoring.urls": "监控链接内容",
         "settings.monitoring.code": "监控代码片段",
-        "settings.monitoring.interval_label": "剪贴板检测间隔",
+        "settings.monitoring.interval_label": "检测间隔",
+        "settings.monitoring.interval_max_label": "空闲时最长间隔",
         "settings.monitoring.interval_section": "轮询设置",
         "settings.monitoring.interval_suffix": " 秒",
-        "settings.monitoring.excluded.section": "排除应用",
+        "settings.monitoring.excluded.section": "应用策略",
         "settings.monitoring.excluded.add": "添加应用",
         "settings.monitoring.excluded.remove": "移除选中",
-        "settings.monitoring.excluded.hint": "提示：排除的应用复制内容将不会记录。",
+        "settings.monitoring.excluded.hint": "提示：可按应用选择忽略、仅记录元数据、全部遮盖或不保留原文；名称不区分大小写，支持 * 通配符。",
         "settings.monitoring.excluded.prompt": "应用名称：",
+        "settings.monitoring.policy.prompt": "处理方式：",
+        "settings.monitoring.policy.ignore": "忽略",
+        "settings.monitoring.policy.metadata_only": "仅记录元数据",
+        "settings.monitoring.policy.mask_all": "全部遮盖",
+        "settings.monitoring.policy.no_raw": "不保留原文",
 
         # Storage tab
         "settings.storage.section": "存储策略",
@@ -138,6 +154,10 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "settings.storage.location.section": "存储位置",
         "settings.storage.location.local": "本地存储（仅当前设备）",
         "settings.storage.location.cloud": "云端同步（需要额外配置）",
+        "settings.storage.maintenance.section": "历史维护",
+        "settings.storage.reclassify": "重新分类历史记录",
+        "settings.storage.reclassify.hint": "分类规则更新后，按当前规则在后台重新分类已保存的记录，仅更新类别发生变化的条目。",
+        "settings.storage.reclassify.started": "已在后台开始重新分类",
 
         # Privacy tab
         "settings.privacy.section": "隐私控制",
@@ -148,6 +168,12 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "settings.privacy.keywords": "自定义敏感词",
         "settings.privacy.placeholder": "以逗号分隔，例如: 密码, 合同, 秘密",
         "settings.privacy.clear_keywords": "清空敏感词",
+        "settings.privacy.packs.section": "地区检测规则",
+        "settings.privacy.packs.cn": "中国大陆：身份证号、手机号",
+        "settings.privacy.packs.us_ssn": "美国：社会安全号（SSN）",
+        "settings.privacy.packs.eu_iban": "欧盟：国际银行账号（IBAN）",
+        "settings.privacy.packs.jp_my_number": "日本：个人编号（My Number）",
+        "settings.privacy.packs.hint": "仅启用的规则包会被加载和匹配，启用越少检测越快。",
 
         # Notifications tab
         "settings.notifications.section": "通知提醒",
@@ -245,6 +271,11 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "detail.masked_placeholder": "Masked content appears here.",
         "detail.raw_placeholder_enabled": "Captured entries show the original content here.",
         "detail.raw_placeholder_disabled": "Saving original content is disabled.",
+        "detail.format.plain": "Plain text",
+        "detail.format.text/html": "HTML",
+        "detail.format.text/rtf": "RTF",
+        "detail.format.text/uri-list": "File list",
+        "detail.format.available": "Formats available at copy time: {value}",
 
         # Actions
         "action.copy": "Copy",
@@ -274,9 +305,14 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "status.history.refreshed": "History refreshed",
         "status.settings.saved": "Settings saved",
         "status.format.failed": "Unable to format this content",
+        "status.format.missing": "This format is no longer stored",
         "status.favorite.invalid": "Record has no identifier; cannot change favorite state",
         "status.favorite.added": "Added to favorites",
         "status.favorite.removed": "Removed from favorites",
+        "status.remask.progress": "Re-masking history with current rules: {done}/{total}",
+        "status.remask.finished": "History re-masked, {count} record(s) updated",
+        "status.reclassify.progress": "Reclassifying history: {done}/{total}",
+        "status.reclassify.finished": "History reclassified, {count} record(s) updated",
 
         # Settings dialog
         "settings.title": "Settings",
@@ -294,14 +330,20 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "settings.monitoring.images": "Capture image content",
         "settings.monitoring.urls": "Capture link content",
         "settings.monitoring.code": "Capture code snippets",
-        "settings.monitoring.interval_label": "Clipboard polling interval",
+        "settings.monitoring.interval_label": "Polling interval",
+        "settings.monitoring.interval_max_label": "Idle polling interval",
         "settings.monitoring.interval_section": "Polling Settings",
         "settings.monitoring.interval_suffix": " s",
-        "settings.monitoring.excluded.section": "Excluded Apps",
+        "settings.monitoring.excluded.section": "App Policies",
         "settings.monitoring.excluded.add": "Add App",
         "settings.monitoring.excluded.remove": "Remove Selected",
-        "settings.monitoring.excluded.hint": "Hint: entries copied from these apps are ignored.",
+        "settings.monitoring.excluded.hint": "Hint: per app, choose to ignore copies, record metadata only, mask everything or never keep raw text. Names are case-insensitive and support * wildcards.",
         "settings.monitoring.excluded.prompt": "Application name:",
+        "settings.monitoring.policy.prompt": "Policy:",
+        "settings.monitoring.policy.ignore": "Ignore",
+        "settings.monitoring.policy.metadata_only": "Metadata only",
+        "settings.monitoring.policy.mask_all": "Mask everything",
+        "settings.monitoring.policy.no_raw": "No raw retention",
 
         # Storage tab
         "settings.storage.section": "Storage Strategy",
@@ -311,6 +353,10 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "settings.storage.location.section": "Storage Location",
         "settings.storage.location.local": "Local only (this device)",
         "settings.storage.location.cloud": "Cloud sync (requires extra setup)",
+        "settings.storage.maintenance.section": "History Maintenance",
+        "settings.storage.reclassify": "Reclassify history",
+        "settings.storage.reclassify.hint": "After classification rules change, re-run the classifier over saved records in the background. Only records whose category changes are updated.",
+        "settings.storage.reclassify.started": "Reclassification started in background",
 
         # Privacy tab
         "settings.privacy.section": "Privacy Controls",
@@ -321,6 +367,12 @@ TRANSLATIONS: Dict[str, Dict[str, str]] = {
         "settings.privacy.keywords": "Custom sensitive keywords",
         "settings.privacy.placeholder": "Comma separated, e.g. password, contract, secret",
         "settings.privacy.clear_keywords": "Clear keywords",
+        "settings.privacy.packs.section": "Regional Detection Rules",
+        "settings.privacy.packs.cn": "Mainland China: ID card and mobile numbers",
+        "settings.privacy.packs.us_ssn": "United States: Social Security Number (SSN)",
+        "settings.privacy.packs.eu_iban": "European Union: IBAN bank accounts",
+        "settings.privacy.packs.jp_my_number": "Japan: My Number",
+        "settings.privacy.packs.hint": "Only enabled packs are loaded and matched; fewer packs mean faster detection.",
 
         # Notifications tab
         "settings.notifications.section": "Notifications",
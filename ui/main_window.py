@@ -6,9 +6,10 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 from PySide6.QtCore import Qt, QSize
-from PySide6.QtGui import QIcon
+from PySide6.QtGui import QColor, QGuiApplication, QIcon, QImage, QTextCharFormat, QTextCursor
 from PySide6.QtWidgets import (
     QApplication,
+    QComboBox,
     QDialog,
     QGroupBox,
     QHBoxLayout,
@@ -22,13 +23,34 @@ from PySide6.QtWidgets import (
     QStatusBar,
     QStyle,
     QSystemTrayIcon,
+    QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
+from classifier import category_group
+from clip_formats import format_preview
+from clipboard_monitor import supports_change_events
 from config import load_config, save_config
+from core.clipboard_watcher import ClipboardChangeNotifier
 from core.clipboard_worker import ClipboardWorker
-from database import delete_permanently, get_all_records, get_records, init_db, set_deleted, set_favorite
+from core.reclassify_job import ReclassifyJob
+from core.remask_job import RemaskJob
+from core.thumbnails import ThumbnailCache, ThumbnailService
+from database import (
+    delete_permanently,
+    get_all_records,
+    get_format_blob,
+    get_image_blob,
+    get_masked_content,
+    get_record_formats,
+    get_record_spans,
+    get_records,
+    init_db,
+    set_deleted,
+    set_favorite,
+)
+from sensitive_detector import DetectionSpan
 from ui.models import ClipHistoryModel
 from ui.settings_dialog import SettingsDialog
 from ui.components import ClipboardListWidget, SidebarWidget, TopBarWidget
@@ -63,6 +85,9 @@ class GripSplitter(QSplitter):
 
 class ClipGuardWindow(QMainWindow):
     RECENT_WINDOW_HOURS = 24
+    SPAN_HIGHLIGHT_COLOR = "#fde68a"
+    # 超大内容只高亮前若干处命中，避免详情面板卡顿
+    MAX_HIGHLIGHT_SPANS = 2000
 
     def __init__(self):
         super().__init__()
@@ -94,6 +119,8 @@ class ClipGuardWindow(QMainWindow):
         self._raw_original_text = ""
         self._masked_formatted = False
         self._raw_formatted = False
+        # 原文区域当前展示的附加格式（MIME），空字符串表示纯文本
+        self._raw_view_mime = ""
         self._all_records = self._load_initial_records()
         self.model = ClipHistoryModel(list(self._all_records), translator=self.translator)
 
@@ -101,6 +128,10 @@ class ClipGuardWindow(QMainWindow):
         self._connect_components()
         self._apply_styles()
         self._setup_worker()
+        self._remask_job = None
+        self._resume_remask_job()
+        self._reclassify_job = None
+        self._resume_reclassify_job()
         self._update_actions()
         self._tray_icon = None
         self._tray_menu = None
@@ -153,6 +184,12 @@ class ClipGuardWindow(QMainWindow):
 
         self.clipboard_list = ClipboardListWidget(self.translator, self.content_splitter)
         self.clipboard_list.setMinimumWidth(320)
+        self.thumbnails = ThumbnailService(
+            ThumbnailCache(max_bytes=self.config.get("thumbnail_cache_mb", 64) * 1024 * 1024),
+            workers=self.config.get("thumbnail_workers", 2),
+            parent=self,
+        )
+        self.clipboard_list.set_thumbnail_provider(self.thumbnails)
         self.content_splitter.addWidget(self.clipboard_list)
 
         self.detail_group = QGroupBox("", self.content_splitter)
@@ -197,6 +234,10 @@ class ClipGuardWindow(QMainWindow):
         raw_header.setContentsMargins(0, 0, 0, 0)
         self.detail_raw_label = QLabel("", self.detail_group)
         raw_header.addWidget(self.detail_raw_label)
+        self.detail_format_combo = QComboBox(self.detail_group)
+        self.detail_format_combo.setVisible(False)
+        self.detail_format_combo.currentIndexChanged.connect(self._on_detail_format_changed)
+        raw_header.addWidget(self.detail_format_combo)
         raw_header.addStretch(1)
         self.format_raw_button = QPushButton("", self.detail_group)
         self.format_raw_button.setCursor(Qt.PointingHandCursor)
@@ -274,6 +315,7 @@ class ClipGuardWindow(QMainWindow):
             return
         if self._current_route == "/trash":
             delete_permanently(record_id)
+            self.thumbnails.discard(record_id)
             self._all_records = [item for item in self._all_records if item.get("id") != record_id]
             if self._active_record and self._active_record.get("id") == record_id:
                 self._active_record = None
@@ -293,7 +335,13 @@ class ClipGuardWindow(QMainWindow):
         if not record:
             self._show_status("status.copy.none", 2000)
             return
-        text = record.get("raw") or record.get("masked") or record.get("masked_preview") or ""
+        if category_group(record.get("category")) == "image" and record.get("id") is not None:
+            if self._copy_image_to_clipboard(record["id"]):
+                self._active_record = record
+                self._focus_record(record)
+                self._show_status("status.copy.success", 2000)
+                return
+        text = record.get("raw") or self._full_masked(record) or record.get("masked_preview") or ""
         if not text:
             self._show_status("status.copy.empty", 2000)
             return
@@ -326,6 +374,17 @@ class ClipGuardWindow(QMainWindow):
         QApplication.clipboard().setText(text)
         return True
 
+    def _copy_image_to_clipboard(self, record_id) -> bool:
+        blob = get_image_blob(record_id)
+        if blob is None:
+            # 受策略限制的图片只有元数据，退回复制文字说明
+            return False
+        image = QImage.fromData(blob[1])
+        if image.isNull():
+            return False
+        QApplication.clipboard().setImage(image)
+        return True
+
     def _on_search_text_changed(self, text: str):
         self._filters["search"] = text or ""
         self._apply_filters()
@@ -399,7 +458,7 @@ class ClipGuardWindow(QMainWindow):
         app_filter = self._filters.get("app")
 
         def matches(record):
-            record_type = self._type_key(record.get("category"))
+            record_type = category_group(record.get("category"))
             if type_filter and record_type != type_filter:
                 return False
             if app_filter and record.get("app") != app_filter:
@@ -525,7 +584,7 @@ class ClipGuardWindow(QMainWindow):
 
         type_counts = {key: 0 for key in self.sidebar.type_filters()}
         for rec in active_records:
-            category_key = self._type_key(rec.get("category"))
+            category_key = category_group(rec.get("category"))
             payload = f"type:{category_key}"
             if payload in type_counts:
                 type_counts[payload] += 1
@@ -539,33 +598,22 @@ class ClipGuardWindow(QMainWindow):
 
         self.sidebar.update_counts(nav_counts=nav_counts, type_counts=type_counts, app_counts=app_counts)
 
-    @staticmethod
-    def _type_key(category):
-        mapping = {
-            "business": "text",
-            "email": "text",
-            "phone": "text",
-            "id": "text",
-            "text": "text",
-            "note": "text",
-            "url": "url",
-            "link": "url",
-            "website": "url",
-            "code": "code",
-            "snippet": "code",
-            "script": "code",
-            "image": "image",
-            "picture": "image",
-            "screenshot": "image",
-        }
-        key = (category or "").strip().lower()
-        return mapping.get(key, "text")
-
     def _setup_worker(self):
-        interval = self.config.get("poll_interval", 0.8)
-        self.worker = ClipboardWorker(lambda: self.config, interval=interval)
+        self.worker = ClipboardWorker(
+            lambda: self.config,
+            interval=self.config.get("poll_interval", 0.8),
+            max_interval=self.config.get("poll_interval_max", 3.0),
+        )
         self.worker.record_ready.connect(self._on_record_ready)
+        self.worker.record_updated.connect(self._on_record_updated)
         self.worker.error.connect(self._on_worker_error)
+        self.worker.rules_changed.connect(lambda: self._schedule_remask([]))
+        self._clipboard_notifier = None
+        self._setup_clipboard_events()
+        # 轮询模式下本窗口在前台时放慢轮询，切到其他应用时恢复快速轮询
+        QGuiApplication.instance().applicationStateChanged.connect(
+            lambda state: self.worker.set_app_active(state == Qt.ApplicationActive)
+        )
         self._monitoring = False
         if self.config.get("enable_monitoring", True):
             self.start_monitoring()
@@ -573,6 +621,22 @@ class ClipGuardWindow(QMainWindow):
             self._update_actions()
             self._show_status("status.monitor.paused", 3000)
 
+    def _setup_clipboard_events(self):
+        backend = self.config.get("clipboard_backend", "auto")
+        platform_name = QGuiApplication.platformName()
+        if backend == "poll" or (backend == "auto" and not supports_change_events(platform_name)):
+            print(f"[调试] 剪贴板使用轮询模式（backend={backend}, platform={platform_name}）")
+            return
+        self._clipboard_notifier = ClipboardChangeNotifier(
+            QApplication.clipboard(),
+            self.worker.notify_clipboard_changed,
+            parent=self,
+            image_callback=self.worker.notify_clipboard_image,
+            format_selector=self.worker.select_formats,
+        )
+        self.worker.set_event_driven(True)
+        print(f"[调试] 剪贴板使用变化通知（platform={platform_name}）")
+
     def _load_initial_records(self):
         rows = get_all_records(limit=200)
         return [self._record_from_row(row) for row in rows]
@@ -588,6 +652,8 @@ class ClipGuardWindow(QMainWindow):
             "timestamp": row[6],
             "is_favorite": row[7],
             "is_deleted": row[8],
+            "formats": [item for item in (row[9] or "").split(",") if item],
+            "masked_length": row[10],
             "raw": "",
         })
 
@@ -620,9 +686,93 @@ class ClipGuardWindow(QMainWindow):
         self._show_status("status.monitor.paused", 3000)
         self._update_actions()
 
+    def _resume_remask_job(self):
+        job = RemaskJob.resume(custom_keywords=self.config.get("custom_sensitive_keywords", []), parent=self)
+        if job is not None:
+            print("[调试] 检测到未完成的重新脱敏任务，继续执行")
+            self._start_remask_job(job)
+
+    def _schedule_remask(self, keywords):
+        """keywords 为空表示规则集变化，需要全量扫描历史。"""
+        custom_keywords = self.config.get("custom_sensitive_keywords", [])
+        if self._remask_job is not None and self._remask_job.isRunning():
+            # 正在执行的任务合并新关键词后从头开始；任一方需要全量扫描则全量扫描
+            previous = self._remask_job.keywords()
+            keywords = list(dict.fromkeys(previous + list(keywords))) if previous and keywords else []
+            self._remask_job.request_stop()
+            self._remask_job.wait()
+        self._start_remask_job(RemaskJob(keywords=keywords, custom_keywords=custom_keywords, parent=self))
+
+    def _start_remask_job(self, job):
+        self._remask_job = job
+        job.progress.connect(self._on_remask_progress)
+        job.completed.connect(self._on_remask_completed)
+        job.error.connect(self._on_worker_error)
+        job.start()
+
+    def _stop_remask_job(self):
+        if self._remask_job is not None and self._remask_job.isRunning():
+            self._remask_job.request_stop()
+            self._remask_job.wait()
+
+    def _on_remask_progress(self, done, total):
+        self._show_status("status.remask.progress", 2000, done=done, total=total)
+
+    def _on_remask_completed(self, updated):
+        self._remask_job = None
+        if updated:
+            self._all_records = self._load_initial_records()
+            if self._active_record:
+                active_id = self._active_record.get("id")
+                self._active_record = next((rec for rec in self._all_records if rec.get("id") == active_id), None)
+            self._apply_filters()
+        self._show_status("status.remask.finished", 3000, count=updated)
+
+    def _resume_reclassify_job(self):
+        job = ReclassifyJob.resume(backend=self.config.get("regex_backend", "auto"), parent=self)
+        if job is not None:
+            print("[调试] 检测到未完成的重新分类任务，继续执行")
+            self._start_reclassify_job(job)
+
+    def _schedule_reclassify(self):
+        if self._reclassify_job is not None and self._reclassify_job.isRunning():
+            return
+        self._start_reclassify_job(ReclassifyJob(backend=self.config.get("regex_backend", "auto"), parent=self))
+
+    def _start_reclassify_job(self, job):
+        self._reclassify_job = job
+        job.progress.connect(self._on_reclassify_progress)
+        job.completed.connect(self._on_reclassify_completed)
+        job.error.connect(self._on_worker_error)
+        job.start()
+
+    def _stop_reclassify_job(self):
+        if self._reclassify_job is not None and self._reclassify_job.isRunning():
+            self._reclassify_job.request_stop()
+            self._reclassify_job.wait()
+
+    def _on_reclassify_progress(self, done, total):
+        self._show_status("status.reclassify.progress", 2000, done=done, total=total)
+
+    def _on_reclassify_completed(self, updated):
+        self._reclassify_job = None
+        if updated:
+            # 重新加载后侧栏类型计数随之刷新
+            self._all_records = self._load_initial_records()
+            if self._active_record:
+                active_id = self._active_record.get("id")
+                self._active_record = next((rec for rec in self._all_records if rec.get("id") == active_id), None)
+            self._apply_filters()
+        self._show_status("status.reclassify.finished", 3000, count=updated)
+
     def closeEvent(self, event):
         if self._quit_requested or not self._tray_icon or not self._tray_icon.isVisible():
             self.stop_monitoring()
+            if self._clipboard_notifier is not None:
+                self._clipboard_notifier.close()
+            self.thumbnails.shutdown()
+            self._stop_remask_job()
+            self._stop_reclassify_job()
             if self._tray_icon:
                 self._tray_icon.hide()
             event.accept()
@@ -648,13 +798,24 @@ class ClipGuardWindow(QMainWindow):
 
     def _open_settings(self):
         dialog = SettingsDialog(self.config, translator=self.translator, parent=self)
+        dialog.reclassifyRequested.connect(self._schedule_reclassify)
         if dialog.exec() == QDialog.Accepted:
             new_config = dialog.export_config()
             previous_language = self.config.get("language", self.translator.language())
+            previous_keywords = set(self.config.get("custom_sensitive_keywords", []))
             self.config.update(new_config)
             save_config(self.config)
-            self.worker.update_interval(self.config.get("poll_interval", 0.8))
+            self.worker.update_interval(
+                self.config.get("poll_interval", 0.8),
+                self.config.get("poll_interval_max", 3.0),
+                self.config.get("poll_interval_active", 0.3),
+            )
             self.worker.reset_last_seen()
+            added_keywords = [
+                kw for kw in self.config.get("custom_sensitive_keywords", []) if kw not in previous_keywords
+            ]
+            if added_keywords:
+                self._schedule_remask(added_keywords)
             should_monitor = self.config.get("enable_monitoring", True)
             if should_monitor and not self._monitoring:
                 self.start_monitoring()
@@ -679,6 +840,7 @@ class ClipGuardWindow(QMainWindow):
             self._raw_original_text = ""
             self._masked_formatted = False
             self._raw_formatted = False
+            self._populate_format_choices(None)
             self._update_masked_display()
             self._update_raw_display()
             return
@@ -691,13 +853,52 @@ class ClipGuardWindow(QMainWindow):
         self.detail_category.setText(self._tr("detail.category", value=category))
         types = record.get("types_display") or "--"
         self.detail_sensitive.setText(self._tr("detail.sensitive", value=types if types else "--"))
-        self._masked_original_text = record.get("masked", "") or ""
+        self._masked_original_text = self._full_masked(record)
         self._raw_original_text = record.get("raw", "") or ""
         self._masked_formatted = False
         self._raw_formatted = False
+        self._populate_format_choices(record)
         self._update_masked_display()
         self._update_raw_display()
 
+    def _populate_format_choices(self, record):
+        """列出已保存的附加格式；只查询格式名与大小，内容在切换时才读取。"""
+        self._raw_view_mime = ""
+        stored = []
+        if record:
+            stored = record.get("stored_formats")
+            if stored is None:
+                stored = [mime for mime, _size in get_record_formats(record["id"])] if record.get("id") is not None else []
+                record["stored_formats"] = stored
+        combo = self.detail_format_combo
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItem(self._tr("detail.format.plain"), "")
+        for mime in stored:
+            combo.addItem(self._tr(f"detail.format.{mime}"), mime)
+        combo.setCurrentIndex(0)
+        combo.blockSignals(False)
+        available = ", ".join(record.get("formats") or []) if record else ""
+        combo.setToolTip(self._tr("detail.format.available", value=available or "--"))
+        combo.setVisible(bool(stored))
+
+    def _on_detail_format_changed(self, index):
+        record = self._active_record
+        if not record:
+            return
+        mime = self.detail_format_combo.itemData(index) or ""
+        text = record.get("raw", "") or ""
+        if mime:
+            data = get_format_blob(record["id"], mime) if record.get("id") is not None else None
+            if data is None:
+                self._show_status("status.format.missing", 2000)
+                return
+            text = format_preview(mime, data)
+        self._raw_view_mime = mime
+        self._raw_original_text = text
+        self._raw_formatted = False
+        self._update_raw_display()
+
     def _on_record_ready(self, payload):
         record = self._prepare_record(payload)
         self._all_records.insert(0, record)
@@ -705,6 +906,28 @@ class ClipGuardWindow(QMainWindow):
         self._apply_filters()
         self._show_status("status.record.new", 2000)
 
+    def _on_record_updated(self, payload):
+        """超长内容的全文分析完成：替换先行展示的首尾预览，保留用户在此期间的收藏与删除操作。"""
+        for index, existing in enumerate(self._all_records):
+            if existing.get("id") != payload.get("id"):
+                continue
+            record = self._prepare_record(dict(
+                payload, is_favorite=existing.get("is_favorite"), is_deleted=existing.get("is_deleted")
+            ))
+            self._all_records[index] = record
+            if self._active_record is not None and self._active_record.get("id") == record["id"]:
+                self._active_record = record
+            self._apply_filters()
+            return
+
+    def _full_masked(self, record):
+        """超长记录的完整脱敏内容按需从数据库读取，不缓存在记录上。"""
+        if record.get("masked_truncated") and record.get("id") is not None:
+            full = get_masked_content(record["id"])
+            if full is not None:
+                return full
+        return record.get("masked", "") or ""
+
     def _on_worker_error(self, message):
         self._show_status("status.worker.error", 5000, message=message)
 
@@ -763,6 +986,8 @@ class ClipGuardWindow(QMainWindow):
         masked = record.get("masked") or record.get("masked_content") or ""
         record["masked"] = masked
         record["masked_preview"] = masked[:200]
+        # 列表查询与界面信号只携带前 MASKED_PREVIEW_CHARS 个字符
+        record["masked_truncated"] = (record.get("masked_length") or 0) > len(masked)
         types = record.get("types", [])
         if isinstance(types, str):
             types = [t for t in types.split(",") if t]
@@ -812,6 +1037,10 @@ class ClipGuardWindow(QMainWindow):
             else self._tr("detail.raw_placeholder_disabled")
         )
         self.raw_edit.setPlaceholderText(placeholder_raw)
+        for index in range(self.detail_format_combo.count()):
+            mime = self.detail_format_combo.itemData(index)
+            key = f"detail.format.{mime}" if mime else "detail.format.plain"
+            self.detail_format_combo.setItemText(index, self._tr(key))
         self._update_format_button_state("masked")
         self._update_format_button_state("raw")
 
@@ -832,6 +1061,9 @@ class ClipGuardWindow(QMainWindow):
             self.masked_edit.clear()
             self.masked_edit.setPlaceholderText(self._tr("detail.masked_placeholder"))
         self.masked_edit.blockSignals(False)
+        # 格式化后偏移不再对应，只在原样显示时高亮
+        spans = self._record_spans(self._active_record) if not self._masked_formatted else []
+        self._highlight_spans(self.masked_edit, display, [(span.start, span.end) for span in spans])
         self.copy_masked_button.setEnabled(bool(display))
         self.format_masked_button.setEnabled(bool(text))
         self._update_format_button_state("masked")
@@ -858,10 +1090,57 @@ class ClipGuardWindow(QMainWindow):
         )
         self.raw_edit.setPlaceholderText(placeholder_raw)
         self.raw_edit.blockSignals(False)
+        ranges = []
+        if display and not self._raw_formatted and not self._raw_view_mime:
+            # 原文偏移只存在于本次会话捕获的记录上
+            ranges = [
+                (span.source_start, span.source_end)
+                for span in self._record_spans(self._active_record)
+                if span.source_start >= 0
+            ]
+        self._highlight_spans(self.raw_edit, display, ranges)
         self.copy_raw_button.setEnabled(bool(display))
         self.format_raw_button.setEnabled(bool(text))
         self._update_format_button_state("raw")
 
+    def _record_spans(self, record):
+        if not record:
+            return []
+        spans = record.get("spans")
+        if spans is None:
+            # 历史记录的区间在首次展示时从数据库读取，并缓存在记录上
+            spans = []
+            if record.get("id") is not None:
+                spans = [DetectionSpan(*row) for row in get_record_spans(record["id"])]
+            record["spans"] = spans
+        return spans
+
+    def _highlight_spans(self, editor, text, ranges):
+        selections = []
+        if text and ranges:
+            highlight = QTextCharFormat()
+            highlight.setBackground(QColor(self.SPAN_HIGHLIGHT_COLOR))
+            # QTextDocument 以 UTF-16 计位置，含 BMP 以外字符（如 emoji）时需要换算
+            narrow = max(text) <= "\uffff"
+            last_index = last_position = 0
+            for start, end in sorted(ranges)[: self.MAX_HIGHLIGHT_SPANS]:
+                if not 0 <= start < end <= len(text) or start < last_index:
+                    continue
+                if narrow:
+                    start_position, end_position = start, end
+                else:
+                    start_position = last_position + len(text[last_index:start].encode("utf-16-le")) // 2
+                    end_position = start_position + len(text[start:end].encode("utf-16-le")) // 2
+                    last_index, last_position = end, end_position
+                cursor = QTextCursor(editor.document())
+                cursor.setPosition(start_position)
+                cursor.setPosition(end_position, QTextCursor.KeepAnchor)
+                selection = QTextEdit.ExtraSelection()
+                selection.cursor = cursor
+                selection.format = highlight
+                selections.append(selection)
+        editor.setExtraSelections(selections)
+
     def _update_format_button_state(self, target: str):
         if target == "masked":
             button = self.format_masked_button
@@ -1,5 +1,5 @@
 # ui/settings_dialog.py
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtWidgets import (
     QButtonGroup,
     QCheckBox,
@@ -24,12 +24,16 @@ from PySide6.QtWidgets import (
 )
 
 from config import DEFAULT_CONFIG
+from core.capture_policy import ACTIONS, IGNORE
+from detector_packs import REGION_PACKS
 from ui.i18n import Translator
 
 
 class SettingsDialog(QDialog):
     """多分组设置面板，覆盖监控/存储/隐私/通知/界面/快捷键等配置。"""
 
+    reclassifyRequested = Signal()
+
     _TABS = [
         ("monitoring", "settings.tabs.monitoring"),
         ("storage", "settings.tabs.storage"),
@@ -148,8 +152,15 @@ class SettingsDialog(QDialog):
         self.poll_interval_spin.setSingleStep(0.1)
         self.poll_interval_spin.setDecimals(1)
         self.poll_interval_spin.setSuffix(self._tr("settings.monitoring.interval_suffix"))
-        interval_layout.addStretch(1)
         interval_layout.addWidget(self.poll_interval_spin)
+        interval_layout.addStretch(1)
+        interval_layout.addWidget(QLabel(self._tr("settings.monitoring.interval_max_label")), 0, Qt.AlignLeft)
+        self.poll_interval_max_spin = QDoubleSpinBox()
+        self.poll_interval_max_spin.setRange(0.5, 30.0)
+        self.poll_interval_max_spin.setSingleStep(0.5)
+        self.poll_interval_max_spin.setDecimals(1)
+        self.poll_interval_max_spin.setSuffix(self._tr("settings.monitoring.interval_suffix"))
+        interval_layout.addWidget(self.poll_interval_max_spin)
 
         excluded_box = QGroupBox(self._tr("settings.monitoring.excluded.section"))
         excluded_layout = QVBoxLayout(excluded_box)
@@ -215,8 +226,18 @@ class SettingsDialog(QDialog):
         location_layout.addWidget(self.storage_local_radio)
         location_layout.addWidget(self.storage_cloud_radio)
 
+        maintenance_box = QGroupBox(self._tr("settings.storage.maintenance.section"))
+        maintenance_layout = QVBoxLayout(maintenance_box)
+        maintenance_hint = QLabel(self._tr("settings.storage.reclassify.hint"))
+        maintenance_hint.setWordWrap(True)
+        self.reclassify_button = QPushButton(self._tr("settings.storage.reclassify"))
+        self.reclassify_button.clicked.connect(self._request_reclassify)
+        maintenance_layout.addWidget(maintenance_hint)
+        maintenance_layout.addWidget(self.reclassify_button, alignment=Qt.AlignLeft)
+
         layout.addWidget(storage_box)
         layout.addWidget(location_box)
+        layout.addWidget(maintenance_box)
         layout.addStretch(1)
         return page
 
@@ -236,6 +257,17 @@ class SettingsDialog(QDialog):
         privacy_layout.addWidget(self.hide_credit_cards_checkbox)
         privacy_layout.addWidget(self.encrypt_data_checkbox)
 
+        packs_box = QGroupBox(self._tr("settings.privacy.packs.section"))
+        packs_layout = QVBoxLayout(packs_box)
+        self.region_pack_checkboxes = {}
+        for pack_id, meta in REGION_PACKS.items():
+            checkbox = QCheckBox(self._tr(meta["label"]))
+            self.region_pack_checkboxes[pack_id] = checkbox
+            packs_layout.addWidget(checkbox)
+        packs_hint = QLabel(self._tr("settings.privacy.packs.hint"))
+        packs_hint.setWordWrap(True)
+        packs_layout.addWidget(packs_hint)
+
         keywords_box = QGroupBox(self._tr("settings.privacy.keywords"))
         keywords_layout = QVBoxLayout(keywords_box)
         self.keywords_edit = QLineEdit()
@@ -246,6 +278,7 @@ class SettingsDialog(QDialog):
         keywords_layout.addWidget(clear_btn, alignment=Qt.AlignLeft)
 
         layout.addWidget(privacy_box)
+        layout.addWidget(packs_box)
         layout.addWidget(keywords_box)
         layout.addStretch(1)
         return page
@@ -329,10 +362,13 @@ class SettingsDialog(QDialog):
         self.monitor_urls_checkbox.setChecked(cfg["monitor_urls"])
         self.monitor_code_checkbox.setChecked(cfg["monitor_code"])
         self.poll_interval_spin.setValue(float(cfg["poll_interval"]))
+        self.poll_interval_max_spin.setValue(float(cfg.get("poll_interval_max", 3.0)))
 
         self.excluded_apps_list.clear()
         for app in cfg.get("excluded_apps", []):
-            self.excluded_apps_list.addItem(app)
+            self._add_policy_item(app, IGNORE)
+        for app, action in (cfg.get("app_policies") or {}).items():
+            self._add_policy_item(app, action)
 
         self.max_items_spin.setValue(int(cfg["max_items"]))
         self.auto_cleanup_checkbox.setChecked(bool(cfg["auto_cleanup"]))
@@ -349,6 +385,9 @@ class SettingsDialog(QDialog):
         self.hide_passwords_checkbox.setChecked(bool(cfg["hide_passwords"]))
         self.hide_credit_cards_checkbox.setChecked(bool(cfg["hide_credit_cards"]))
         self.encrypt_data_checkbox.setChecked(bool(cfg["encrypt_data"]))
+        enabled_packs = set(cfg.get("region_rule_packs") or [])
+        for pack_id, checkbox in self.region_pack_checkboxes.items():
+            checkbox.setChecked(pack_id in enabled_packs)
         keywords = cfg.get("custom_sensitive_keywords", [])
         self.keywords_edit.setText(", ".join(keywords))
 
@@ -369,7 +408,13 @@ class SettingsDialog(QDialog):
         self.clear_all_edit.setText(cfg["clear_all_key"])
 
     def export_config(self):
-        excluded = [self.excluded_apps_list.item(i).text() for i in range(self.excluded_apps_list.count())]
+        excluded = []
+        app_policies = {}
+        for app, action in self._policy_items():
+            if action == IGNORE:
+                excluded.append(app)
+            else:
+                app_policies[app] = action
         keywords = [kw.strip() for kw in self.keywords_edit.text().split(",") if kw.strip()]
         storage_location = "cloud" if self.storage_cloud_radio.isChecked() else "local"
 
@@ -379,7 +424,11 @@ class SettingsDialog(QDialog):
             "monitor_urls": self.monitor_urls_checkbox.isChecked(),
             "monitor_code": self.monitor_code_checkbox.isChecked(),
             "excluded_apps": excluded,
+            "app_policies": app_policies,
             "poll_interval": float(self.poll_interval_spin.value()),
+            "poll_interval_max": max(
+                float(self.poll_interval_spin.value()), float(self.poll_interval_max_spin.value())
+            ),
 
             "save_raw_content": self.save_raw_checkbox.isChecked(),
             "max_items": int(self.max_items_spin.value()),
@@ -390,6 +439,9 @@ class SettingsDialog(QDialog):
             "hide_passwords": self.hide_passwords_checkbox.isChecked(),
             "hide_credit_cards": self.hide_credit_cards_checkbox.isChecked(),
             "encrypt_data": self.encrypt_data_checkbox.isChecked(),
+            "region_rule_packs": [
+                pack_id for pack_id, checkbox in self.region_pack_checkboxes.items() if checkbox.isChecked()
+            ],
             "custom_sensitive_keywords": keywords,
 
             "show_notifications": self.show_notifications_checkbox.isChecked(),
@@ -421,17 +473,41 @@ class SettingsDialog(QDialog):
         title = self._tr("settings.monitoring.excluded.add")
         prompt = self._tr("settings.monitoring.excluded.prompt")
         text, ok = QInputDialog.getText(self, title, prompt)
-        if ok and text.strip():
-            name = text.strip()
-            existing = [self.excluded_apps_list.item(i).text() for i in range(self.excluded_apps_list.count())]
-            if name not in existing:
-                self.excluded_apps_list.addItem(name)
+        if not ok or not text.strip():
+            return
+        name = text.strip()
+        if name in [app for app, _action in self._policy_items()]:
+            return
+        labels = [self._tr(f"settings.monitoring.policy.{action}") for action in ACTIONS]
+        label, ok = QInputDialog.getItem(
+            self, title, self._tr("settings.monitoring.policy.prompt"), labels, 0, False
+        )
+        if ok:
+            self._add_policy_item(name, ACTIONS[labels.index(label)])
+
+    def _add_policy_item(self, app, action):
+        if action not in ACTIONS:
+            return
+        item = QListWidgetItem(f"{app}  ·  {self._tr(f'settings.monitoring.policy.{action}')}")
+        item.setData(Qt.UserRole, (app, action))
+        self.excluded_apps_list.addItem(item)
+
+    def _policy_items(self):
+        return [
+            tuple(self.excluded_apps_list.item(i).data(Qt.UserRole))
+            for i in range(self.excluded_apps_list.count())
+        ]
 
     def _remove_selected_app(self):
         for item in self.excluded_apps_list.selectedItems():
             row = self.excluded_apps_list.row(item)
             self.excluded_apps_list.takeItem(row)
 
+    def _request_reclassify(self):
+        self.reclassify_button.setEnabled(False)
+        self.reclassify_button.setText(self._tr("settings.storage.reclassify.started"))
+        self.reclassifyRequested.emit()
+
     def _clear_keywords(self):
         self.keywords_edit.clear()
 